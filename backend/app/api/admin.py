@@ -79,6 +79,13 @@ async def list_users(
     }
 
 
+@router.get("/admin/notifications/backlog")
+async def notification_backlog(_: User = Depends(require_admin), db: AsyncSession = Depends(get_db)) -> dict:
+    from app.services.outbox import backlog
+
+    return await backlog(db)
+
+
 def _flag_to_dict(f: FeatureFlag) -> dict:
     return {
         "id": str(f.id),
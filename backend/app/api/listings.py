@@ -1,7 +1,11 @@
 import uuid
+from datetime import datetime, timezone
+from typing import Literal
 
 import structlog
 from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import func, select
 
@@ -14,6 +18,12 @@ from app.models.user import User
 router = APIRouter()
 log = structlog.get_logger()
 
+MAX_FEED_SIZE = 50
+
+
+class MatchesSeen(BaseModel):
+    match_ids: list[uuid.UUID]
+
 
 @router.get("/listings")
 async def list_listings(
@@ -67,10 +77,15 @@ async def list_matches(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=50),
     unread_only: bool = False,
+    sort: Literal["recent", "ranked"] = "recent",
+    k: int = Query(20, ge=1, le=MAX_FEED_SIZE),
     current_user: User = Depends(paid_gate),
     db: AsyncSession = Depends(get_db),
 ) -> dict:
-    query = select(Match).where(Match.user_id == current_user.id)
+    if sort == "ranked":
+        return await _ranked_matches(current_user, k, db)
+
+    query = select(Match).where(Match.user_id == current_user.id, Match.retired_at.is_(None))
     if unread_only:
         query = query.where(Match.notified.is_(False))
     query = query.order_by(Match.created_at.desc())
@@ -83,18 +98,7 @@ async def list_matches(
     pages = (total + per_page - 1) // per_page if total > 0 else 1
 
     return {
-        "items": [
-            {
-                "id": str(m.id),
-                "listing_id": str(m.listing_id),
-                "preference_id": str(m.preference_id),
-                "score": m.score,
-                "notified": m.notified,
-                "notification_channel": m.notification_channel,
-                "created_at": m.created_at.isoformat(),
-            }
-            for m in matches
-        ],
+        "items": [_match_to_dict(m) for m in matches],
         "total": total,
         "page": page,
         "per_page": per_page,
@@ -102,6 +106,55 @@ async def list_matches(
     }
 
 
+async def _ranked_matches(user: User, k: int, db: AsyncSession) -> dict:
+    """The user's best ``k`` unseen matches, by score then recency.
+
+    Reads the head of ``ix_matches_user_unseen_rank`` and stops after ``k`` rows,
+    so the cost does not grow with the user's match history. No total is
+    returned, since counting would scan it.
+    """
+    result = await db.execute(ranked_matches_query(user.id, k))
+    return {"items": [_match_to_dict(m) for m in result.scalars().all()], "k": k}
+
+
+def ranked_matches_query(user_id: uuid.UUID, k: int):
+    return (
+        select(Match)
+        .where(Match.user_id == user_id, Match.seen_at.is_(None), Match.retired_at.is_(None))
+        .order_by(Match.score.desc(), Match.created_at.desc())
+        .limit(k)
+    )
+
+
+@router.post("/matches/seen")
+async def mark_matches_seen(
+    body: MatchesSeen,
+    current_user: User = Depends(paid_gate),
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """Drop matches from the ranked feed once the user has looked at them."""
+    result = await db.execute(
+        update(Match)
+        .where(Match.user_id == current_user.id, Match.id.in_(body.match_ids), Match.seen_at.is_(None))
+        .values(seen_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
+    return {"updated": result.rowcount}
+
+
+def _match_to_dict(m: Match) -> dict:
+    return {
+        "id": str(m.id),
+        "listing_id": str(m.listing_id),
+        "preference_id": str(m.preference_id),
+        "score": m.score,
+        "notified": m.notified,
+        "notification_channel": m.notification_channel,
+        "seen_at": m.seen_at.isoformat() if m.seen_at else None,
+        "created_at": m.created_at.isoformat(),
+    }
+
+
 def _listing_to_dict(l: Listing) -> dict:
     return {
         "id": str(l.id),
@@ -1,3 +1,5 @@
+from typing import Literal
+
 import structlog
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
@@ -18,6 +20,7 @@ class TelegramConnect(BaseModel):
 class NotificationSettings(BaseModel):
     telegram: bool
     email: bool
+    mode: Literal["instant", "digest"] | None = None
 
 
 @router.post("/notifications/telegram/connect")
@@ -39,6 +42,7 @@ async def get_notification_settings(current_user: User = Depends(get_current_use
         "telegram": current_user.telegram_chat_id is not None,
         "email": True,
         "telegram_chat_id": current_user.telegram_chat_id,
+        "mode": current_user.notification_mode,
     }
 
 
@@ -50,6 +54,12 @@ async def update_notification_settings(
 
     if not body.telegram:
         current_user.telegram_chat_id = None
+    if body.mode is not None:
+        current_user.notification_mode = body.mode
     current_user.updated_at = datetime.now(timezone.utc)
     await db.commit()
-    return {"telegram": current_user.telegram_chat_id is not None, "email": body.email}
+    return {
+        "telegram": current_user.telegram_chat_id is not None,
+        "email": body.email,
+        "mode": current_user.notification_mode,
+    }
@@ -6,17 +6,22 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
+from starlette.concurrency import run_in_threadpool
 
 from app.db.session import get_db
 from app.models.preference import Preference
 from app.models.user import User
 from app.services.auth_service import get_current_user
+from app.services.preference_index import publish_preference_change
 
 router = APIRouter()
 log = structlog.get_logger()
 
 FREE_USER_LIMIT = 3
 PAID_USER_LIMIT = 10
+MAX_RADIUS_KM = 50
+# Columns a PUT may change but not clear
+REQUIRED_FIELDS = ("city", "country_code", "max_price", "pet_friendly")
 
 
 class PreferenceCreate(BaseModel):
@@ -30,6 +35,9 @@ class PreferenceCreate(BaseModel):
     max_size_sqm: int | None = None
     pet_friendly: bool = False
     furnished: bool | None = None
+    latitude: float | None = None
+    longitude: float | None = None
+    radius_km: float | None = None
     keywords: list[str] | None = None
 
 
@@ -44,6 +52,9 @@ class PreferenceUpdate(BaseModel):
     max_size_sqm: int | None = None
     pet_friendly: bool | None = None
     furnished: bool | None = None
+    latitude: float | None = None
+    longitude: float | None = None
+    radius_km: float | None = None
     keywords: list[str] | None = None
 
 
@@ -69,6 +80,8 @@ async def create_preference(
     if len(existing) >= limit:
         raise HTTPException(status_code=403, detail=f"Preference limit reached ({limit} max)")
 
+    _validate_radius(body.latitude, body.longitude, body.radius_km)
+
     now = datetime.now(timezone.utc)
     pref = Preference(
         id=uuid.uuid4(),
@@ -80,6 +93,8 @@ async def create_preference(
     db.add(pref)
     await db.commit()
     await db.refresh(pref)
+    await publish_preference_change(pref)
+    await _enqueue_backfill(pref)
     log.info("preference.created", user_id=str(current_user.id), pref_id=str(pref.id))
     return _pref_to_dict(pref)
 
@@ -96,11 +111,20 @@ async def update_preference(
     if not pref:
         raise HTTPException(status_code=404, detail="Preference not found")
 
-    for field, value in body.model_dump(exclude_none=True).items():
+    # An explicit null clears an optional field, e.g. the radius criterion
+    changes = body.model_dump(exclude_unset=True)
+    cleared = sorted(field for field in REQUIRED_FIELDS if field in changes and changes[field] is None)
+    if cleared:
+        raise HTTPException(status_code=422, detail=f"{', '.join(cleared)} cannot be null")
+    for field, value in changes.items():
         setattr(pref, field, value)
+    _validate_radius(pref.latitude, pref.longitude, pref.radius_km)
     pref.updated_at = datetime.now(timezone.utc)
     await db.commit()
     await db.refresh(pref)
+    await publish_preference_change(pref)
+    if pref.is_active:
+        await _enqueue_backfill(pref)
     return _pref_to_dict(pref)
 
 
@@ -115,6 +139,37 @@ async def delete_preference(
     pref.is_active = False
     pref.updated_at = datetime.now(timezone.utc)
     await db.commit()
+    await publish_preference_change(pref)
+
+
+def _validate_radius(latitude: float | None, longitude: float | None, radius_km: float | None) -> None:
+    given = [v is not None for v in (latitude, longitude, radius_km)]
+    if any(given) and not all(given):
+        raise HTTPException(status_code=422, detail="latitude, longitude and radius_km must be set together")
+    if radius_km is not None and not 0 < radius_km <= MAX_RADIUS_KM:
+        raise HTTPException(status_code=422, detail=f"radius_km must be between 0 and {MAX_RADIUS_KM}")
+    if latitude is not None and not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise HTTPException(status_code=422, detail="Invalid coordinates")
+
+
+async def _enqueue_backfill(pref: Preference) -> None:
+    """Match the preference against listings that are already live.
+
+    The broker call is synchronous, so it runs in the threadpool rather than
+    blocking the event loop.
+    """
+    pref_id = str(pref.id)
+    try:
+        await run_in_threadpool(_send_backfill, pref_id)
+    except Exception as e:
+        log.warning("preference.backfill_enqueue_failed", pref_id=pref_id, error=str(e))
+
+
+def _send_backfill(pref_id: str) -> None:
+    import app.workers.worker  # noqa: F401  # configures the Redis broker
+    from app.workers.tasks import match_preference
+
+    match_preference.send(pref_id)
 
 
 def _pref_to_dict(p: Preference) -> dict:
@@ -131,6 +186,9 @@ def _pref_to_dict(p: Preference) -> dict:
         "max_size_sqm": p.max_size_sqm,
         "pet_friendly": p.pet_friendly,
         "furnished": p.furnished,
+        "latitude": p.latitude,
+        "longitude": p.longitude,
+        "radius_km": p.radius_km,
         "keywords": p.keywords,
         "is_active": p.is_active,
         "created_at": p.created_at.isoformat(),
@@ -32,10 +32,24 @@ class Settings:
     SENDGRID_API_KEY: str = os.getenv("SENDGRID_API_KEY", "SG.placeholder")
     SENDGRID_FROM_EMAIL: str = os.getenv("SENDGRID_FROM_EMAIL", "noreply@rentify.eu")
     MOCK_EMAIL: bool = os.getenv("MOCK_EMAIL", "true").lower() == "true"
+    SENDGRID_API_URL: str = os.getenv("SENDGRID_API_URL", "https://api.sendgrid.com")
+    SENDGRID_BATCH_SIZE: int = int(os.getenv("SENDGRID_BATCH_SIZE", "1000"))
 
     # Telegram
     TELEGRAM_BOT_TOKEN: str = os.getenv("TELEGRAM_BOT_TOKEN", "placeholder")
     MOCK_TELEGRAM: bool = os.getenv("MOCK_TELEGRAM", "true").lower() == "true"
+    TELEGRAM_API_URL: str = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+    TELEGRAM_GLOBAL_RATE: float = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+    TELEGRAM_CHAT_RATE: float = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+    TELEGRAM_QUEUE_STALL_SECONDS: float = float(os.getenv("TELEGRAM_QUEUE_STALL_SECONDS", "30"))
+    TELEGRAM_MAX_RETRIES: int = int(os.getenv("TELEGRAM_MAX_RETRIES", "3"))
+
+    # Outbound HTTP (notification services)
+    HTTP_POOL_SIZE: int = int(os.getenv("HTTP_POOL_SIZE", "20"))
+    HTTP_KEEPALIVE_SECONDS: float = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "60"))
+
+    # Worker
+    WORKER_DB_POOL_SIZE: int = int(os.getenv("WORKER_DB_POOL_SIZE", "5"))
 
     # Observability
     SENTRY_DSN: str = os.getenv("SENTRY_DSN", "")
@@ -46,6 +60,21 @@ class Settings:
     ENABLE_PAID_GATE: bool = os.getenv("ENABLE_PAID_GATE", "false").lower() == "true"
     ENABLE_SCRAPING: bool = os.getenv("ENABLE_SCRAPING", "false").lower() == "true"
 
+    # Matching
+    MATCH_BACKFILL_NOTIFY_LIMIT: int = int(os.getenv("MATCH_BACKFILL_NOTIFY_LIMIT", "10"))
+    PREFERENCE_INDEX_RECONCILE_SECONDS: int = int(os.getenv("PREFERENCE_INDEX_RECONCILE_SECONDS", "60"))
+
+    # Notifications
+    NOTIFY_COALESCE_SECONDS: int = int(os.getenv("NOTIFY_COALESCE_SECONDS", "60"))
+    NOTIFY_DIGEST_HOUR: int = int(os.getenv("NOTIFY_DIGEST_HOUR", "8"))
+    # Outbox sweep for notifications whose trigger was lost
+    NOTIFY_DISPATCH_INTERVAL_SECONDS: int = int(os.getenv("NOTIFY_DISPATCH_INTERVAL_SECONDS", "60"))
+    NOTIFY_DISPATCH_BATCH_SIZE: int = int(os.getenv("NOTIFY_DISPATCH_BATCH_SIZE", "500"))
+    NOTIFY_MAX_ATTEMPTS: int = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "5"))
+    # Delay before retrying a failed send, doubled after every further failure
+    NOTIFY_RETRY_BACKOFF_SECONDS: int = int(os.getenv("NOTIFY_RETRY_BACKOFF_SECONDS", "60"))
+    TRIAL_REMINDER_BATCH_SIZE: int = int(os.getenv("TRIAL_REMINDER_BATCH_SIZE", "1000"))
+
     # Scraper settings
     SCRAPER_SOURCES: str = os.getenv("SCRAPER_SOURCES", "funda,pararius,kamernet,huurwoningen,housinganywhere,directbijeigenaar")
     SCRAPER_CITIES: str = os.getenv("SCRAPER_CITIES", "amsterdam,rotterdam,utrecht,den-haag,eindhoven,groningen")
@@ -34,6 +34,13 @@ async def startup_event() -> None:
         sentry_sdk.init(dsn=settings.SENTRY_DSN, traces_sample_rate=0.1)
 
 
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    from app.services.http_clients import close_clients
+
+    await close_clients()
+
+
 # --- Routers ---
 from app.api import auth, billing, preferences, notifications, admin, gdpr, oauth, listings  # noqa: E402
 from app.middleware.logging_mw import LoggingMiddleware  # noqa: E402
@@ -2,7 +2,7 @@ import uuid
 from datetime import date, datetime, timezone
 from typing import Optional
 
-from sqlalchemy import JSON, String, UniqueConstraint
+from sqlalchemy import JSON, Index, String, UniqueConstraint, text
 from sqlmodel import Column, DateTime, Field, SQLModel
 
 
@@ -12,7 +12,17 @@ def utcnow() -> datetime:
 
 class Listing(SQLModel, table=True):
     __tablename__ = "listings"
-    __table_args__ = (UniqueConstraint("source_site", "source_id", name="uq_listing_source"),)
+    __table_args__ = (
+        UniqueConstraint("source_site", "source_id", name="uq_listing_source"),
+        # Serves reverse matching: live listings of a city within a price band
+        Index(
+            "ix_listings_live_city_price",
+            text("lower(city)"),
+            "price_eur",
+            postgresql_where=text("delisted_at IS NULL"),
+            sqlite_where=text("delisted_at IS NULL"),
+        ),
+    )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     source_site: str = Field(sa_column=Column(String(100), nullable=False, index=True))
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import String, UniqueConstraint
+from sqlalchemy import Index, String, UniqueConstraint, text
 from sqlmodel import Column, DateTime, Field, SQLModel
 
 
@@ -12,7 +12,18 @@ def utcnow() -> datetime:
 
 class Match(SQLModel, table=True):
     __tablename__ = "matches"
-    __table_args__ = (UniqueConstraint("user_id", "listing_id", name="uq_match_user_listing"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "listing_id", name="uq_match_user_listing"),
+        # Serves the ranked feed: a user's unseen live matches, best score then newest first
+        Index(
+            "ix_matches_user_unseen_rank",
+            "user_id",
+            text("score DESC"),
+            text("created_at DESC"),
+            postgresql_where=text("seen_at IS NULL AND retired_at IS NULL"),
+            sqlite_where=text("seen_at IS NULL AND retired_at IS NULL"),
+        ),
+    )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="users.id", index=True)
@@ -21,5 +32,8 @@ class Match(SQLModel, table=True):
     score: float = Field(nullable=False)
     notified: bool = Field(default=False)
     notified_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
+    seen_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
+    # Set when the listing stops fitting the preference (e.g. a price change); hidden from the feed
+    retired_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
     notification_channel: str = Field(default="none", sa_column=Column(String(20), nullable=False))
     created_at: datetime = Field(default_factory=utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import JSON, String
+from sqlalchemy import JSON, Index, String, text
 from sqlmodel import Column, DateTime, Field, SQLModel
 
 
@@ -12,6 +12,21 @@ def utcnow() -> datetime:
 
 class Notification(SQLModel, table=True):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # The outbox: dispatchers claim pending rows oldest first, or per user
+        Index(
+            "ix_notifications_pending_created",
+            "created_at",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+        Index(
+            "ix_notifications_pending_user",
+            "user_id",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+    )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="users.id")
@@ -20,6 +35,9 @@ class Notification(SQLModel, table=True):
     type: str = Field(sa_column=Column(String(50), nullable=False))  # match, trial_ending_48h, etc.
     status: str = Field(default="pending", sa_column=Column(String(20), nullable=False))
     payload: dict = Field(sa_column=Column(JSON, nullable=False))
+    attempts: int = Field(default=0, nullable=False)
+    # Set on a failed attempt: the row is not claimed again before then
+    next_attempt_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
     error_message: Optional[str] = Field(default=None, nullable=True)
     sent_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
     created_at: datetime = Field(default_factory=utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
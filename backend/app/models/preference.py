@@ -25,6 +25,10 @@ class Preference(SQLModel, table=True):
     max_size_sqm: Optional[int] = Field(default=None, nullable=True)
     pet_friendly: bool = Field(default=False)
     furnished: Optional[bool] = Field(default=None, nullable=True)
+    # Optional "within radius_km of (latitude, longitude)" criterion; all three or none
+    latitude: Optional[float] = Field(default=None, nullable=True)
+    longitude: Optional[float] = Field(default=None, nullable=True)
+    radius_km: Optional[float] = Field(default=None, nullable=True)
     keywords: Optional[list] = Field(default=None, sa_column=Column(JSON, nullable=True))
     is_active: bool = Field(default=True)
     created_at: datetime = Field(default_factory=utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
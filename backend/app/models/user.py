@@ -22,6 +22,7 @@ class User(SQLModel, table=True):
     subscription_status: str = Field(default="none", sa_column=Column(String(20), nullable=False))
     trial_ends_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
     telegram_chat_id: Optional[str] = Field(default=None, sa_column=Column(String(255), nullable=True))
+    notification_mode: str = Field(default="instant", sa_column=Column(String(20), nullable=False))  # instant, digest
     is_admin: bool = Field(default=False)
     gdpr_consent_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
     created_at: datetime = Field(default_factory=utcnow, sa_column=Column(DateTime(timezone=True), nullable=False))
@@ -0,0 +1,228 @@
+"""Vectorised counterpart of ``matcher.score_listing``.
+
+Preferences are packed once into column arrays so a listing (or a block of
+listings) is scored against all of them in a single NumPy pass. Results are
+identical to calling ``score_listing`` per (listing, preference) pair.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from app.models.listing import Listing
+from app.models.preference import Preference
+from app.services.geo import has_radius, haversine_km
+from app.services.keywords import KeywordIndex
+from app.services.matcher import WEIGHTS
+
+# Tri-state encoding for Optional[bool] columns
+_NONE, _FALSE, _TRUE = -1, 0, 1
+
+
+def _opt_float(value) -> float:
+    return np.nan if value is None else float(value)
+
+
+def _tri(value) -> int:
+    if value is None:
+        return _NONE
+    return _TRUE if value else _FALSE
+
+
+def _truthy(col: np.ndarray) -> np.ndarray:
+    # Mirrors Python truthiness of Optional[number]: None (NaN) and 0 are falsy
+    return ~np.isnan(col) & (col != 0)
+
+
+class PreferenceBlock:
+    """Column-oriented snapshot of a list of preferences."""
+
+    def __init__(self, prefs: Sequence[Preference]) -> None:
+        self.prefs = list(prefs)
+        n = len(self.prefs)
+        self.city = np.array([p.city.lower() for p in self.prefs], dtype=object)
+        self.min_price = np.fromiter((_opt_float(p.min_price) for p in self.prefs), dtype=np.float64, count=n)
+        self.max_price = np.fromiter((float(p.max_price) for p in self.prefs), dtype=np.float64, count=n)
+        self.min_rooms = np.fromiter((_opt_float(p.min_rooms) for p in self.prefs), dtype=np.float64, count=n)
+        self.max_rooms = np.fromiter((_opt_float(p.max_rooms) for p in self.prefs), dtype=np.float64, count=n)
+        self.min_size = np.fromiter((_opt_float(p.min_size_sqm) for p in self.prefs), dtype=np.float64, count=n)
+        self.max_size = np.fromiter((_opt_float(p.max_size_sqm) for p in self.prefs), dtype=np.float64, count=n)
+        self.pet_friendly = np.fromiter((bool(p.pet_friendly) for p in self.prefs), dtype=bool, count=n)
+        self.furnished = np.fromiter((_tri(p.furnished) for p in self.prefs), dtype=np.int8, count=n)
+
+        self.has_radius = np.fromiter((has_radius(p) for p in self.prefs), dtype=bool, count=n)
+        self.latitude = np.fromiter((_opt_float(p.latitude) for p in self.prefs), dtype=np.float64, count=n)
+        self.longitude = np.fromiter((_opt_float(p.longitude) for p in self.prefs), dtype=np.float64, count=n)
+        self.radius_km = np.fromiter((_opt_float(p.radius_km) for p in self.prefs), dtype=np.float64, count=n)
+
+        self.has_rooms_range = _truthy(self.min_rooms) & _truthy(self.max_rooms)
+        self.has_size_range = _truthy(self.min_size) & _truthy(self.max_size)
+
+        # Keyword indexes shared with blocks built by take() and concat(); each preference's
+        # column in the concatenation of their hits
+        self._keyword_indexes = [KeywordIndex(self.prefs)]
+        self._keyword_cols = np.arange(n)
+        self.keyword_count = self._keyword_indexes[0].counts
+
+    def __len__(self) -> int:
+        return len(self.prefs)
+
+    @property
+    def has_keywords(self) -> bool:
+        return any(index.postings for index in self._keyword_indexes)
+
+    def take(self, idx: np.ndarray) -> "PreferenceBlock":
+        """Sub-block of the preferences at ``idx``, sharing this block's keyword index."""
+        sub = object.__new__(PreferenceBlock)
+        sub.prefs = [self.prefs[i] for i in idx]
+        for name in _COLUMNS:
+            setattr(sub, name, getattr(self, name)[idx])
+        sub._keyword_indexes = self._keyword_indexes
+        sub._keyword_cols = self._keyword_cols[idx]
+        return sub
+
+    @staticmethod
+    def concat(blocks: Sequence["PreferenceBlock"]) -> "PreferenceBlock":
+        """The preferences of ``blocks`` in order as one block, sharing their keyword indexes."""
+        out = object.__new__(PreferenceBlock)
+        out.prefs = [pref for block in blocks for pref in block.prefs]
+        for name in _COLUMNS:
+            setattr(out, name, np.concatenate([getattr(block, name) for block in blocks]))
+        out._keyword_indexes, cols, offset = [], [], 0
+        for block in blocks:
+            out._keyword_indexes.extend(block._keyword_indexes)
+            cols.append(block._keyword_cols + offset)
+            offset += sum(len(index) for index in block._keyword_indexes)
+        out._keyword_cols = np.concatenate(cols)
+        return out
+
+    def keyword_hits(self, listings: Sequence[Listing]) -> np.ndarray:
+        """Keywords of each preference found in each listing, shape ``(n_listings, n_prefs)``."""
+        hits = np.zeros((len(listings), len(self.prefs)), dtype=np.int64)
+        if self.has_keywords:
+            for i, listing in enumerate(listings):
+                row = np.concatenate([index.hits(listing) for index in self._keyword_indexes])
+                hits[i] = row[self._keyword_cols]
+        return hits
+
+    def score(self, listing: Listing) -> np.ndarray:
+        """Scores of one listing against every preference, shape ``(n_prefs,)``."""
+        return self.score_block([listing])[0]
+
+    def in_price_band(self, listings: Sequence[Listing]) -> np.ndarray:
+        """Whether each listing's price lies in each preference's band, shape ``(n_listings, n_prefs)``."""
+        return self._price_ok(_prices(listings))
+
+    def contains_price(self, price: int) -> np.ndarray:
+        """Whether ``price`` lies in each preference's band, shape ``(n_prefs,)``."""
+        return self._price_ok(np.array([[float(price)]]))[0]
+
+    def score_block(self, listings: Sequence[Listing]) -> np.ndarray:
+        """Scores of each listing against every preference, shape ``(n_listings, n_prefs)``."""
+        n = len(listings)
+        # Listing columns are shaped (n, 1) so they broadcast against (n_prefs,)
+        city = np.array([listing.city.lower() for listing in listings], dtype=object)[:, None]
+        price = _prices(listings)
+        rooms = np.fromiter((_opt_float(listing.rooms) for listing in listings), dtype=np.float64, count=n)[:, None]
+        size = np.fromiter((_opt_float(listing.size_sqm) for listing in listings), dtype=np.float64, count=n)[:, None]
+        pet = np.fromiter((_tri(listing.pet_friendly) for listing in listings), dtype=np.int8, count=n)[:, None]
+        furnished = np.fromiter((_tri(listing.furnished) for listing in listings), dtype=np.int8, count=n)[:, None]
+
+        # Components are added in the same order as score_listing so float sums are bit-identical.
+        score = np.zeros((n, len(self.prefs)), dtype=np.float64)
+        score += WEIGHTS["city"]
+
+        score += np.where(self._price_ok(price), WEIGHTS["price"], 0.0)
+
+        rooms_set = _truthy(rooms)
+        rooms_ok = np.where(
+            self.has_rooms_range,
+            rooms_set & (self.min_rooms <= rooms) & (rooms <= self.max_rooms),
+            rooms_set,
+        )
+        score += np.where(rooms_ok, WEIGHTS["rooms"], 0.0)
+
+        size_set = _truthy(size)
+        size_ok = np.where(
+            self.has_size_range,
+            size_set & (self.min_size <= size) & (size <= self.max_size),
+            size_set,
+        )
+        score += np.where(size_ok, WEIGHTS["size"], 0.0)
+
+        pet_counted = self.pet_friendly & (pet != _NONE)
+        furnished_counted = (self.furnished != _NONE) & (furnished != _NONE)
+        keywords_counted = self.keyword_count > 0
+        extras_count = pet_counted.astype(np.int64) + furnished_counted + keywords_counted
+        extras_score = (pet_counted & (pet == _TRUE)).astype(np.int64) + (
+            furnished_counted & (furnished == self.furnished)
+        )
+        if keywords_counted.any():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                fraction = self.keyword_hits(listings) / self.keyword_count
+            extras_score = extras_score + np.where(keywords_counted, fraction, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            extras = WEIGHTS["extras"] * (extras_score / extras_count)
+        score += np.where(extras_count > 0, extras, 0.0)
+
+        score = _round_scores(score)
+        score[city != self.city] = 0.0
+        if self.has_radius.any():
+            score[~self.within_radius(listings)] = 0.0
+        return score
+
+    def within_radius(self, listings: Sequence[Listing]) -> np.ndarray:
+        """Whether each listing lies in each preference's circle, shape ``(n_listings, n_prefs)``.
+
+        Preferences without a radius accept every listing; listings without
+        coordinates fall outside every circle.
+        """
+        n = len(listings)
+        lat = np.fromiter((_opt_float(listing.latitude) for listing in listings), dtype=np.float64, count=n)[:, None]
+        lon = np.fromiter((_opt_float(listing.longitude) for listing in listings), dtype=np.float64, count=n)[:, None]
+        with np.errstate(invalid="ignore"):
+            inside = haversine_km(lat, lon, self.latitude, self.longitude) <= self.radius_km
+        return ~self.has_radius | inside
+
+    def _price_ok(self, price: np.ndarray) -> np.ndarray:
+        return (np.isnan(self.min_price) | (price >= self.min_price)) & (price <= self.max_price)
+
+
+_COLUMNS = (
+    "city",
+    "min_price",
+    "max_price",
+    "min_rooms",
+    "max_rooms",
+    "min_size",
+    "max_size",
+    "pet_friendly",
+    "furnished",
+    "has_rooms_range",
+    "has_size_range",
+    "has_radius",
+    "latitude",
+    "longitude",
+    "radius_km",
+    "keyword_count",
+)
+
+
+def _round_scores(score: np.ndarray) -> np.ndarray:
+    """``round(x, 3)`` of every score, as ``score_listing`` rounds.
+
+    ``np.round`` rounds ``x * 1000``, whose own rounding error decides values
+    lying halfway between two thousandths (e.g. 0.5375 from keyword fractions)
+    differently from ``round``. Those near-ties are rounded with ``round``.
+    """
+    scaled = score * 1000
+    rounded = np.round(scaled) / 1000
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ties.any():
+        rounded[ties] = [round(value, 3) for value in score[ties].tolist()]
+    return rounded
+
+
+def _prices(listings: Sequence[Listing]) -> np.ndarray:
+    prices = np.fromiter((float(listing.price_eur) for listing in listings), dtype=np.float64, count=len(listings))
+    return prices[:, None]
@@ -0,0 +1,147 @@
+"""Bulk email through SendGrid personalizations.
+
+One SendGrid request carries up to ``SENDGRID_BATCH_SIZE`` personalizations
+(SendGrid caps it at 1000), each with its own recipient and substitutions
+applied to the shared subject and body. ``send_bulk_notifications`` records a
+``Notification`` row per recipient and stores the outcome of each one.
+"""
+
+import uuid
+from collections import defaultdict
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+import httpx
+import structlog
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.notification import Notification
+
+settings = get_settings()
+log = structlog.get_logger()
+
+SENDGRID_MAX_PERSONALIZATIONS = 1000
+
+
+class BulkRecipient(NamedTuple):
+    user_id: uuid.UUID
+    email: str
+    # Tag -> value, e.g. {"-name-": "Alice"}; tags are replaced in the subject and body
+    substitutions: dict[str, str]
+
+
+def _personalization(recipient: BulkRecipient) -> dict:
+    personalization: dict = {"to": [{"email": recipient.email}]}
+    if recipient.substitutions:
+        personalization["substitutions"] = recipient.substitutions
+    return personalization
+
+
+def _rejected_indexes(resp: httpx.Response) -> dict[int, str]:
+    """Personalization index -> message for errors SendGrid ties to one recipient."""
+    try:
+        errors = resp.json().get("errors", [])
+    except ValueError:
+        return {}
+    rejected = {}
+    for error in errors:
+        parts = (error.get("field") or "").split(".")
+        if len(parts) > 1 and parts[0] == "personalizations" and parts[1].isdigit():
+            rejected[int(parts[1])] = error.get("message") or "rejected"
+    return rejected
+
+
+async def _send_batch(subject: str, html_content: str, batch: Sequence[BulkRecipient]) -> list[str | None]:
+    from app.services.http_clients import get_client
+
+    try:
+        resp = await get_client("sendgrid").post(
+            "/v3/mail/send",
+            headers={
+                "Authorization": f"Bearer {settings.SENDGRID_API_KEY}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "personalizations": [_personalization(r) for r in batch],
+                "from": {"email": settings.SENDGRID_FROM_EMAIL},
+                "subject": subject,
+                "content": [{"type": "text/html", "value": html_content}],
+            },
+        )
+    except httpx.HTTPError as e:
+        return [str(e) or type(e).__name__] * len(batch)
+    if resp.status_code in (200, 202):
+        return [None] * len(batch)
+
+    # SendGrid rejects the whole request for one bad address; drop the named
+    # recipients and send the rest again
+    rejected = _rejected_indexes(resp) if resp.status_code == 400 else {}
+    if not rejected or len(rejected) >= len(batch) or max(rejected) >= len(batch):
+        log.error("email.bulk_send_failed", recipients=len(batch), status=resp.status_code)
+        return [f"HTTP {resp.status_code}"] * len(batch)
+    keep = [i for i in range(len(batch)) if i not in rejected]
+    retried = await _send_batch(subject, html_content, [batch[i] for i in keep])
+    results: list[str | None] = [rejected.get(i) for i in range(len(batch))]
+    for i, outcome in zip(keep, retried, strict=True):
+        results[i] = outcome
+    return results
+
+
+async def send_bulk_email(subject: str, html_content: str, recipients: Sequence[BulkRecipient]) -> list[str | None]:
+    """Send one templated email to every recipient; returns an error message (or None) per recipient."""
+    if settings.MOCK_EMAIL:
+        log.info("email.mock_bulk_send", recipients=len(recipients), subject=subject)
+        return [None] * len(recipients)
+
+    size = max(1, min(settings.SENDGRID_BATCH_SIZE, SENDGRID_MAX_PERSONALIZATIONS))
+    results: list[str | None] = []
+    for i in range(0, len(recipients), size):
+        results.extend(await _send_batch(subject, html_content, recipients[i : i + size]))
+    return results
+
+
+async def send_bulk_notifications(
+    db: AsyncSession, notification_type: str, subject: str, html_content: str, recipients: Sequence[BulkRecipient]
+) -> dict[str, int]:
+    """Send a bulk email and record a ``Notification`` per recipient with its outcome.
+
+    Rows are committed as ``pending`` before sending, so a crash mid-send
+    leaves a trace of who may not have been reached.
+    """
+    rows = [
+        Notification(
+            user_id=r.user_id,
+            channel="email",
+            type=notification_type,
+            payload={"subject": subject, "substitutions": r.substitutions},
+        )
+        for r in recipients
+    ]
+    ids = [row.id for row in rows]
+    db.add_all(rows)
+    await db.commit()
+
+    outcomes = await send_bulk_email(subject, html_content, recipients)
+
+    now = datetime.now(timezone.utc)
+    sent_ids = []
+    # Error message -> rows; a failed batch shares one message, so this is one UPDATE per batch or rejection
+    failed: dict[str, list[uuid.UUID]] = defaultdict(list)
+    for row_id, error in zip(ids, outcomes, strict=True):
+        if error is None:
+            sent_ids.append(row_id)
+        else:
+            failed[error[:500]].append(row_id)
+    if sent_ids:
+        await db.execute(update(Notification).where(Notification.id.in_(sent_ids)).values(status="sent", sent_at=now))
+    for error, row_ids in failed.items():
+        await db.execute(
+            update(Notification).where(Notification.id.in_(row_ids)).values(status="failed", error_message=error)
+        )
+    await db.commit()
+    n_failed = sum(len(row_ids) for row_ids in failed.values())
+    log.info("email.bulk_sent", type=notification_type, sent=len(sent_ids), failed=n_failed)
+    return {"sent": len(sent_ids), "failed": n_failed}
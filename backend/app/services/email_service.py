@@ -11,23 +11,22 @@ async def send_email(to_email: str, subject: str, html_content: str) -> bool:
         log.info("email.mock_send", to=to_email, subject=subject, content_preview=html_content[:200])
         return True
 
-    import httpx
+    from app.services.http_clients import get_client
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            "https://api.sendgrid.com/v3/mail/send",
-            headers={
-                "Authorization": f"Bearer {settings.SENDGRID_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "personalizations": [{"to": [{"email": to_email}]}],
-                "from": {"email": settings.SENDGRID_FROM_EMAIL},
-                "subject": subject,
-                "content": [{"type": "text/html", "value": html_content}],
-            },
-        )
-        if resp.status_code not in (200, 202):
-            log.error("email.send_failed", to=to_email, status=resp.status_code)
-            return False
-        return True
+    resp = await get_client("sendgrid").post(
+        "/v3/mail/send",
+        headers={
+            "Authorization": f"Bearer {settings.SENDGRID_API_KEY}",
+            "Content-Type": "application/json",
+        },
+        json={
+            "personalizations": [{"to": [{"email": to_email}]}],
+            "from": {"email": settings.SENDGRID_FROM_EMAIL},
+            "subject": subject,
+            "content": [{"type": "text/html", "value": html_content}],
+        },
+    )
+    if resp.status_code not in (200, 202):
+        log.error("email.send_failed", to=to_email, status=resp.status_code)
+        return False
+    return True
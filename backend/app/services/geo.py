@@ -0,0 +1,97 @@
+"""Distance helpers and a uniform lat/lon grid over radius preferences.
+
+A radius preference is a circle around a point. Each circle is registered in
+every grid cell its bounding box touches, so a listing only needs the
+preferences of its own cell before the exact haversine check.
+"""
+
+import math
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+from app.models.preference import Preference
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = math.radians(EARTH_RADIUS_KM)
+# ~2.2 km north-south, ~1.4 km east-west at Dutch latitudes
+CELL_DEG = 0.02
+# Circles spanning more cells than this are checked for every listing instead
+MAX_CELLS_PER_PREF = 2500
+
+
+def has_radius(pref: Preference) -> bool:
+    return pref.radius_km is not None and pref.latitude is not None and pref.longitude is not None
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; accepts scalars or broadcastable NumPy arrays."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def within_radius(lat: float | None, lon: float | None, pref: Preference) -> bool:
+    """Whether a point lies in the preference's circle; always true without a radius."""
+    if not has_radius(pref):
+        return True
+    if lat is None or lon is None:
+        return False
+    return bool(haversine_km(lat, lon, pref.latitude, pref.longitude) <= pref.radius_km)
+
+
+def _cell(lat: float, lon: float) -> tuple[int, int]:
+    return math.floor(lat / CELL_DEG), math.floor(lon / CELL_DEG)
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> tuple[float, float, float, float]:
+    """``(lat_lo, lat_hi, lon_lo, lon_hi)`` of a box that contains the circle."""
+    # 0.1% slack so points on the circle itself never fall outside the box through rounding
+    dlat = radius_km * 1.001 / KM_PER_DEG_LAT
+    # Widest east-west extent is at the pole-ward edge of the circle
+    edge = min(abs(lat) + dlat, 89.0)
+    dlon = radius_km * 1.001 / (KM_PER_DEG_LAT * math.cos(math.radians(edge)))
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def _bounding_cells(lat: float, lon: float, radius_km: float) -> tuple[range, range]:
+    lat_lo, lat_hi, lon_lo, lon_hi = bounding_box(lat, lon, radius_km)
+    (i_lo, j_lo), (i_hi, j_hi) = _cell(lat_lo, lon_lo), _cell(lat_hi, lon_hi)
+    return range(i_lo, i_hi + 1), range(j_lo, j_hi + 1)
+
+
+class GeoGrid:
+    """Cell -> positions of the radius preferences whose circle may reach that cell.
+
+    Positions index into the ``prefs`` sequence the grid was built from.
+    Preferences without a radius are not in the grid; callers keep them as
+    unconditional candidates.
+    """
+
+    def __init__(self, prefs: Sequence[Preference]) -> None:
+        cells: dict[tuple[int, int], list[int]] = {}
+        wide: list[int] = []
+        for pos, pref in enumerate(prefs):
+            if not has_radius(pref):
+                continue
+            lat_cells, lon_cells = _bounding_cells(pref.latitude, pref.longitude, pref.radius_km)
+            if len(lat_cells) * len(lon_cells) > MAX_CELLS_PER_PREF:
+                wide.append(pos)
+                continue
+            for i in lat_cells:
+                for j in lon_cells:
+                    cells.setdefault((i, j), []).append(pos)
+        self._cells = {cell: np.array(v, dtype=np.int64) for cell, v in cells.items()}
+        self._wide = np.array(wide, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def near(self, points: Iterable[tuple[float, float]]) -> np.ndarray:
+        """Sorted positions of radius preferences that may contain any of ``points``."""
+        found = [self._wide]
+        for cell in {_cell(lat, lon) for lat, lon in points}:
+            posting = self._cells.get(cell)
+            if posting is not None:
+                found.append(posting)
+        return np.unique(np.concatenate(found))
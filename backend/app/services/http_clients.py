@@ -0,0 +1,57 @@
+"""Long-lived, pooled outbound HTTP clients for the notification services.
+
+One ``httpx.AsyncClient`` per service and event loop keeps TLS connections
+alive between messages (HTTP/2 when the ``h2`` package is installed). Clients
+are bound to the loop that created them: the API has a single loop, and every
+Dramatiq worker thread has its own persistent one (see ``app.workers.runtime``).
+``close_clients`` is called from the API shutdown hook and when a worker
+runtime closes.
+"""
+
+import asyncio
+import importlib.util
+import weakref
+
+import httpx
+import structlog
+
+from app.config import get_settings
+
+settings = get_settings()
+log = structlog.get_logger()
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _base_urls() -> dict[str, str]:
+    return {"telegram": settings.TELEGRAM_API_URL, "sendgrid": settings.SENDGRID_API_URL}
+
+
+def get_client(service: str) -> httpx.AsyncClient:
+    """The pooled client for ``service`` ("telegram" or "sendgrid") on the running loop."""
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(service)
+    if client is None or client.is_closed:
+        client = clients[service] = httpx.AsyncClient(
+            base_url=_base_urls()[service],
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_POOL_SIZE,
+                max_keepalive_connections=settings.HTTP_POOL_SIZE,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_SECONDS,
+            ),
+            timeout=httpx.Timeout(10.0, connect=5.0),
+        )
+        log.info("http_client.created", service=service, http2=HTTP2_AVAILABLE)
+    return client
+
+
+async def close_clients() -> None:
+    """Close the clients of the running loop."""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
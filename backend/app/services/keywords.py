@@ -0,0 +1,81 @@
+"""Keyword normalisation and a token-level inverted index over preference keywords.
+
+Listing text and preference keywords go through the same Dutch-aware
+normalisation (case folding, diacritics and ligatures such as ``ĳ`` folded,
+punctuation dropped), so "Gemeubileerd," and "gemeubileerd" hit the same key.
+Multi-word keywords are matched as contiguous token sequences.
+"""
+
+import re
+import unicodedata
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+from app.models.listing import Listing
+from app.models.preference import Preference
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str | None) -> list[str]:
+    if not text:
+        return []
+    # NFKD splits "ë" into "e" + combining mark and expands the "ĳ" ligature to "ij"
+    folded = unicodedata.normalize("NFKD", text.casefold())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return _TOKEN_RE.findall(folded)
+
+
+def normalize_keywords(keywords: Iterable[str] | None) -> set[tuple[str, ...]]:
+    """Distinct keywords of a preference as token tuples; blanks are dropped."""
+    return {tokens for tokens in (tuple(tokenize(k)) for k in keywords or ()) if tokens}
+
+
+def listing_ngrams(listing: Listing, max_len: int) -> set[tuple[str, ...]]:
+    """All token n-grams up to ``max_len`` in the listing's title and description."""
+    tokens = tokenize(listing.title) + tokenize(getattr(listing, "description", None))
+    grams: set[tuple[str, ...]] = set()
+    for n in range(1, max_len + 1):
+        grams.update(tuple(tokens[i : i + n]) for i in range(len(tokens) - n + 1))
+    return grams
+
+
+def keyword_fraction(listing: Listing, keywords: set[tuple[str, ...]]) -> float:
+    """Share of ``keywords`` (already normalised) that occur in the listing text."""
+    grams = listing_ngrams(listing, max(len(k) for k in keywords))
+    return sum(1 for k in keywords if k in grams) / len(keywords)
+
+
+class KeywordIndex:
+    """Inverted index from normalised keyword to the preferences that want it.
+
+    A listing's text is tokenised once and each of its n-grams is looked up,
+    instead of testing every preference's keywords against the text.
+    """
+
+    def __init__(self, prefs: Sequence[Preference]) -> None:
+        self.postings: dict[tuple[str, ...], list[int]] = {}
+        counts = np.zeros(len(prefs), dtype=np.int64)
+        for idx, pref in enumerate(prefs):
+            keywords = normalize_keywords(pref.keywords)
+            counts[idx] = len(keywords)
+            for keyword in keywords:
+                self.postings.setdefault(keyword, []).append(idx)
+        self.counts = counts
+        self.max_len = max((len(k) for k in self.postings), default=0)
+        self._postings_arrays = {k: np.array(v, dtype=np.int64) for k, v in self.postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def hits(self, listing: Listing) -> np.ndarray:
+        """Number of each preference's keywords found in the listing, shape ``(n_prefs,)``."""
+        hits = np.zeros(len(self.counts), dtype=np.int64)
+        if not self.postings:
+            return hits
+        for gram in listing_ngrams(listing, self.max_len):
+            posting = self._postings_arrays.get(gram)
+            if posting is not None:
+                hits[posting] += 1
+        return hits
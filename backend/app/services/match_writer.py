@@ -0,0 +1,117 @@
+import uuid
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.match import Match
+from app.models.preference import Preference
+from app.services.outbox import cancel_for_matches
+
+
+def dialect_insert(db: AsyncSession):
+    if db.bind.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert
+
+
+def match_row(user_id: uuid.UUID, listing_id: uuid.UUID, preference_id: uuid.UUID, score: float) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "user_id": user_id,
+        "listing_id": listing_id,
+        "preference_id": preference_id,
+        "score": score,
+        "notified": False,
+        "notification_channel": "none",
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+async def insert_matches(db: AsyncSession, rows: Iterable[dict]) -> list[uuid.UUID]:
+    """Bulk-insert match rows, skipping (user_id, listing_id) pairs that already exist.
+
+    Relies on the ``uq_match_user_listing`` constraint via ``ON CONFLICT``. A
+    retired match for the pair is revived with the row's preference and score
+    instead; it keeps its id, seen and notified state. Returns the ids to
+    announce: the rows inserted, and revived rows the user was never notified
+    about. When several preferences of one user match the same listing only the
+    best-scoring row is kept. The caller commits.
+    """
+    insert = dialect_insert(db)
+    best: dict[tuple, dict] = {}
+    for row in rows:
+        key = (row["user_id"], row["listing_id"])
+        if key not in best or row["score"] > best[key]["score"]:
+            best[key] = row
+    if not best:
+        return []
+    # Executed with a parameter list, SQLAlchemy renders multi-row VALUES pages
+    # ("insertmanyvalues") from one cached compiled statement
+    stmt = revive_on_conflict(insert(Match)).returning(Match.id, Match.notified)
+    result = await db.execute(stmt, list(best.values()))
+    return [match_id for match_id, notified in result.all() if not notified]
+
+
+def revive_on_conflict(stmt):
+    """``ON CONFLICT`` clause for match inserts: existing pairs are kept, retired ones revived."""
+    return stmt.on_conflict_do_update(
+        index_elements=["user_id", "listing_id"],
+        set_={
+            "preference_id": stmt.excluded.preference_id,
+            "score": stmt.excluded.score,
+            "retired_at": None,
+        },
+        where=Match.retired_at.is_not(None),
+    )
+
+
+async def drop_stale_rows(db: AsyncSession, rows: list[dict], prices: dict[uuid.UUID, int]) -> list[dict]:
+    """The match rows whose preference is still active and admits the listing's price in ``prices``.
+
+    A worker's preference index can lag Postgres until its next reconcile, so rows
+    scored from it are checked against the current preferences before insertion.
+    """
+    if not rows:
+        return rows
+    result = await db.execute(
+        select(Preference.id, Preference.min_price, Preference.max_price).where(
+            Preference.id.in_({row["preference_id"] for row in rows}), Preference.is_active.is_(True)
+        )
+    )
+    bands = {pref_id: (min_price, max_price) for pref_id, min_price, max_price in result.all()}
+    kept = []
+    for row in rows:
+        band = bands.get(row["preference_id"])
+        price = prices[row["listing_id"]]
+        if band is not None and (band[0] is None or band[0] <= price) and price <= band[1]:
+            kept.append(row)
+    return kept
+
+
+async def retire_matches(
+    db: AsyncSession, listing_id: uuid.UUID, preference_ids: Iterable[uuid.UUID]
+) -> set[uuid.UUID]:
+    """Retire the listing's live matches made through ``preference_ids``; returns the affected user ids.
+
+    Retired matches leave the feed but keep their seen and notified state and
+    their sent notifications; pending notifications are cancelled. The caller commits.
+    """
+    preference_ids = list(preference_ids)
+    if not preference_ids:
+        return set()
+    result = await db.execute(
+        select(Match.id, Match.user_id).where(
+            Match.listing_id == listing_id, Match.preference_id.in_(preference_ids), Match.retired_at.is_(None)
+        )
+    )
+    retired = result.all()
+    if not retired:
+        return set()
+    match_ids = [match_id for match_id, _ in retired]
+    await cancel_for_matches(db, match_ids)
+    await db.execute(update(Match).where(Match.id.in_(match_ids)).values(retired_at=datetime.now(timezone.utc)))
+    return {user_id for _, user_id in retired}
@@ -1,5 +1,7 @@
 from app.models.listing import Listing
 from app.models.preference import Preference
+from app.services.geo import within_radius
+from app.services.keywords import keyword_fraction, normalize_keywords
 
 WEIGHTS = {"city": 0.3, "price": 0.3, "rooms": 0.15, "size": 0.15, "extras": 0.1}
 MATCH_THRESHOLD = 0.5
@@ -10,6 +12,8 @@ def score_listing(listing: Listing, pref: Preference) -> float:
 
     if listing.city.lower() != pref.city.lower():
         return 0.0
+    if not within_radius(listing.latitude, listing.longitude, pref):
+        return 0.0
     score += WEIGHTS["city"]
 
     if pref.min_price is None or listing.price_eur >= pref.min_price:
@@ -38,6 +42,10 @@ def score_listing(listing: Listing, pref: Preference) -> float:
         extras_count += 1
         if listing.furnished == pref.furnished:
             extras_score += 1
+    keywords = normalize_keywords(pref.keywords)
+    if keywords:
+        extras_count += 1
+        extras_score += keyword_fraction(listing, keywords)
     if extras_count > 0:
         score += WEIGHTS["extras"] * (extras_score / extras_count)
 
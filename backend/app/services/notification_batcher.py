@@ -0,0 +1,126 @@
+"""Per-user coalescing of match notifications.
+
+Unnotified matches are the buffer. The first match of a user inside a window
+claims a Redis key and schedules one flush for the end of the window (or for
+the next digest time for users in digest mode); later matches see the claim
+and do nothing. The flush sends every unnotified match in one message.
+"""
+
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from html import escape
+from string import Template
+
+from app.config import get_settings
+from app.models.listing import Listing
+
+settings = get_settings()
+
+FLUSH_KEY = "notify:flush:{user_id}"
+# Held while an outbox sweep is scheduled, so only one sweep chain runs
+DISPATCH_KEY = "notify:dispatch"
+# Telegram caps a message at 4096 characters; longer batches link to the dashboard instead
+TELEGRAM_MAX_ITEMS = 15
+
+_redis = None
+
+
+def get_redis():
+    global _redis
+    if _redis is None:
+        import redis
+
+        _redis = redis.Redis.from_url(settings.REDIS_URL)
+    return _redis
+
+
+def claim_flush(redis_client, user_id: str, delay_ms: int) -> bool:
+    """True if no flush is pending for the user; the caller then schedules one."""
+    # The key outlives the delay a little so a late flush is never scheduled twice
+    return bool(redis_client.set(FLUSH_KEY.format(user_id=user_id), 1, nx=True, px=delay_ms + 60_000))
+
+
+def release_flush(redis_client, user_id: str) -> None:
+    redis_client.delete(FLUSH_KEY.format(user_id=user_id))
+
+
+def claim_dispatch(redis_client, interval_ms: int) -> bool:
+    """True if no outbox sweep is scheduled; the caller then starts one."""
+    return bool(redis_client.set(DISPATCH_KEY, 1, nx=True, px=interval_ms * 3))
+
+
+def renew_dispatch(redis_client, interval_ms: int) -> None:
+    # Lapses after a few missed sweeps, letting the next worker start restart the chain
+    redis_client.set(DISPATCH_KEY, 1, px=interval_ms * 3)
+
+
+def next_digest_delay_ms(now: datetime, hour: int) -> int:
+    """Milliseconds from ``now`` until the next ``hour``:00 in ``now``'s timezone."""
+    at = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if at <= now:
+        at += timedelta(days=1)
+    return int((at - now).total_seconds() * 1000)
+
+
+# Compiled once at import; messages only substitute listing fields into them. Telegram
+# messages use HTML too: legacy Markdown cannot escape a title inside link text, and one
+# unparsable title would fail a whole batch
+TELEGRAM_SINGLE = Template(
+    '<b>New Rental Match!</b>\n$title\nPrice: $price\nCity: $city\n<a href="$url">View listing</a>'
+)
+TELEGRAM_ITEM = Template('• <a href="$url">$title</a> — $price, $city')
+EMAIL_SINGLE = Template("<h2>New Rental Match</h2><p>$title</p><p>Price: $price</p><a href='$url'>View listing</a>")
+EMAIL_ITEM = Template("<li><a href='$url'>$title</a> — $price, $city</li>")
+EMAIL_BATCH = Template("<h2>$subject</h2><ul>$items</ul>")
+# -name- is left for SendGrid to substitute per recipient
+EMAIL_TRIAL_REMINDER = Template(
+    "<p>Hi -name-,</p><p>Your 7-day trial $ending. "
+    "<a href='http://localhost:5173/dashboard'>Upgrade now</a> to keep getting matches.</p>"
+)
+
+TRIAL_REMINDER_SUBJECTS = {
+    "48h": "Your Rentify trial ends in 48 hours",
+    "24h": "Last day of your Rentify trial!",
+}
+
+
+def _fields(listing: Listing) -> dict[str, str]:
+    return {
+        "title": listing.title,
+        "price": f"€{listing.price_eur // 100}/month",
+        "city": listing.city,
+        "url": listing.source_url,
+    }
+
+
+def _html_fields(listing: Listing) -> dict[str, str]:
+    return {key: escape(value) for key, value in _fields(listing).items()}
+
+
+def render_telegram(listings: Sequence[Listing], digest: bool = False) -> str:
+    """HTML message covering ``listings``; listing fields are HTML-escaped."""
+    if len(listings) == 1 and not digest:
+        return TELEGRAM_SINGLE.substitute(_html_fields(listings[0]))
+    header = "<b>Your daily Rentify digest</b>" if digest else f"<b>{len(listings)} New Rental Matches!</b>"
+    lines = [header]
+    lines.extend(TELEGRAM_ITEM.substitute(_html_fields(listing)) for listing in listings[:TELEGRAM_MAX_ITEMS])
+    if len(listings) > TELEGRAM_MAX_ITEMS:
+        lines.append(f"…and {len(listings) - TELEGRAM_MAX_ITEMS} more on your dashboard")
+    return "\n".join(lines)
+
+
+def render_email(listings: Sequence[Listing], digest: bool = False) -> tuple[str, str]:
+    """``(subject, html)`` for one email covering ``listings``; listing fields are HTML-escaped."""
+    if len(listings) == 1 and not digest:
+        return "New Rental Match!", EMAIL_SINGLE.substitute(_html_fields(listings[0]))
+    subject = (
+        f"Your daily Rentify digest: {len(listings)} matches" if digest else f"{len(listings)} New Rental Matches!"
+    )
+    items = "".join(EMAIL_ITEM.substitute(_html_fields(listing)) for listing in listings)
+    return subject, EMAIL_BATCH.substitute(subject=escape(subject), items=items)
+
+
+def render_trial_reminder(reminder_type: str) -> tuple[str, str]:
+    """``(subject, html)`` of a trial reminder, shared by all its recipients."""
+    subject = TRIAL_REMINDER_SUBJECTS.get(reminder_type, "Trial ending")
+    return subject, EMAIL_TRIAL_REMINDER.substitute(ending=TRIAL_REMINDER_SUBJECTS.get(reminder_type, "is ending soon"))
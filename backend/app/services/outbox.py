@@ -0,0 +1,207 @@
+"""Transactional outbox for match notifications.
+
+``enqueue_match_notifications`` adds a ``pending`` notification per new match
+in the caller's transaction, so a match is never committed without one.
+Dispatchers claim pending rows with ``SELECT ... FOR UPDATE SKIP LOCKED``,
+so any number of them can drain the outbox side by side. Each dispatcher sends
+the rows it claimed and settles them with bulk updates in the same transaction.
+A crash before the commit leaves the rows pending for the next dispatcher.
+A failed send is retried with exponential backoff. Delivery is at least once.
+"""
+
+import uuid
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, case, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.listing import Listing
+from app.models.match import Match
+from app.models.notification import Notification
+from app.models.user import User
+
+settings = get_settings()
+
+MATCH = "match"
+PENDING, SENT, FAILED, CANCELLED = "pending", "sent", "failed", "cancelled"
+
+
+def channel_for(telegram_chat_id: str | None) -> str:
+    return "telegram" if telegram_chat_id else "email"
+
+
+async def enqueue_match_notifications(db: AsyncSession, match_ids: Iterable[uuid.UUID]) -> int:
+    """Add a pending notification for each match; the caller commits with the matches."""
+    match_ids = list(match_ids)
+    if not match_ids:
+        return 0
+    result = await db.execute(
+        select(Match.id, Match.user_id, Match.listing_id, Match.score, User.telegram_chat_id)
+        .join(User, User.id == Match.user_id)
+        .where(Match.id.in_(match_ids))
+    )
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "match_id": match_id,
+            "channel": channel_for(chat_id),
+            "type": MATCH,
+            "status": PENDING,
+            "payload": {"listing_id": str(listing_id), "score": score},
+            "attempts": 0,
+            "created_at": now,
+        }
+        for match_id, user_id, listing_id, score, chat_id in result.all()
+    ]
+    if rows:
+        await db.execute(insert(Notification), rows)
+    return len(rows)
+
+
+def _claim(query, limit: int | None = None):
+    query = query.where(
+        Notification.status == PENDING,
+        Notification.type == MATCH,
+        or_(Notification.next_attempt_at.is_(None), Notification.next_attempt_at <= datetime.now(timezone.utc)),
+    )
+    if limit:
+        query = query.limit(limit)
+    # Lock only the outbox rows; SQLite renders no FOR UPDATE and relies on its single writer
+    return query.with_for_update(skip_locked=True, of=Notification)
+
+
+def _with_match_and_listing():
+    return (
+        select(Notification, Match, Listing)
+        .join(Match, Match.id == Notification.match_id)
+        .join(Listing, Listing.id == Match.listing_id)
+    )
+
+
+async def claim_for_user(db: AsyncSession, user_id: uuid.UUID) -> list[tuple[Notification, Match, Listing]]:
+    """Lock a user's pending match notifications, best score then newest first."""
+    query = (
+        _with_match_and_listing()
+        .where(Notification.user_id == user_id)
+        .order_by(Match.score.desc(), Match.created_at.desc())
+    )
+    result = await db.execute(_claim(query))
+    return [tuple(row) for row in result.all()]
+
+
+async def claim_matches(db: AsyncSession, match_ids: Iterable[uuid.UUID]) -> list[tuple[Notification, Match, Listing]]:
+    """Lock the pending notifications of ``match_ids``; each user's rows best score then newest first."""
+    query = (
+        _with_match_and_listing()
+        .where(Notification.match_id.in_(list(match_ids)))
+        .order_by(Notification.user_id, Match.score.desc(), Match.created_at.desc())
+    )
+    result = await db.execute(_claim(query))
+    return [tuple(row) for row in result.all()]
+
+
+async def claim_overdue(db: AsyncSession, limit: int) -> list[tuple[Notification, Match, Listing]]:
+    """Lock up to ``limit`` pending match notifications whose trigger should already have sent them.
+
+    That is rows older than the coalescing window plus one dispatch interval,
+    and for digest users rows older than a day plus one interval.
+    """
+    now = datetime.now(timezone.utc)
+    grace = timedelta(seconds=settings.NOTIFY_DISPATCH_INTERVAL_SECONDS)
+    instant_due = now - timedelta(seconds=settings.NOTIFY_COALESCE_SECONDS) - grace
+    digest_due = now - timedelta(days=1) - grace
+    query = (
+        _with_match_and_listing()
+        .join(User, User.id == Notification.user_id)
+        .where(
+            or_(
+                and_(User.notification_mode != "digest", Notification.created_at <= instant_due),
+                Notification.created_at <= digest_due,
+            )
+        )
+        .order_by(Notification.created_at)
+    )
+    result = await db.execute(_claim(query, limit))
+    return [tuple(row) for row in result.all()]
+
+
+async def mark_sent(
+    db: AsyncSession, notification_ids: list[uuid.UUID], match_ids: list[uuid.UUID], channel: str
+) -> None:
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        update(Notification)
+        .where(Notification.id.in_(notification_ids))
+        .values(status=SENT, sent_at=now, channel=channel, error_message=None)
+    )
+    await db.execute(
+        update(Match)
+        .where(Match.id.in_(match_ids))
+        .values(notified=True, notified_at=now, notification_channel=channel)
+    )
+
+
+async def mark_failed(db: AsyncSession, notification_ids: list[uuid.UUID], error: str) -> None:
+    """Count a failed attempt; rows stay pending for a retry until ``NOTIFY_MAX_ATTEMPTS``.
+
+    The retry is not claimed before ``NOTIFY_RETRY_BACKOFF_SECONDS``, doubled for
+    every earlier failure, so an outage does not use up the attempts in one sweep.
+    """
+    now = datetime.now(timezone.utc)
+    backoff = settings.NOTIFY_RETRY_BACKOFF_SECONDS
+    retry_at = case(
+        {attempts: now + timedelta(seconds=backoff * 2**attempts) for attempts in range(settings.NOTIFY_MAX_ATTEMPTS)},
+        value=Notification.attempts,
+        else_=now + timedelta(seconds=backoff * 2**settings.NOTIFY_MAX_ATTEMPTS),
+    )
+    await db.execute(
+        update(Notification)
+        .where(Notification.id.in_(notification_ids))
+        .values(
+            attempts=Notification.attempts + 1,
+            error_message=error[:500],
+            status=case((Notification.attempts + 1 >= settings.NOTIFY_MAX_ATTEMPTS, FAILED), else_=PENDING),
+            next_attempt_at=retry_at,
+        )
+    )
+
+
+async def mark_cancelled(db: AsyncSession, notification_ids: list[uuid.UUID]) -> None:
+    await db.execute(update(Notification).where(Notification.id.in_(notification_ids)).values(status=CANCELLED))
+
+
+async def cancel_for_matches(db: AsyncSession, match_ids: list[uuid.UUID]) -> None:
+    """Cancel the pending notifications of matches being retired."""
+    await db.execute(
+        update(Notification)
+        .where(Notification.match_id.in_(match_ids), Notification.status == PENDING)
+        .values(status=CANCELLED)
+    )
+
+
+async def backlog(db: AsyncSession) -> dict:
+    """Pending and failed match notification counts and the age of the oldest pending one.
+
+    Other notification types (e.g. bulk trial reminders) are recorded in the same
+    table but not delivered through the outbox, so they are left out.
+    """
+    result = await db.execute(
+        select(Notification.status, func.count(), func.min(Notification.created_at))
+        .where(Notification.type == MATCH, Notification.status.in_([PENDING, FAILED]))
+        .group_by(Notification.status)
+    )
+    by_status = {status: (count, oldest) for status, count, oldest in result.all()}
+    pending, oldest = by_status.get(PENDING, (0, None))
+    if oldest is not None and oldest.tzinfo is None:
+        oldest = oldest.replace(tzinfo=timezone.utc)
+    return {
+        "pending": pending,
+        "failed": by_status.get(FAILED, (0, None))[0],
+        "oldest_pending_seconds": (
+            round((datetime.now(timezone.utc) - oldest).total_seconds(), 1) if oldest is not None else None
+        ),
+    }
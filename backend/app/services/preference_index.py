@@ -0,0 +1,384 @@
+"""Per-city in-memory index of active preferences, pruned by price band and location.
+
+Each worker process keeps the active preferences of the cities it has matched
+against, sorted by ``min_price``, so a listing only visits preferences whose
+``[min_price, max_price]`` contains its price. Radius preferences are also
+bucketed on a lat/lon grid so only circles near the listing are considered. The API publishes every
+preference write to a Redis stream and the index replays that stream
+incrementally instead of reloading cities from Postgres; an edit costs a
+tombstone and a tail entry, not a rebuild of the city. Publishing is best
+effort, so every ``PREFERENCE_INDEX_RECONCILE_SECONDS`` a loaded city's
+version (row count and latest ``updated_at``) is compared with Postgres and the
+city is reloaded when they differ.
+"""
+
+import json
+import threading
+import time
+from collections.abc import Iterable
+
+import numpy as np
+import structlog
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.config import get_settings
+from app.models.preference import Preference
+from app.services.batch_scorer import PreferenceBlock
+from app.services.geo import GeoGrid, has_radius
+
+settings = get_settings()
+log = structlog.get_logger()
+
+CHANGES_STREAM = "preferences:changes"
+CHANGES_STREAM_MAXLEN = 100_000
+SYNC_BATCH_SIZE = 1000
+# Edits a city takes in its tail and tombstones before its sorted block is rebuilt
+COMPACT_AFTER_CHANGES = 128
+
+
+def _lower_bound(pref: Preference) -> float:
+    return float("-inf") if pref.min_price is None else float(pref.min_price)
+
+
+class _SortedBlock:
+    """A city's preferences packed for lookup: the preferences without a radius,
+    then the radius preferences, each part sorted by ``min_price``, with a grid
+    over the second part. Built once per compaction; entries are only ever
+    tombstoned through ``alive``.
+    """
+
+    def __init__(self, prefs: Iterable[Preference]) -> None:
+        plain, circles = [], []
+        for pref in prefs:
+            (circles if has_radius(pref) else plain).append(pref)
+        ordered = sorted(plain, key=_lower_bound) + sorted(circles, key=_lower_bound)
+        self.block = PreferenceBlock(ordered)
+        self.split = len(plain)  # first radius preference
+        self.lo = np.fromiter((_lower_bound(pref) for pref in ordered), dtype=np.float64, count=len(ordered))
+        self.hi = self.block.max_price
+        self.grid = GeoGrid(ordered[self.split :])
+        self.position = {str(pref.id): pos for pos, pref in enumerate(ordered)}
+        self.alive = np.ones(len(ordered), dtype=bool)
+        self.dead = 0
+
+    def __len__(self) -> int:
+        return len(self.position)
+
+    def tombstone(self, pref_id: str) -> None:
+        pos = self.position.get(pref_id)
+        if pos is not None and self.alive[pos]:
+            self.alive[pos] = False
+            self.dead += 1
+
+    def candidates(self, price: float, upper: float, points: Iterable[tuple[float, float]] | None) -> np.ndarray:
+        split = self.split
+        cut = int(np.searchsorted(self.lo[:split], upper, side="right"))
+        plain = np.nonzero(self.hi[:cut] >= price)[0]
+        if points is None:
+            cut = split + int(np.searchsorted(self.lo[split:], upper, side="right"))
+            circles = split + np.nonzero(self.hi[split:cut] >= price)[0]
+        else:
+            near = split + self.grid.near(points)
+            circles = near[(self.lo[near] <= upper) & (self.hi[near] >= price)]
+        found = np.concatenate([plain, circles])
+        return found[self.alive[found]]
+
+
+class CityPreferenceIndex:
+    """Active preferences of one city, ordered by ``min_price``.
+
+    The preferences are packed into a sorted block (columns, keyword index and
+    grid); lookups return sub-blocks. Rebuilding it takes about a second for a
+    large city, so edits do not: an edited or removed preference is tombstoned
+    in the block and the current version of an edited one appended to a small
+    unsorted tail, scanned on every lookup. Once ``COMPACT_AFTER_CHANGES`` edits
+    have piled up the block is rebuilt (``start_compaction`` and
+    ``finish_compaction``), off the registry lock.
+    """
+
+    def __init__(self, prefs: Iterable[Preference] = ()) -> None:
+        self._prefs: dict[str, Preference] = {str(pref.id): pref for pref in prefs}
+        self._sorted = _SortedBlock(self._prefs.values())
+        self._tail: dict[str, Preference] = {}
+        self._tail_block: PreferenceBlock | None = None
+        self._tail_lo = np.empty(0, dtype=np.float64)
+        # Preferences changed since a running compaction took its snapshot
+        self._changed: set[str] | None = None
+        # Postgres version the city was loaded at, and when it was last confirmed
+        self.version: tuple | None = None
+        self.checked_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._prefs)
+
+    def __contains__(self, pref_id: object) -> bool:
+        return str(pref_id) in self._prefs
+
+    def upsert(self, pref: Preference) -> None:
+        pref_id = str(pref.id)
+        self._prefs[pref_id] = pref
+        self._sorted.tombstone(pref_id)
+        self._tail[pref_id] = pref
+        self._changed_one(pref_id)
+
+    def remove(self, pref_id: object) -> bool:
+        pref_id = str(pref_id)
+        if self._prefs.pop(pref_id, None) is None:
+            return False
+        self._sorted.tombstone(pref_id)
+        self._tail.pop(pref_id, None)
+        self._changed_one(pref_id)
+        return True
+
+    def _changed_one(self, pref_id: str) -> None:
+        self._tail_block = None
+        if self._changed is not None:
+            self._changed.add(pref_id)
+
+    def candidates(
+        self, price: int, max_price: int | None = None, points: Iterable[tuple[float, float]] | None = None
+    ) -> PreferenceBlock:
+        """Preferences whose price band contains ``price``.
+
+        With ``max_price`` it returns those whose band overlaps ``[price, max_price]``,
+        i.e. the union of candidates for every price in that range. With ``points``
+        (listing coordinates) radius preferences are kept only if their circle may
+        contain one of them; without, all radius preferences are returned. Radius
+        preferences in the tail are returned whenever their band matches.
+        """
+        upper = price if max_price is None else max_price
+        found = self._sorted.block.take(self._sorted.candidates(price, upper, points))
+        if not self._tail:
+            return found
+        if self._tail_block is None:
+            self._tail_block = PreferenceBlock(list(self._tail.values()))
+            self._tail_lo = np.fromiter((_lower_bound(pref) for pref in self._tail_block.prefs), dtype=np.float64)
+        tail = self._tail_block
+        in_band = np.nonzero((self._tail_lo <= upper) & (tail.max_price >= price))[0]
+        return PreferenceBlock.concat([found, tail.take(in_band)])
+
+    def all(self) -> list[Preference]:
+        return list(self._prefs.values())
+
+    def needs_compaction(self) -> bool:
+        return self._changed is None and len(self._tail) + self._sorted.dead >= COMPACT_AFTER_CHANGES
+
+    def start_compaction(self) -> list[Preference]:
+        """Snapshot of the preferences to build the next sorted block from; edits from now on are tracked."""
+        self._changed = set()
+        return self.all()
+
+    def finish_compaction(self, sorted_block: _SortedBlock) -> None:
+        """Install a block built from the ``start_compaction`` snapshot, replaying edits made meanwhile."""
+        changed, self._changed = self._changed or set(), None
+        self._sorted = sorted_block
+        self._tail = {}
+        for pref_id in changed:
+            sorted_block.tombstone(pref_id)
+            if pref_id in self._prefs:
+                self._tail[pref_id] = self._prefs[pref_id]
+        self._tail_block = None
+
+    def compact(self) -> None:
+        self.finish_compaction(_SortedBlock(self.start_compaction()))
+
+
+class PreferenceIndex:
+    """Registry of per-city indexes kept fresh from the preference change stream."""
+
+    def __init__(self) -> None:
+        self._cities: dict[str, CityPreferenceIndex] = {}
+        self._city_of: dict[str, str] = {}
+        self._last_id: str | None = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def apply(self, payload: dict) -> None:
+        """Apply one published preference snapshot (upsert, or removal when inactive)."""
+        pref_id = payload["id"]
+        with self._lock:
+            old_city = self._city_of.pop(pref_id, None)
+            if old_city is not None:
+                self._cities[old_city].remove(pref_id)
+            city = payload["city"].lower()
+            # Cities that are not loaded yet pick the change up from Postgres on first use
+            if payload.get("is_active") and city in self._cities:
+                self._cities[city].upsert(Preference.model_validate(payload))
+                self._city_of[pref_id] = city
+
+    def load_city(self, city: str, prefs: list[Preference], version: tuple | None = None) -> CityPreferenceIndex:
+        key = city.lower()
+        index = CityPreferenceIndex(prefs)
+        index.version = version
+        with self._lock:
+            self._cities[key] = index
+            for pref in prefs:
+                self._city_of[str(pref.id)] = key
+        return index
+
+    def candidates(
+        self,
+        city: str,
+        price: int,
+        max_price: int | None = None,
+        points: Iterable[tuple[float, float]] | None = None,
+    ) -> PreferenceBlock | None:
+        """Price-band candidates in ``city``, or None when the city is not loaded."""
+        with self._lock:
+            index = self._cities.get(city.lower())
+            if index is None or not index.needs_compaction():
+                return None if index is None else index.candidates(price, max_price, points)
+            snapshot = index.start_compaction()
+        # Rebuilt without the lock: other threads keep matching against the current block meanwhile
+        sorted_block = _SortedBlock(snapshot)
+        with self._lock:
+            index.finish_compaction(sorted_block)
+            return index.candidates(price, max_price, points)
+
+    def due_for_reconcile(self, city: str, interval: float) -> bool:
+        """Whether ``city`` is loaded and its version was last confirmed over ``interval`` seconds ago."""
+        with self._lock:
+            index = self._cities.get(city.lower())
+            return index is not None and time.monotonic() - index.checked_at >= interval
+
+    def reconcile(self, city: str, version: tuple) -> bool:
+        """Compare ``city`` with its current Postgres version; drops the city when they differ.
+
+        Returns False when the city was dropped, so the next lookup reloads it.
+        """
+        key = city.lower()
+        with self._lock:
+            index = self._cities.get(key)
+            if index is None:
+                return False
+            if index.version == version:
+                index.checked_at = time.monotonic()
+                return True
+            del self._cities[key]
+            for pref_id in [pref_id for pref_id, of in self._city_of.items() if of == key]:
+                del self._city_of[pref_id]
+            return False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cities.clear()
+            self._city_of.clear()
+
+    def sync(self, redis_client) -> int:
+        """Replay stream entries published since the last sync. Returns the number applied."""
+        with self._sync_lock:
+            return self._sync(redis_client)
+
+    def _sync(self, redis_client) -> int:
+        if self._last_id is None:
+            # Fresh process: nothing is loaded yet, so start from the stream's tail
+            tail = redis_client.xrevrange(CHANGES_STREAM, count=1)
+            self._last_id = _decode(tail[0][0]) if tail else "0-0"
+            return 0
+
+        head = redis_client.xrange(CHANGES_STREAM, count=1)
+        trimmed = head and self._last_id != "0-0" and _stream_id(_decode(head[0][0])) > _stream_id(self._last_id)
+        if trimmed and self._cities:
+            # Entries we never saw were trimmed away; drop everything and reload lazily
+            log.warning("preference_index.stream_gap", last_id=self._last_id)
+            self.clear()
+
+        applied = 0
+        while True:
+            response = redis_client.xread({CHANGES_STREAM: self._last_id}, count=SYNC_BATCH_SIZE)
+            if not response:
+                return applied
+            _, entries = response[0]
+            for entry_id, fields in entries:
+                self.apply(json.loads(fields[b"payload"]))
+                self._last_id = _decode(entry_id)
+                applied += 1
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _stream_id(entry_id: str) -> tuple[int, int]:
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+preference_index = PreferenceIndex()
+_redis = None
+
+
+def _get_redis():
+    global _redis
+    if _redis is None:
+        import redis
+
+        _redis = redis.Redis.from_url(settings.REDIS_URL)
+    return _redis
+
+
+async def get_candidates(
+    db: AsyncSession,
+    city: str,
+    price: int,
+    max_price: int | None = None,
+    points: Iterable[tuple[float, float]] | None = None,
+) -> PreferenceBlock:
+    """Active preferences in ``city`` whose price band contains ``price`` (or overlaps ``[price, max_price]``).
+
+    ``points`` are the coordinates of the listings being matched; see ``CityPreferenceIndex.candidates``.
+    """
+    try:
+        preference_index.sync(_get_redis())
+    except Exception as e:
+        log.warning("preference_index.sync_failed", error=str(e))
+
+    # Catches changes whose stream entry was never published
+    due = preference_index.due_for_reconcile(city, settings.PREFERENCE_INDEX_RECONCILE_SECONDS)
+    if due and not preference_index.reconcile(city, await city_version(db, city)):
+        log.warning("preference_index.city_stale", city=city.lower())
+
+    candidates = preference_index.candidates(city, price, max_price, points)
+    if candidates is None:
+        # Read before the rows: a write in between makes the next reconcile reload again, not miss it
+        version = await city_version(db, city)
+        result = await db.execute(
+            select(Preference).where(func.lower(Preference.city) == city.lower(), Preference.is_active.is_(True))
+        )
+        index = preference_index.load_city(city, list(result.scalars().all()), version)
+        log.info("preference_index.city_loaded", city=city.lower(), size=len(index))
+        candidates = preference_index.candidates(city, price, max_price, points)
+    return candidates
+
+
+async def city_version(db: AsyncSession, city: str) -> tuple:
+    """Row count and latest ``updated_at`` of the city's preferences, active or not.
+
+    Every preference write bumps ``updated_at`` and preferences are only removed
+    by deactivation (or account deletion, which changes the count), so any
+    change to the city changes this.
+    """
+    result = await db.execute(
+        select(func.count(), func.max(Preference.updated_at)).where(func.lower(Preference.city) == city.lower())
+    )
+    count, updated_at = result.one()
+    return count, None if updated_at is None else str(updated_at)
+
+
+async def publish_preference_change(pref: Preference) -> None:
+    """Append a preference snapshot to the change stream consumed by the workers."""
+    try:
+        import redis.asyncio as aioredis
+
+        r = aioredis.from_url(settings.REDIS_URL)
+        await r.xadd(
+            CHANGES_STREAM,
+            {"payload": json.dumps(pref.model_dump(mode="json"))},
+            maxlen=CHANGES_STREAM_MAXLEN,
+            approximate=True,
+        )
+        await r.aclose()
+    except Exception as e:
+        log.warning("preference_index.publish_failed", pref_id=str(pref.id), error=str(e))
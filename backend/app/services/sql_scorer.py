@@ -0,0 +1,167 @@
+"""SQL counterpart of ``matcher.score_listing`` for bulk backfills.
+
+``score_expression`` evaluates the same score inside the database over a join
+of ``listings`` and ``preferences``, and ``insert_city_matches`` writes every
+qualifying pair of a city with one ``INSERT ... SELECT``. Preferences with
+keywords need the Python tokenizer and are left to the Python scorer.
+"""
+
+import uuid
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+from sqlalchemy import Boolean, DateTime, Float, String, and_, case, cast, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.listing import Listing
+from app.models.match import Match
+from app.models.preference import Preference
+from app.services.geo import EARTH_RADIUS_KM
+from app.services.match_writer import dialect_insert, revive_on_conflict
+from app.services.matcher import MATCH_THRESHOLD, WEIGHTS
+
+
+def _w(name: str) -> ColumnElement:
+    # Typed as float so Postgres adds doubles (as Python does) instead of NUMERIC
+    return literal(WEIGHTS[name], Float)
+
+
+def _truthy(col) -> ColumnElement:
+    # Python truthiness of Optional[number]
+    return func.coalesce(col, 0) != 0
+
+
+def _haversine_km(lat1, lon1, lat2, lon2) -> ColumnElement:
+    # Every operand typed as float, so Postgres divides doubles rather than casting to NUMERIC
+    lat1, lon1, lat2, lon2 = (func.radians(c, type_=Float) for c in (lat1, lon1, lat2, lon2))
+    half = literal(2.0, Float)
+    sin2_dlat = func.power(func.sin((lat2 - lat1) / half, type_=Float), 2, type_=Float)
+    sin2_dlon = func.power(func.sin((lon2 - lon1) / half, type_=Float), 2, type_=Float)
+    a = sin2_dlat + func.cos(lat1, type_=Float) * func.cos(lat2, type_=Float) * sin2_dlon
+    return 2 * literal(EARTH_RADIUS_KM, Float) * func.asin(func.sqrt(case((a > 1, 1.0), else_=a)))
+
+
+def _range_component(pref_min, pref_max, value, weight: str) -> ColumnElement:
+    in_range = and_(_truthy(value), value >= pref_min, value <= pref_max)
+    return case(
+        (and_(_truthy(pref_min), _truthy(pref_max)), case((in_range, _w(weight)), else_=0.0)),
+        (_truthy(value), _w(weight)),
+        else_=0.0,
+    )
+
+
+def _flag(condition) -> ColumnElement:
+    return case((condition, 1), else_=0)
+
+
+def score_expression() -> ColumnElement:
+    """``score_listing(Listing, Preference)`` as a SQL expression over the two tables."""
+    price_ok = and_(
+        or_(Preference.min_price.is_(None), Listing.price_eur >= Preference.min_price),
+        Listing.price_eur <= Preference.max_price,
+    )
+    pet_counted = and_(Preference.pet_friendly.is_(True), Listing.pet_friendly.is_not(None))
+    furnished_counted = and_(Preference.furnished.is_not(None), Listing.furnished.is_not(None))
+    extras_count = _flag(pet_counted) + _flag(furnished_counted)
+    extras_score = _flag(and_(pet_counted, Listing.pet_friendly.is_(True))) + _flag(
+        and_(furnished_counted, Listing.furnished == Preference.furnished)
+    )
+    extras = case(
+        (extras_count > 0, _w("extras") * (cast(extras_score, Float) / cast(extras_count, Float))),
+        else_=0.0,
+    )
+
+    # Same summation order as score_listing, so the doubles agree before rounding
+    score = (
+        literal(0.0, Float)
+        + _w("city")
+        + case((price_ok, _w("price")), else_=0.0)
+        + _range_component(Preference.min_rooms, Preference.max_rooms, Listing.rooms, "rooms")
+        + _range_component(Preference.min_size_sqm, Preference.max_size_sqm, Listing.size_sqm, "size")
+        + extras
+    )
+    # round(x, 3): without keywords every score is a whole number of thousandths
+    # up to float error, where half-up and Python's rounding agree
+    rounded = cast(func.floor(score * 1000 + 0.5), Float) / literal(1000.0, Float)
+
+    has_radius = and_(
+        Preference.radius_km.is_not(None), Preference.latitude.is_not(None), Preference.longitude.is_not(None)
+    )
+    inside = _haversine_km(Listing.latitude, Listing.longitude, Preference.latitude, Preference.longitude) <= (
+        Preference.radius_km
+    )
+    return case(
+        (func.lower(Listing.city) != func.lower(Preference.city), 0.0),
+        (and_(has_radius, or_(Listing.latitude.is_(None), Listing.longitude.is_(None))), 0.0),
+        (and_(has_radius, ~inside), 0.0),
+        else_=rounded,
+    )
+
+
+def sql_scorable() -> ColumnElement:
+    """Preferences ``score_expression`` covers: those without keywords."""
+    # Python None is stored as JSON null by the JSON column
+    return or_(Preference.keywords.is_(None), cast(Preference.keywords, String).in_(["null", "[]"]))
+
+
+async def insert_city_matches(
+    db: AsyncSession, city: str, preference_ids: Iterable[uuid.UUID] | None = None
+) -> list[uuid.UUID]:
+    """Score every live listing of ``city`` against its active keyword-free preferences in SQL.
+
+    Qualifying pairs go straight into ``matches`` (best preference per user and
+    listing, existing pairs skipped and retired ones revived) in one statement;
+    returns the new and revived match ids. The caller commits.
+    """
+    score = score_expression()
+    conditions = [
+        func.lower(Listing.city) == city.lower(),
+        Listing.delisted_at.is_(None),
+        Preference.is_active.is_(True),
+        Listing.price_eur <= Preference.max_price,
+        or_(Preference.min_price.is_(None), Listing.price_eur >= Preference.min_price),
+        sql_scorable(),
+    ]
+    if preference_ids is not None:
+        conditions.append(Preference.id.in_(list(preference_ids)))
+    scored = (
+        select(
+            Preference.user_id,
+            Listing.id.label("listing_id"),
+            Preference.id.label("preference_id"),
+            score.label("score"),
+            func.row_number().over(partition_by=(Preference.user_id, Listing.id), order_by=score.desc()).label("rank"),
+        )
+        .select_from(Listing)
+        .join(Preference, func.lower(Preference.city) == func.lower(Listing.city))
+        .where(*conditions)
+        .subquery()
+    )
+
+    sqlite = db.bind.dialect.name == "sqlite"
+    new_id = func.lower(func.hex(func.randomblob(16))) if sqlite else func.gen_random_uuid()
+    rows = select(
+        new_id,
+        scored.c.user_id,
+        scored.c.listing_id,
+        scored.c.preference_id,
+        scored.c.score,
+        literal(False, Boolean),
+        literal("none", String),
+        literal(datetime.now(timezone.utc), DateTime(timezone=True)),
+    ).where(scored.c.rank == 1, scored.c.score >= MATCH_THRESHOLD)
+
+    columns = [
+        "id",
+        "user_id",
+        "listing_id",
+        "preference_id",
+        "score",
+        "notified",
+        "notification_channel",
+        "created_at",
+    ]
+    stmt = revive_on_conflict(dialect_insert(db)(Match).from_select(columns, rows)).returning(Match.id)
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
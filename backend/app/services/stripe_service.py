@@ -5,6 +5,7 @@ from datetime import datetime, timedelta, timezone
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
+from starlette.concurrency import run_in_threadpool
 
 from app.config import get_settings
 from app.models.user import User
@@ -126,6 +127,7 @@ async def _handle_checkout_completed(data: dict, db: AsyncSession) -> None:
         user.trial_ends_at = datetime.now(timezone.utc) + timedelta(days=7)
         user.updated_at = datetime.now(timezone.utc)
         await db.commit()
+        await _sync_trial_reminders(user)
 
 
 async def _handle_invoice_paid(data: dict, db: AsyncSession) -> None:
@@ -138,6 +140,7 @@ async def _handle_invoice_paid(data: dict, db: AsyncSession) -> None:
         user.subscription_status = "active"
         user.updated_at = datetime.now(timezone.utc)
         await db.commit()
+        await _sync_trial_reminders(user)
 
 
 async def _handle_payment_failed(data: dict, db: AsyncSession) -> None:
@@ -150,6 +153,7 @@ async def _handle_payment_failed(data: dict, db: AsyncSession) -> None:
         user.subscription_status = "past_due"
         user.updated_at = datetime.now(timezone.utc)
         await db.commit()
+        await _sync_trial_reminders(user)
 
 
 async def _handle_subscription_deleted(data: dict, db: AsyncSession) -> None:
@@ -162,6 +166,7 @@ async def _handle_subscription_deleted(data: dict, db: AsyncSession) -> None:
         user.subscription_status = "canceled"
         user.updated_at = datetime.now(timezone.utc)
         await db.commit()
+        await _sync_trial_reminders(user)
 
 
 async def _handle_subscription_updated(data: dict, db: AsyncSession) -> None:
@@ -176,6 +181,31 @@ async def _handle_subscription_updated(data: dict, db: AsyncSession) -> None:
         user.subscription_status = status
         user.updated_at = datetime.now(timezone.utc)
         await db.commit()
+        await _sync_trial_reminders(user)
+
+
+async def _sync_trial_reminders(user: User) -> None:
+    """Keep the user's scheduled trial reminders in line with their subscription status.
+
+    The scheduler talks to Redis and the broker synchronously, so it runs in the
+    threadpool rather than blocking the event loop serving the webhook.
+    """
+    user_id = str(user.id)
+    trial_ends_at = user.trial_ends_at if user.subscription_status == "trialing" else None
+    try:
+        await run_in_threadpool(_apply_trial_reminders, user_id, trial_ends_at)
+    except Exception as e:
+        log.warning("trial_reminders.sync_failed", user_id=user_id, error=str(e))
+
+
+def _apply_trial_reminders(user_id: str, trial_ends_at: datetime | None) -> None:
+    import app.workers.worker  # noqa: F401  # configures the Redis broker
+    from app.tasks.reminders import cancel_trial_reminders, schedule_trial_reminders
+
+    if trial_ends_at:
+        schedule_trial_reminders(user_id, trial_ends_at)
+    else:
+        cancel_trial_reminders(user_id)
 
 
 async def cancel_subscription(stripe_customer_id: str) -> None:
@@ -0,0 +1,150 @@
+"""Redis token buckets pacing Telegram sends across all worker processes.
+
+Telegram allows a bot about 30 messages/second overall and about one per
+second per chat. Every send takes a token from a global bucket and from its
+chat's bucket in one Lua call, so all processes share the limits.
+
+Within a chat, senders take a ticket first and are served in ticket order, so
+queued messages keep their order. A ticket whose sender stops polling (a
+crashed worker) is skipped after ``TELEGRAM_QUEUE_STALL_SECONDS``.
+
+After a 429, ``back_off`` blocks the chat for ``retry_after`` seconds. Once the
+block ends, the message that got the 429 is served before any queued ticket.
+"""
+
+import asyncio
+
+import structlog
+
+from app.config import get_settings
+
+settings = get_settings()
+log = structlog.get_logger()
+
+GLOBAL_KEY = "tg:limit:global"
+CHAT_KEY = "tg:limit:chat:{chat_id}"
+# Ticket for re-sending a message that got a 429; it skips the chat's queue
+RETRY = -1
+
+_ACQUIRE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local ticket = tonumber(ARGV[1])
+local g_rate, g_burst = tonumber(ARGV[2]), tonumber(ARGV[3])
+local c_rate, c_burst = tonumber(ARGV[4]), tonumber(ARGV[5])
+local stall_ms = tonumber(ARGV[6])
+
+local function bucket(key, rate, burst)
+  local v = redis.call('HMGET', key, 'tokens', 'ts', 'blocked_until')
+  local tokens = tonumber(v[1]) or burst
+  local ts = tonumber(v[2]) or now
+  tokens = math.min(burst, tokens + (now - ts) * rate / 1000)
+  local blocked = tonumber(v[3]) or 0
+  if blocked > now then
+    return tokens, blocked - now
+  end
+  if tokens < 1 then
+    return tokens, math.ceil((1 - tokens) * 1000 / rate)
+  end
+  return tokens, 0
+end
+
+redis.call('PEXPIRE', KEYS[2], 3600000)
+local served = tonumber(redis.call('HGET', KEYS[2], 'served')) or 0
+if ticket == -1 then
+  -- retry of a message that got a 429
+elseif ticket == served + 1 then
+  redis.call('HSET', KEYS[2], 'head_seen', now)
+  local retry_until = tonumber(redis.call('HGET', KEYS[2], 'retry_until')) or 0
+  if retry_until > now then
+    -- ask again once the block is over and the retry has had its turn
+    local blocked = tonumber(redis.call('HGET', KEYS[2], 'blocked_until')) or 0
+    return math.max(blocked - now, 0) + math.ceil(1000 / c_rate)
+  end
+elseif ticket > served + 1 then
+  local head_seen = tonumber(redis.call('HGET', KEYS[2], 'head_seen'))
+  if not head_seen then
+    redis.call('HSET', KEYS[2], 'head_seen', now)
+  elseif now - head_seen > stall_ms then
+    -- the sender of the head ticket stopped polling
+    served = served + 1
+    redis.call('HSET', KEYS[2], 'served', served, 'head_seen', now)
+  end
+  if ticket ~= served + 1 then
+    return math.ceil(1000 / c_rate)
+  end
+end
+
+local g_tokens, g_wait = bucket(KEYS[1], g_rate, g_burst)
+local c_tokens, c_wait = bucket(KEYS[2], c_rate, c_burst)
+local wait = math.max(g_wait, c_wait)
+if wait > 0 then
+  return wait
+end
+redis.call('HSET', KEYS[1], 'tokens', g_tokens - 1, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 3600000)
+redis.call('HSET', KEYS[2], 'tokens', c_tokens - 1, 'ts', now)
+if ticket == -1 then
+  redis.call('HDEL', KEYS[2], 'retry_until')
+elseif ticket == served + 1 then
+  redis.call('HSET', KEYS[2], 'served', ticket)
+end
+return 0
+"""
+
+_BACK_OFF = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local until_ms = now + tonumber(ARGV[1])
+redis.call('HSET', KEYS[1], 'blocked_until', until_ms, 'retry_until', until_ms + tonumber(ARGV[2]))
+redis.call('PEXPIRE', KEYS[1], 3600000)
+"""
+
+
+class TelegramRateLimiter:
+    def __init__(
+        self,
+        redis_client,
+        global_rate: float | None = None,
+        chat_rate: float | None = None,
+        stall_seconds: float | None = None,
+    ) -> None:
+        self.redis = redis_client
+        self.global_rate = global_rate or settings.TELEGRAM_GLOBAL_RATE
+        self.chat_rate = chat_rate or settings.TELEGRAM_CHAT_RATE
+        self.stall_ms = int((stall_seconds or settings.TELEGRAM_QUEUE_STALL_SECONDS) * 1000)
+        self._acquire = redis_client.register_script(_ACQUIRE)
+        self._back_off = redis_client.register_script(_BACK_OFF)
+
+    def take_ticket(self, chat_id: str) -> int:
+        return self.redis.hincrby(CHAT_KEY.format(chat_id=chat_id), "issued", 1)
+
+    def try_acquire(self, chat_id: str, ticket: int) -> int:
+        """0 if the message may be sent now, else milliseconds to wait before asking again."""
+        return int(
+            self._acquire(
+                keys=[GLOBAL_KEY, CHAT_KEY.format(chat_id=chat_id)],
+                args=[ticket, self.global_rate, self.global_rate, self.chat_rate, 1, self.stall_ms],
+            )
+        )
+
+    async def acquire(self, chat_id: str, ticket: int) -> None:
+        while wait_ms := self.try_acquire(chat_id, ticket):
+            # Poll well within the stall timeout so a live ticket is never skipped
+            await asyncio.sleep(min(wait_ms, self.stall_ms / 3) / 1000)
+
+    def back_off(self, chat_id: str, retry_after: float) -> None:
+        """Block ``chat_id`` for ``retry_after`` seconds after a 429."""
+        self._back_off(keys=[CHAT_KEY.format(chat_id=chat_id)], args=[int(retry_after * 1000), self.stall_ms])
+
+
+_limiter: TelegramRateLimiter | None = None
+
+
+def get_limiter() -> TelegramRateLimiter:
+    global _limiter
+    if _limiter is None:
+        from app.services.notification_batcher import get_redis
+
+        _limiter = TelegramRateLimiter(get_redis())
+    return _limiter
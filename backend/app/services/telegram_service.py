@@ -1,3 +1,5 @@
+import asyncio
+
 import structlog
 
 from app.config import get_settings
@@ -11,12 +13,33 @@ async def send_telegram_message(chat_id: str, text: str) -> bool:
         log.info("telegram.mock_send", chat_id=chat_id, text=text)
         return True
 
-    import httpx
+    from app.services.http_clients import get_client
+    from app.services.telegram_limiter import RETRY, get_limiter
 
-    url = f"https://api.telegram.org/bot{settings.TELEGRAM_BOT_TOKEN}/sendMessage"
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(url, json={"chat_id": chat_id, "text": text, "parse_mode": "Markdown"})
-        if resp.status_code != 200:
-            log.error("telegram.send_failed", chat_id=chat_id, status=resp.status_code)
-            return False
-        return True
+    try:
+        limiter = get_limiter()
+        await limiter.acquire(chat_id, limiter.take_ticket(chat_id))
+    except Exception as e:
+        # Redis down: send unpaced rather than not at all
+        log.warning("telegram.limiter_unavailable", chat_id=chat_id, error=str(e))
+        limiter = None
+
+    for attempt in range(settings.TELEGRAM_MAX_RETRIES + 1):
+        resp = await get_client("telegram").post(
+            f"/bot{settings.TELEGRAM_BOT_TOKEN}/sendMessage",
+            json={"chat_id": chat_id, "text": text, "parse_mode": "HTML"},
+        )
+        if resp.status_code != 429 or attempt == settings.TELEGRAM_MAX_RETRIES:
+            break
+        retry_after = resp.json().get("parameters", {}).get("retry_after", 1)
+        log.warning("telegram.rate_limited", chat_id=chat_id, retry_after=retry_after, attempt=attempt + 1)
+        if limiter:
+            limiter.back_off(chat_id, retry_after)
+        await asyncio.sleep(retry_after)
+        if limiter:
+            await limiter.acquire(chat_id, RETRY)
+
+    if resp.status_code != 200:
+        log.error("telegram.send_failed", chat_id=chat_id, status=resp.status_code)
+        return False
+    return True
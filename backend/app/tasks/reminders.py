@@ -1,17 +1,198 @@
-"""Scheduled reminder tasks — enqueued from Stripe webhook handler."""
-from datetime import timedelta
+"""Trial reminder scheduling on a Redis sorted set.
+
+Every pending reminder is a member ``<user_id>:<type>`` of ``REMINDERS_KEY``,
+scored by its due time in epoch milliseconds. A single delayed
+``dispatch_trial_reminders`` message waits for the earliest due time. When it
+runs it pops everything due in batches, drops users who are no longer
+trialing, and hands each batch to ``send_trial_reminders`` as one bulk email.
+It then reschedules itself for the next due time.
+
+Reminders are added when a trial starts and removed when it ends, so the
+users table is only read by primary key.
+"""
+
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
 
 import structlog
 
+from app.config import get_settings
+
+settings = get_settings()
 log = structlog.get_logger()
 
+REMINDERS_KEY = "reminders:trial"
+# Due time (epoch ms) of the dispatch message currently scheduled
+WAKE_KEY = "reminders:trial:wake"
+REMINDER_OFFSETS = {"48h": timedelta(hours=48), "24h": timedelta(hours=24)}
+
+_POP_DUE = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #due > 0 then
+  redis.call('ZREM', KEYS[1], unpack(due))
+end
+return due
+"""
+
+# Claims the wake-up at ARGV[1] unless one is already scheduled no later than that
+_CLAIM_WAKE = """
+local current = tonumber(redis.call('GET', KEYS[1]))
+local at, now = tonumber(ARGV[1]), tonumber(ARGV[2])
+if current and current <= at and current > now then
+  return 0
+end
+redis.call('SET', KEYS[1], at, 'PX', math.max(at - now, 0) + 3600000)
+return 1
+"""
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _redis():
+    from app.services.notification_batcher import get_redis
+
+    return get_redis()
+
+
+def _wake_at(redis_client, at_ms: int) -> None:
+    """Schedule a dispatch for ``at_ms`` unless an earlier one is already pending."""
+    from app.workers.tasks import dispatch_trial_reminders
+
+    now = _now_ms()
+    if redis_client.eval(_CLAIM_WAKE, 1, WAKE_KEY, at_ms, now):
+        dispatch_trial_reminders.send_with_options(delay=max(at_ms - now, 0))
+
+
+def _due_times(user_id: str, trial_ends_at: datetime) -> dict[str, int]:
+    """Due times of the reminders still to send for a trial ending at ``trial_ends_at``.
+
+    A reminder whose slot has passed is dropped; only the latest of those is
+    kept, due now, and only when no later reminder is still ahead. A trial
+    ending in under 24 hours thus gets just the 24h reminder.
+    """
+    if trial_ends_at.tzinfo is None:
+        trial_ends_at = trial_ends_at.replace(tzinfo=timezone.utc)
+    now = datetime.now(timezone.utc)
+    if trial_ends_at <= now:
+        return {}
+    due, passed = {}, None
+    for kind, offset in sorted(REMINDER_OFFSETS.items(), key=lambda item: item[1], reverse=True):
+        at = trial_ends_at - offset
+        if at > now:
+            due[f"{user_id}:{kind}"] = int(at.timestamp() * 1000)
+        else:
+            passed = kind
+    if passed and not due:
+        due[f"{user_id}:{passed}"] = int(now.timestamp() * 1000)
+    return due
+
+
+def schedule_trial_reminders(user_id: str, trial_ends_at: datetime, redis_client=None) -> None:
+    """Add (or move) the user's 48h and 24h reminders for a trial ending at ``trial_ends_at``."""
+    due = _due_times(user_id, trial_ends_at)
+    if not due:
+        return
+    redis_client = redis_client or _redis()
+    # A moved trial end can leave a reminder whose slot has passed
+    if stale := [f"{user_id}:{kind}" for kind in REMINDER_OFFSETS if f"{user_id}:{kind}" not in due]:
+        redis_client.zrem(REMINDERS_KEY, *stale)
+    redis_client.zadd(REMINDERS_KEY, due)
+    _wake_at(redis_client, min(due.values()))
+    log.info("trial_reminders.scheduled", user_id=user_id, trial_ends_at=trial_ends_at.isoformat())
+
+
+def cancel_trial_reminders(user_id: str, redis_client=None) -> None:
+    redis_client = redis_client or _redis()
+    redis_client.zrem(REMINDERS_KEY, *(f"{user_id}:{kind}" for kind in REMINDER_OFFSETS))
+
+
+def ensure_reminder_wakeup(redis_client=None) -> None:
+    """Schedule a dispatch for the earliest pending reminder, e.g. after a lost wake-up message."""
+    redis_client = redis_client or _redis()
+    head = redis_client.zrange(REMINDERS_KEY, 0, 0, withscores=True)
+    if head:
+        _wake_at(redis_client, int(head[0][1]))
+
+
+async def dispatch_due_reminders(redis_client=None) -> int:
+    """Send every reminder that is due, in batches, then schedule the next wake-up."""
+    from sqlmodel import select
+
+    from app.models.user import User
+    from app.workers.runtime import worker_session
+    from app.workers.tasks import send_trial_reminders
+
+    redis_client = redis_client or _redis()
+    batch_size = settings.TRIAL_REMINDER_BATCH_SIZE
+    dispatched = 0
+    while batch := redis_client.eval(_POP_DUE, 1, REMINDERS_KEY, _now_ms(), batch_size):
+        by_kind: dict[str, list[str]] = defaultdict(list)
+        for member in batch:
+            user_id, kind = member.decode().rsplit(":", 1)
+            by_kind[kind].append(user_id)
+
+        # Primary-key lookup: users who converted, cancelled or left since are skipped
+        async with worker_session() as db:
+            result = await db.execute(
+                select(User.id).where(
+                    User.id.in_([uuid.UUID(u) for ids in by_kind.values() for u in ids]),
+                    User.subscription_status == "trialing",
+                    User.deleted_at.is_(None),
+                )
+            )
+            trialing = {str(user_id) for user_id in result.scalars().all()}
+        for kind, user_ids in by_kind.items():
+            if still := [u for u in user_ids if u in trialing]:
+                send_trial_reminders.send(still, kind)
+                dispatched += len(still)
+        if len(batch) < batch_size:
+            break
+
+    log.info("trial_reminders.dispatched", reminders=dispatched)
+    ensure_reminder_wakeup(redis_client)
+    return dispatched
+
+
+async def rebuild_trial_reminders(redis_client=None, chunk_size: int = 5000) -> int:
+    """One-off: schedule reminders for every user already trialing, e.g. after deploying the scheduler.
+
+    Walks trialing users in primary-key order in chunks; not meant to run periodically.
+    """
+    from sqlmodel import select
 
-def schedule_trial_reminders(user_id: str) -> None:
-    """Enqueue trial reminder tasks with delays."""
-    from app.workers.tasks import send_trial_reminder
+    from app.models.user import User
+    from app.workers.runtime import worker_session
 
-    # 48h reminder at day 5 (5 days * 24 * 60 * 60 * 1000 ms)
-    send_trial_reminder.send_with_options(args=(user_id, "48h"), delay=5 * 24 * 60 * 60 * 1000)
-    # 24h reminder at day 6
-    send_trial_reminder.send_with_options(args=(user_id, "24h"), delay=6 * 24 * 60 * 60 * 1000)
-    log.info("trial_reminders.scheduled", user_id=user_id)
+    redis_client = redis_client or _redis()
+    scheduled, last_id = 0, None
+    while True:
+        query = (
+            select(User.id, User.trial_ends_at)
+            .where(
+                User.subscription_status == "trialing",
+                User.trial_ends_at > datetime.now(timezone.utc),
+                User.deleted_at.is_(None),
+            )
+            .order_by(User.id)
+            .limit(chunk_size)
+        )
+        if last_id is not None:
+            query = query.where(User.id > last_id)
+        async with worker_session() as db:
+            rows = (await db.execute(query)).all()
+        due: dict[str, int] = {}
+        for user_id, trial_ends_at in rows:
+            due.update(_due_times(str(user_id), trial_ends_at))
+        if due:
+            redis_client.zadd(REMINDERS_KEY, due)
+        scheduled += len(rows)
+        if len(rows) < chunk_size:
+            break
+        last_id = rows[-1][0]
+    ensure_reminder_wakeup(redis_client)
+    log.info("trial_reminders.rebuilt", users=scheduled)
+    return scheduled
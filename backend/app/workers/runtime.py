@@ -0,0 +1,88 @@
+"""Long-lived asyncio runtime for Dramatiq worker threads.
+
+Actors are synchronous, so each worker thread lazily gets one event loop and one
+async engine that live for the lifetime of the thread. Coroutines submitted
+with ``run_async`` reuse both, which keeps the asyncpg pool (and the pooled
+outbound HTTP clients) warm across messages instead of building and tearing
+down a loop per message.
+"""
+
+import asyncio
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+import structlog
+from dramatiq.middleware import Middleware
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import get_settings
+
+settings = get_settings()
+log = structlog.get_logger()
+
+T = TypeVar("T")
+
+_local = threading.local()
+
+
+class AsyncRuntime:
+    def __init__(self, database_url: str | None = None) -> None:
+        url = database_url or settings.DATABASE_URL
+        engine_kwargs: dict[str, Any] = {"future": True, "pool_pre_ping": True}
+        if not url.startswith("sqlite"):
+            engine_kwargs.update(pool_size=settings.WORKER_DB_POOL_SIZE, max_overflow=settings.WORKER_DB_POOL_SIZE)
+        self.loop = asyncio.new_event_loop()
+        self.engine = create_async_engine(url, **engine_kwargs)
+        self.session_factory = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        return self.loop.run_until_complete(coro)
+
+    def close(self) -> None:
+        from app.services.http_clients import close_clients
+
+        try:
+            self.loop.run_until_complete(close_clients())
+            self.loop.run_until_complete(self.engine.dispose())
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        finally:
+            self.loop.close()
+
+
+def get_runtime() -> AsyncRuntime:
+    runtime = getattr(_local, "runtime", None)
+    if runtime is None:
+        runtime = _local.runtime = AsyncRuntime()
+        log.info("worker_runtime.started", thread=threading.current_thread().name)
+    return runtime
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run ``coro`` to completion on this thread's persistent event loop."""
+    return get_runtime().run(coro)
+
+
+def worker_session() -> AsyncSession:
+    """A session bound to this thread's engine, or the app-wide one outside a worker runtime."""
+    runtime = getattr(_local, "runtime", None)
+    if runtime is None:
+        from app.db import session
+
+        return session.AsyncSessionLocal()
+    return runtime.session_factory()
+
+
+def shutdown_runtime() -> None:
+    runtime = getattr(_local, "runtime", None)
+    if runtime is not None:
+        _local.runtime = None
+        runtime.close()
+        log.info("worker_runtime.stopped", thread=threading.current_thread().name)
+
+
+class AsyncRuntimeMiddleware(Middleware):
+    """Disposes the thread's engine and closes its loop when the worker thread stops."""
+
+    def before_worker_thread_shutdown(self, broker, thread) -> None:
+        shutdown_runtime()
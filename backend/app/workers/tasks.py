@@ -7,129 +7,554 @@ import dramatiq
 
 log = structlog.get_logger()
 
+BACKFILL_CHUNK_SIZE = 5000
+# Listings scored per dense (listings x candidates) matrix, bounding peak memory in large cities
+SCORE_CHUNK_SIZE = 32
+# Match ids per notify_users message
+NOTIFY_BATCH_SIZE = 500
+
 
 @dramatiq.actor(queue_name="matching")
 def match_listing(listing_id: str) -> None:
-    import asyncio
+    from app.workers.runtime import run_async
 
-    asyncio.run(_match_listing_async(listing_id))
+    run_async(_match_listing_async(listing_id))
 
 
 async def _match_listing_async(listing_id: str) -> None:
-    from sqlalchemy.ext.asyncio import AsyncSession
+    await _match_listings_async([listing_id])
+
+
+@dramatiq.actor(queue_name="matching")
+def match_listings(listing_ids: list[str]) -> None:
+    from app.workers.runtime import run_async
+
+    run_async(_match_listings_async(listing_ids))
+
+
+async def _match_listings_async(listing_ids: list[str]) -> None:
+    from collections import defaultdict
+
     from sqlmodel import select
 
-    from app.db.session import AsyncSessionLocal
     from app.models.listing import Listing
-    from app.models.match import Match
+    from app.services.match_writer import drop_stale_rows, insert_matches, match_row
+    from app.services.matcher import MATCH_THRESHOLD
+    from app.services.outbox import enqueue_match_notifications
+    from app.services.preference_index import get_candidates
+    from app.workers.runtime import worker_session
+
+    async with worker_session() as db:
+        result = await db.execute(select(Listing).where(Listing.id.in_([uuid.UUID(i) for i in listing_ids])))
+        listings = result.scalars().all()
+        if len(listings) < len(listing_ids):
+            found = {str(listing.id) for listing in listings}
+            log.warning("match_listing.not_found", listing_ids=[i for i in listing_ids if i not in found])
+
+        by_city: dict[str, list[Listing]] = defaultdict(list)
+        for listing in listings:
+            by_city[listing.city.lower()].append(listing)
+
+        rows = []
+        for city, city_listings in by_city.items():
+            # One preference lookup per city covering the whole price range and locations of the batch
+            prices = [listing.price_eur for listing in city_listings]
+            points = [
+                (listing.latitude, listing.longitude) for listing in city_listings if listing.latitude is not None
+            ]
+            block = await get_candidates(db, city, min(prices), max(prices), points)
+            for start in range(0, len(city_listings), SCORE_CHUNK_SIZE):
+                chunk = city_listings[start : start + SCORE_CHUNK_SIZE]
+                scores = block.score_block(chunk)
+                eligible = (scores >= MATCH_THRESHOLD) & block.in_price_band(chunk)
+                for i, j in zip(*eligible.nonzero(), strict=True):
+                    pref = block.prefs[j]
+                    rows.append(match_row(pref.user_id, chunk[i].id, pref.id, float(scores[i, j])))
+        rows = await drop_stale_rows(db, rows, {listing.id: listing.price_eur for listing in listings})
+        if not rows:
+            return
+        match_ids = await insert_matches(db, rows)
+        await enqueue_match_notifications(db, match_ids)
+        await db.commit()
+
+    log.info("match.created", listings=len(listings), candidates=len(rows), created=len(match_ids))
+    _enqueue_notify(match_ids)
+
+
+@dramatiq.actor(queue_name="matching")
+def rescore_listings(changes: list[tuple[str, int]]) -> None:
+    from app.workers.runtime import run_async
+
+    run_async(_rescore_listings_async(changes))
+
+
+async def _rescore_listings_async(changes: list[tuple[str, int]]) -> None:
+    """Re-match listings whose price moved; ``changes`` holds ``(listing_id, old_price)`` pairs.
+
+    Only preferences whose band contains exactly one of the old and new price can
+    change outcome, and those all overlap ``[min(old, new), max(old, new)]``, so
+    that range is the only index lookup. Matches of preferences that no longer
+    fit are retired; preferences that now fit get new matches and notifications.
+    """
+    from sqlmodel import select
+
+    from app.models.listing import Listing
+    from app.services.match_writer import drop_stale_rows, insert_matches, match_row, retire_matches
+    from app.services.matcher import MATCH_THRESHOLD
+    from app.services.outbox import enqueue_match_notifications
+    from app.services.preference_index import get_candidates
+    from app.workers.runtime import worker_session
+
+    old_prices = {uuid.UUID(listing_id): old_price for listing_id, old_price in changes}
+    async with worker_session() as db:
+        result = await db.execute(
+            select(Listing).where(Listing.id.in_(list(old_prices)), Listing.delisted_at.is_(None))
+        )
+        rows = []
+        prices: dict[uuid.UUID, int] = {}
+        retired = 0
+        for listing in result.scalars().all():
+            old, new = old_prices[listing.id], listing.price_eur
+            prices[listing.id] = new
+            if old == new:
+                continue
+            points = [(listing.latitude, listing.longitude)] if listing.latitude is not None else []
+            block = await get_candidates(db, listing.city, min(old, new), max(old, new), points)
+            was_in = block.contains_price(old)
+            now_in = block.contains_price(new)
+            scores = block.score(listing)
+
+            lost = [block.prefs[j].id for j in (was_in & ~now_in).nonzero()[0]]
+            users = await retire_matches(db, listing.id, lost)
+            retired += len(users)
+
+            # New matches for prefs that gained the listing, plus replacements for
+            # retired users whose other preferences still fit the new price (which
+            # revive the retired match)
+            for j in (now_in & (scores >= MATCH_THRESHOLD)).nonzero()[0]:
+                pref = block.prefs[j]
+                if not was_in[j] or pref.user_id in users:
+                    rows.append(match_row(pref.user_id, listing.id, pref.id, float(scores[j])))
+
+        rows = await drop_stale_rows(db, rows, prices)
+        match_ids = await insert_matches(db, rows)
+        await enqueue_match_notifications(db, match_ids)
+        await db.commit()
+
+    log.info("match.rescored", listings=len(changes), retired=retired, created=len(match_ids))
+    _enqueue_notify(match_ids)
+
+
+@dramatiq.actor(queue_name="matching")
+def match_preference(preference_id: str) -> None:
+    from app.workers.runtime import run_async
+
+    run_async(_match_preference_async(preference_id))
+
+
+async def _match_preference_async(preference_id: str, notify: bool = True) -> None:
+    from sqlalchemy import func
+    from sqlmodel import select
+
+    from app.config import get_settings
+    from app.models.listing import Listing
     from app.models.preference import Preference
-    from app.services.matcher import MATCH_THRESHOLD, score_listing
+    from app.services.batch_scorer import PreferenceBlock
+    from app.services.geo import bounding_box, has_radius
+    from app.services.match_writer import insert_matches, match_row
+    from app.services.matcher import MATCH_THRESHOLD
+    from app.services.outbox import enqueue_match_notifications
+    from app.workers.runtime import worker_session
 
-    async with AsyncSessionLocal() as db:
-        listing = await db.get(Listing, uuid.UUID(listing_id))
-        if not listing:
-            log.warning("match_listing.not_found", listing_id=listing_id)
+    async with worker_session() as db:
+        pref = await db.get(Preference, uuid.UUID(preference_id))
+        if not pref or not pref.is_active:
             return
 
+        block = PreferenceBlock([pref])
+        # Only the columns the scorer reads; served by ix_listings_live_city_price
+        columns = [
+            Listing.id,
+            Listing.city,
+            Listing.price_eur,
+            Listing.rooms,
+            Listing.size_sqm,
+            Listing.pet_friendly,
+            Listing.furnished,
+            Listing.latitude,
+            Listing.longitude,
+        ]
+        if block.has_keywords:
+            # Text is only read for keyword scoring; skip the wide columns otherwise
+            columns += [Listing.title, Listing.description]
+        query = select(*columns).where(
+            func.lower(Listing.city) == pref.city.lower(),
+            Listing.delisted_at.is_(None),
+            Listing.price_eur <= pref.max_price,
+        )
+        if pref.min_price is not None:
+            query = query.where(Listing.price_eur >= pref.min_price)
+        if has_radius(pref):
+            # Coarse box in SQL; the scorer applies the exact distance
+            lat_lo, lat_hi, lon_lo, lon_hi = bounding_box(pref.latitude, pref.longitude, pref.radius_km)
+            query = query.where(Listing.latitude.between(lat_lo, lat_hi), Listing.longitude.between(lon_lo, lon_hi))
+        # Newest first, so the bounded notification set is the freshest listings
+        query = query.order_by(Listing.first_seen_at.desc())
+
+        scanned = 0
+        match_ids: list[uuid.UUID] = []
+        stream = await db.stream(query.execution_options(yield_per=BACKFILL_CHUNK_SIZE))
+        async for chunk in stream.partitions():
+            scanned += len(chunk)
+            scores = block.score_block(chunk)[:, 0]
+            rows = [
+                match_row(pref.user_id, chunk[idx].id, pref.id, float(scores[idx]))
+                for idx in (scores >= MATCH_THRESHOLD).nonzero()[0]
+            ]
+            if rows:
+                match_ids.extend(await insert_matches(db, rows))
+        notify_ids = match_ids[: get_settings().MATCH_BACKFILL_NOTIFY_LIMIT] if notify else []
+        await enqueue_match_notifications(db, notify_ids)
+        await db.commit()
+
+    log.info(
+        "match_preference.done",
+        preference_id=preference_id,
+        scanned=scanned,
+        created=len(match_ids),
+        notified=len(notify_ids),
+    )
+    _enqueue_notify(notify_ids)
+
+
+@dramatiq.actor(queue_name="matching")
+def rematch_city(city: str) -> None:
+    from app.workers.runtime import run_async
+
+    run_async(_rematch_city_async(city))
+
+
+async def _rematch_city_async(city: str) -> None:
+    """Re-run matching for a whole city, e.g. after a scoring change; sends no notifications.
+
+    Keyword-free preferences are scored and inserted by the database in one
+    ``INSERT ... SELECT``; the few with keywords go through the Python scorer.
+    """
+    from sqlalchemy import func
+    from sqlmodel import select
+
+    from app.models.preference import Preference
+    from app.services.sql_scorer import insert_city_matches, sql_scorable
+    from app.workers.runtime import worker_session
+
+    async with worker_session() as db:
+        created = await insert_city_matches(db, city)
+        await db.commit()
         result = await db.execute(
-            select(Preference).where(
-                Preference.city == listing.city,
-                Preference.is_active.is_(True),
+            select(Preference.id).where(
+                func.lower(Preference.city) == city.lower(), Preference.is_active.is_(True), ~sql_scorable()
             )
         )
-        prefs = result.scalars().all()
-
-        for pref in prefs:
-            sc = score_listing(listing, pref)
-            if sc >= MATCH_THRESHOLD:
-                existing = await db.execute(
-                    select(Match).where(Match.user_id == pref.user_id, Match.listing_id == listing.id)
-                )
-                if existing.scalar_one_or_none():
-                    continue
+        keyword_pref_ids = result.scalars().all()
+
+    for pref_id in keyword_pref_ids:
+        await _match_preference_async(str(pref_id), notify=False)
+    log.info("rematch_city.done", city=city, sql_created=len(created), keyword_preferences=len(keyword_pref_ids))
 
-                match = Match(
-                    id=uuid.uuid4(),
-                    user_id=pref.user_id,
-                    listing_id=listing.id,
-                    preference_id=pref.id,
-                    score=sc,
-                    created_at=datetime.now(timezone.utc),
-                )
-                db.add(match)
-                await db.commit()
-                log.info("match.created", match_id=str(match.id), score=sc)
-                notify_user.send(str(match.id))
+
+def _enqueue_notify(match_ids: list) -> None:
+    for i in range(0, len(match_ids), NOTIFY_BATCH_SIZE):
+        notify_users.send([str(match_id) for match_id in match_ids[i : i + NOTIFY_BATCH_SIZE]])
 
 
 @dramatiq.actor(queue_name="notifications")
 def notify_user(match_id: str) -> None:
-    import asyncio
+    from app.workers.runtime import run_async
 
-    asyncio.run(_notify_user_async(match_id))
+    run_async(_notify_users_async([match_id]))
+
+
+@dramatiq.actor(queue_name="notifications")
+def notify_users(match_ids: list[str]) -> None:
+    from app.workers.runtime import run_async
+
+    run_async(_notify_users_async(match_ids))
 
 
 async def _notify_user_async(match_id: str) -> None:
+    await _notify_users_async([match_id])
+
+
+async def _notify_users_async(match_ids: list[str]) -> None:
+    """Trigger delivery of the matches' outbox notifications, coalesced per user.
+
+    The matches and their users are loaded in one query. Users without a
+    coalescing window are sent to right away: their outbox rows are claimed
+    together and settled in one commit.
+    """
+    from collections import defaultdict
+
     from sqlmodel import select
 
-    from app.db.session import AsyncSessionLocal
-    from app.models.listing import Listing
+    from app.config import get_settings
     from app.models.match import Match
     from app.models.user import User
-    from app.services.email_service import send_email
-    from app.services.telegram_service import send_telegram_message
+    from app.services.notification_batcher import claim_flush, get_redis, next_digest_delay_ms
+    from app.services.outbox import claim_matches
+    from app.workers.runtime import worker_session
+
+    settings = get_settings()
+    async with worker_session() as db:
+        result = await db.execute(
+            select(Match.id, User)
+            .join(User, User.id == Match.user_id)
+            .where(Match.id.in_([uuid.UUID(m) for m in match_ids]), Match.notified.is_(False))
+        )
+        users: dict[uuid.UUID, User] = {}
+        by_user: dict[uuid.UUID, list[uuid.UUID]] = defaultdict(list)
+        for match_id, user in result.all():
+            users[user.id] = user
+            by_user[user.id].append(match_id)
 
-    async with AsyncSessionLocal() as db:
-        match = await db.get(Match, uuid.UUID(match_id))
-        if not match:
+        immediate: list[uuid.UUID] = []
+        now = datetime.now(timezone.utc)
+        for user_id, user_match_ids in by_user.items():
+            user = users[user_id]
+            if user.notification_mode == "digest":
+                delay_ms = next_digest_delay_ms(now, settings.NOTIFY_DIGEST_HOUR)
+            elif settings.NOTIFY_COALESCE_SECONDS > 0:
+                delay_ms = settings.NOTIFY_COALESCE_SECONDS * 1000
+            else:
+                delay_ms = 0
+
+            if delay_ms:
+                try:
+                    claimed = claim_flush(get_redis(), str(user_id), delay_ms)
+                except Exception as e:
+                    # Without Redis there is nothing to coalesce against; send right away
+                    log.warning("notify.coalesce_failed", user_id=str(user_id), error=str(e))
+                else:
+                    if claimed:
+                        flush_notifications.send_with_options(args=(str(user_id),), delay=delay_ms)
+                    continue
+            immediate.extend(user_match_ids)
+
+        if not immediate:
             return
-        user = await db.get(User, match.user_id)
-        listing = await db.get(Listing, match.listing_id)
-        if not user or not listing:
+        claimed_by_user: dict[uuid.UUID, list] = defaultdict(list)
+        for row in await claim_matches(db, immediate):
+            claimed_by_user[row[0].user_id].append(row)
+        outcomes = [(rows, *await _send(users[user_id], rows)) for user_id, rows in claimed_by_user.items()]
+        await _settle(db, outcomes)
+        await db.commit()
+
+
+@dramatiq.actor(queue_name="notifications")
+def flush_notifications(user_id: str) -> None:
+    from app.workers.runtime import run_async
+
+    run_async(_flush_notifications_async(user_id))
+
+
+async def _flush_notifications_async(user_id: str) -> None:
+    """Send all of a user's pending match notifications in one message."""
+    from app.models.user import User
+    from app.services.notification_batcher import get_redis, release_flush
+    from app.workers.runtime import worker_session
+
+    # Released before reading, so matches committed from here on schedule the next flush
+    try:
+        release_flush(get_redis(), user_id)
+    except Exception as e:
+        log.warning("notify.release_failed", user_id=user_id, error=str(e))
+
+    async with worker_session() as db:
+        user = await db.get(User, uuid.UUID(user_id))
+        if not user or user.deleted_at:
             return
+        sent = await _dispatch_user(db, user, digest=user.notification_mode == "digest")
+    log.info("notify.flushed", user_id=user_id, matches=sent)
 
-        msg = (
-            f"*New Rental Match!*\n"
-            f"{listing.title}\n"
-            f"Price: €{listing.price_eur // 100}/month\n"
-            f"City: {listing.city}\n"
-            f"[View listing]({listing.source_url})"
-        )
 
-        if user.telegram_chat_id:
-            await send_telegram_message(user.telegram_chat_id, msg)
-            match.notification_channel = "telegram"
+async def _dispatch_user(db, user, digest: bool = False) -> int:
+    """Claim the user's pending outbox rows, send them in one message and commit."""
+    from app.services.outbox import claim_for_user
+
+    claimed = await claim_for_user(db, user.id)
+    if claimed:
+        await _settle(db, [(claimed, *await _send(user, claimed, digest))])
+    await db.commit()
+    return len(claimed)
+
+
+@dramatiq.actor(queue_name="notifications")
+def dispatch_notifications() -> None:
+    from app.workers.runtime import run_async
+
+    run_async(_dispatch_notifications_async())
+
+
+async def _dispatch_notifications_async(reschedule: bool = True) -> int:
+    """Sweep the outbox for overdue rows, e.g. when a trigger was lost, then schedule the next sweep.
+
+    Rows are claimed in batches; each batch is sent per user and settled with
+    one update per outcome before the next is claimed.
+    """
+    from collections import defaultdict
+
+    from sqlmodel import select
+
+    from app.config import get_settings
+    from app.models.user import User
+    from app.services.notification_batcher import get_redis, renew_dispatch
+    from app.services.outbox import backlog, claim_overdue, mark_cancelled
+    from app.workers.runtime import worker_session
+
+    settings = get_settings()
+    dispatched = 0
+    async with worker_session() as db:
+        while claimed := await claim_overdue(db, settings.NOTIFY_DISPATCH_BATCH_SIZE):
+            by_user: dict[uuid.UUID, list] = defaultdict(list)
+            for row in claimed:
+                by_user[row[0].user_id].append(row)
+            result = await db.execute(select(User).where(User.id.in_(list(by_user)), User.deleted_at.is_(None)))
+            users = {user.id: user for user in result.scalars().all()}
+
+            outcomes, orphaned = [], []
+            for user_id, rows in by_user.items():
+                if user_id not in users:
+                    orphaned.extend(notification.id for notification, _, _ in rows)
+                    continue
+                rows.sort(key=lambda row: (row[1].score, row[1].created_at), reverse=True)
+                user = users[user_id]
+                outcomes.append((rows, *await _send(user, rows, digest=user.notification_mode == "digest")))
+            await _settle(db, outcomes)
+            if orphaned:
+                await mark_cancelled(db, orphaned)
+            await db.commit()
+            dispatched += len(claimed)
+            if len(claimed) < settings.NOTIFY_DISPATCH_BATCH_SIZE:
+                break
+        stats = await backlog(db)
+
+    log.info("notify.dispatched", dispatched=dispatched, **stats)
+    if reschedule:
+        interval_ms = settings.NOTIFY_DISPATCH_INTERVAL_SECONDS * 1000
+        try:
+            renew_dispatch(get_redis(), interval_ms)
+        except Exception as e:
+            log.warning("notify.dispatch_renew_failed", error=str(e))
+        dispatch_notifications.send_with_options(delay=interval_ms)
+    return dispatched
+
+
+def start_dispatcher() -> None:
+    """Start the outbox sweep unless a sweep is already scheduled by another process."""
+    from app.config import get_settings
+    from app.services.notification_batcher import claim_dispatch, get_redis
+
+    try:
+        if claim_dispatch(get_redis(), get_settings().NOTIFY_DISPATCH_INTERVAL_SECONDS * 1000):
+            dispatch_notifications.send()
+    except Exception as e:
+        log.warning("notify.dispatcher_start_failed", error=str(e))
+
+
+async def _send(user, claimed: list, digest: bool = False) -> tuple[str, str | None]:
+    """One Telegram message or email for claimed ``(notification, match, listing)`` rows; ``(channel, error)``."""
+    from app.services.email_service import send_email
+    from app.services.notification_batcher import render_email, render_telegram
+    from app.services.outbox import channel_for
+    from app.services.telegram_service import send_telegram_message
+
+    listings = [listing for _, _, listing in claimed]
+    channel = channel_for(user.telegram_chat_id)
+    try:
+        if channel == "telegram":
+            ok = await send_telegram_message(user.telegram_chat_id, render_telegram(listings, digest))
         else:
-            html = f"<h2>New Rental Match</h2><p>{listing.title}</p><p>Price: €{listing.price_eur // 100}/month</p><a href='{listing.source_url}'>View listing</a>"
-            await send_email(user.email, "New Rental Match!", html)
-            match.notification_channel = "email"
+            subject, html = render_email(listings, digest)
+            ok = await send_email(user.email, subject, html)
+    except Exception as e:
+        return channel, str(e) or type(e).__name__
+    return channel, None if ok else f"{channel} send failed"
 
-        match.notified = True
-        match.notified_at = datetime.now(timezone.utc)
-        await db.commit()
+
+async def _settle(db, outcomes: list[tuple[list, str, str | None]]) -> None:
+    """Bulk-update outbox rows and their matches from ``(claimed rows, channel, error)`` outcomes."""
+    from collections import defaultdict
+
+    from app.services.outbox import mark_failed, mark_sent
+
+    sent: dict[str, tuple[list, list]] = defaultdict(lambda: ([], []))
+    failed: dict[str, list] = defaultdict(list)
+    for claimed, channel, error in outcomes:
+        if error is None:
+            notification_ids, match_ids = sent[channel]
+            notification_ids.extend(notification.id for notification, _, _ in claimed)
+            match_ids.extend(match.id for _, match, _ in claimed)
+        else:
+            log.warning("notify.delivery_failed", user_id=str(claimed[0][0].user_id), channel=channel, error=error)
+            failed[error].extend(notification.id for notification, _, _ in claimed)
+    for channel, (notification_ids, match_ids) in sent.items():
+        await mark_sent(db, notification_ids, match_ids, channel)
+    for error, notification_ids in failed.items():
+        await mark_failed(db, notification_ids, error)
 
 
 @dramatiq.actor(queue_name="notifications")
 def send_trial_reminder(user_id: str, reminder_type: str) -> None:
-    import asyncio
+    from app.workers.runtime import run_async
+
+    run_async(_send_trial_reminders_async([user_id], reminder_type))
+
 
-    asyncio.run(_send_trial_reminder_async(user_id, reminder_type))
+@dramatiq.actor(queue_name="notifications")
+def send_trial_reminders(user_ids: list[str], reminder_type: str) -> None:
+    """One reminder email per user, packed into as few SendGrid requests as possible."""
+    from app.workers.runtime import run_async
+
+    run_async(_send_trial_reminders_async(user_ids, reminder_type))
+
+
+@dramatiq.actor(queue_name="notifications")
+def dispatch_trial_reminders() -> None:
+    """Send the trial reminders that are due; scheduled by ``app.tasks.reminders`` for the next due time."""
+    from app.tasks.reminders import dispatch_due_reminders
+    from app.workers.runtime import run_async
+
+    run_async(dispatch_due_reminders())
+
+
+@dramatiq.actor(queue_name="notifications", time_limit=60 * 60 * 1000)
+def rebuild_trial_reminders() -> None:
+    from app.tasks.reminders import rebuild_trial_reminders as rebuild
+    from app.workers.runtime import run_async
+
+    run_async(rebuild())
 
 
-async def _send_trial_reminder_async(user_id: str, reminder_type: str) -> None:
-    from app.db.session import AsyncSessionLocal
+async def _send_trial_reminders_async(user_ids: list[str], reminder_type: str) -> None:
+    from sqlmodel import select
+
     from app.models.user import User
-    from app.services.email_service import send_email
+    from app.services.bulk_email import BulkRecipient, send_bulk_notifications
+    from app.services.notification_batcher import render_trial_reminder
+    from app.workers.runtime import worker_session
 
-    async with AsyncSessionLocal() as db:
-        user = await db.get(User, uuid.UUID(user_id))
-        if not user or user.deleted_at:
+    async with worker_session() as db:
+        result = await db.execute(
+            select(User.id, User.email, User.full_name).where(
+                User.id.in_([uuid.UUID(u) for u in user_ids]), User.deleted_at.is_(None)
+            )
+        )
+        recipients = [
+            BulkRecipient(user_id, email, {"-name-": full_name or "there"})
+            for user_id, email, full_name in result.all()
+        ]
+        if not recipients:
             return
 
-        subjects = {
-            "48h": "Your Rentify trial ends in 48 hours",
-            "24h": "Last day of your Rentify trial!",
-        }
-        html = f"<p>Hi {user.full_name or 'there'},</p><p>Your 7-day trial {subjects.get(reminder_type, 'is ending soon')}. <a href='http://localhost:5173/dashboard'>Upgrade now</a> to keep getting matches.</p>"
-        await send_email(user.email, subjects.get(reminder_type, "Trial ending"), html)
-        log.info("trial_reminder.sent", user_id=user_id, type=reminder_type)
+        subject, html = render_trial_reminder(reminder_type)
+        outcome = await send_bulk_notifications(db, f"trial_ending_{reminder_type}", subject, html, recipients)
+        log.info("trial_reminder.sent", users=len(recipients), type=reminder_type, **outcome)
@@ -1,15 +1,37 @@
 import structlog
 
 import dramatiq
+from dramatiq import Middleware
 from dramatiq.brokers.redis import RedisBroker
 
 from app.config import get_settings
+from app.workers.runtime import AsyncRuntimeMiddleware
 
 settings = get_settings()
 log = structlog.get_logger()
 
+
+class SelfSchedulingJobsMiddleware(Middleware):
+    """Makes sure the self-rescheduling jobs are scheduled when a worker process boots.
+
+    Both are guarded by Redis keys, so only one chain of each runs however many
+    workers start.
+    """
+
+    def after_worker_boot(self, broker, worker) -> None:
+        from app.tasks.reminders import ensure_reminder_wakeup
+
+        tasks.start_dispatcher()
+        try:
+            ensure_reminder_wakeup()
+        except Exception as e:
+            log.warning("trial_reminders.wakeup_failed", error=str(e))
+
+
 broker = RedisBroker(url=settings.REDIS_URL)
+broker.add_middleware(AsyncRuntimeMiddleware())
+broker.add_middleware(SelfSchedulingJobsMiddleware())
 dramatiq.set_broker(broker)
 
 # Import tasks to register them
-from app.workers import tasks  # noqa: F401, E402
+from app.workers import tasks  # noqa: E402
@@ -0,0 +1,36 @@
+"""Scratch database setup for the benchmarks that run against a database.
+
+The benchmarks drop and recreate every table, so a database is only used if it
+is empty or was set up by a previous benchmark run (it then holds the
+``MARKER_TABLE``). Anything else, such as a development or production database
+passed by mistake, is refused.
+"""
+
+from collections.abc import Iterable
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import SQLModel
+
+from app.models.preference import Preference
+from app.models.user import User
+
+MARKER_TABLE = "benchmark_scratch"
+
+
+async def reset_schema(conn: AsyncConnection) -> None:
+    """Drop and recreate the application tables, refusing a database the benchmarks did not set up."""
+    tables = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+    if tables and MARKER_TABLE not in tables:
+        raise SystemExit(
+            f"{conn.engine.url.render_as_string(hide_password=True)} has tables but no {MARKER_TABLE} table; "
+            "pass an empty throwaway database"
+        )
+    await conn.run_sync(SQLModel.metadata.drop_all)
+    await conn.run_sync(SQLModel.metadata.create_all)
+    await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {MARKER_TABLE} (id INTEGER)"))
+
+
+def users_for(prefs: Iterable[Preference]) -> list[User]:
+    """The owners of ``prefs``; Postgres enforces the preferences' user foreign key."""
+    return [User(id=user_id, email=f"{user_id}@bench.invalid") for user_id in {pref.user_id for pref in prefs}]
@@ -0,0 +1,89 @@
+"""Synthetic preferences and listings with a roughly realistic mix of criteria."""
+
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.models.listing import Listing
+from app.models.preference import Preference
+
+# (city, share of traffic, centre)
+CITIES = [
+    ("amsterdam", 0.45, (52.3676, 4.9041)),
+    ("rotterdam", 0.2, (51.9244, 4.4777)),
+    ("utrecht", 0.15, (52.0907, 5.1214)),
+    ("den haag", 0.12, (52.0705, 4.3007)),
+    ("eindhoven", 0.08, (51.4416, 5.4697)),
+]
+KEYWORDS = ["balkon", "tuin", "lift", "gemeubileerd", "vaatwasser", "parkeerplaats", "dicht bij centrum", "dakterras"]
+DESCRIPTION_WORDS = KEYWORDS + ["ruime", "lichte", "woonkamer", "keuken", "badkamer", "slaapkamer", "nabij", "station"]
+
+
+def _city(rng: random.Random) -> tuple[str, tuple[float, float]]:
+    name, _, centre = rng.choices(CITIES, weights=[w for _, w, _ in CITIES])[0]
+    return name, centre
+
+
+def make_preferences(n: int, seed: int = 0) -> list[Preference]:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    prefs = []
+    for _ in range(n):
+        city, (lat, lon) = _city(rng)
+        max_price = rng.randrange(80000, 300000, 5000)
+        min_rooms = rng.choice([None, 1.0, 2.0, 3.0])
+        min_size = rng.choice([None, 30, 50, 70])
+        radius = rng.random() < 0.3
+        prefs.append(
+            Preference(
+                id=uuid.uuid4(),
+                user_id=uuid.uuid4(),
+                city=city,
+                min_price=rng.choice([None, max_price // 2, max_price - 50000]),
+                max_price=max_price,
+                min_rooms=min_rooms,
+                max_rooms=None if min_rooms is None else min_rooms + rng.choice([1.0, 2.0]),
+                min_size_sqm=min_size,
+                max_size_sqm=None if min_size is None else min_size + rng.choice([30, 60]),
+                pet_friendly=rng.random() < 0.2,
+                furnished=rng.choice([None, None, True, False]),
+                latitude=lat + rng.uniform(-0.05, 0.05) if radius else None,
+                longitude=lon + rng.uniform(-0.08, 0.08) if radius else None,
+                radius_km=rng.choice([1.0, 2.0, 5.0, 10.0]) if radius else None,
+                keywords=rng.sample(KEYWORDS, rng.randint(1, 3)) if rng.random() < 0.3 else None,
+                created_at=now,
+                updated_at=now,
+            )
+        )
+    return prefs
+
+
+def make_listings(n: int, seed: int = 1) -> list[Listing]:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    listings = []
+    for i in range(n):
+        city, (lat, lon) = _city(rng)
+        located = rng.random() < 0.8
+        listings.append(
+            Listing(
+                id=uuid.uuid4(),
+                source_site="bench",
+                source_id=str(i),
+                source_url=f"https://example.com/{i}",
+                title=f"Appartement {' '.join(rng.sample(DESCRIPTION_WORDS, 2))}",
+                description=" ".join(rng.choices(DESCRIPTION_WORDS, k=40)),
+                price_eur=rng.randrange(60000, 320000, 1000),
+                city=city,
+                rooms=rng.choice([None, 1.0, 2.0, 3.0, 4.0]),
+                size_sqm=rng.choice([None, 35, 55, 75, 95, 130]),
+                pet_friendly=rng.choice([None, True, False]),
+                furnished=rng.choice([None, True, False]),
+                latitude=lat + rng.uniform(-0.06, 0.06) if located else None,
+                longitude=lon + rng.uniform(-0.1, 0.1) if located else None,
+                first_seen_at=now - timedelta(minutes=i),
+                last_seen_at=now,
+                created_at=now,
+            )
+        )
+    return listings
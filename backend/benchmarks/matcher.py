@@ -0,0 +1,188 @@
+"""Matcher benchmarks over growing preference counts.
+
+Micro: scores/second of ``score_listing`` (one pair at a time), of
+``PreferenceBlock.score_block`` and of an indexed city lookup plus scoring.
+Macro: listings/second through the ``match_listings`` actor body against a
+database seeded with the same preferences. Everything is emitted as one JSON
+document so results can be diffed between releases.
+
+    cd backend && python -m benchmarks.matcher --prefs 1000 10000 100000 --output matcher.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import structlog
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.models.listing import Listing
+from app.models.match import Match
+from app.models.preference import Preference
+from app.models.user import User
+from app.services.batch_scorer import PreferenceBlock
+from app.services.matcher import score_listing
+from app.services.preference_index import CityPreferenceIndex, preference_index
+from app.workers import runtime, tasks
+from benchmarks.database import reset_schema, users_for
+from benchmarks.generators import make_listings, make_preferences
+
+SEED_CHUNK = 5000
+
+
+def _timed(fn, min_seconds: float) -> tuple[int, float]:
+    """Call ``fn`` (which returns units of work done) until ``min_seconds`` have elapsed."""
+    units, start = 0, time.perf_counter()
+    while True:
+        units += fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return units, elapsed
+
+
+def _rate(units: int, seconds: float, unit: str) -> dict:
+    return {unit: units, "seconds": round(seconds, 4), f"{unit}_per_second": round(units / seconds, 1)}
+
+
+def micro(prefs: list[Preference], listings: list[Listing], min_seconds: float) -> dict:
+    def scalar() -> int:
+        for pref in prefs:
+            score_listing(listings[0], pref)
+        return len(prefs)
+
+    start = time.perf_counter()
+    block = PreferenceBlock(prefs)
+    block_build = time.perf_counter() - start
+
+    def batch() -> int:
+        return block.score_block(listings).size
+
+    prefs_by_city: dict[str, list[Preference]] = defaultdict(list)
+    for pref in prefs:
+        prefs_by_city[pref.city].append(pref)
+    by_city = {city: CityPreferenceIndex(city_prefs) for city, city_prefs in prefs_by_city.items()}
+
+    def indexed() -> int:
+        for listing in listings:
+            points = [(listing.latitude, listing.longitude)] if listing.latitude is not None else []
+            by_city[listing.city].candidates(listing.price_eur, points=points).score(listing)
+        return len(listings)
+
+    return {
+        "score_listing": _rate(*_timed(scalar, min_seconds), "scores"),
+        "batch_scorer": {"block_build_seconds": round(block_build, 4), **_rate(*_timed(batch, min_seconds), "scores")},
+        "indexed_lookup_and_score": _rate(*_timed(indexed, min_seconds), "listings"),
+    }
+
+
+async def _seed(url: str, prefs: list[Preference], listings: list[Listing]) -> None:
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await reset_schema(conn)
+        for model, rows in ((User, users_for(prefs)), (Preference, prefs), (Listing, listings)):
+            for i in range(0, len(rows), SEED_CHUNK):
+                await conn.execute(insert(model), [r.model_dump() for r in rows[i : i + SEED_CHUNK]])
+    await engine.dispose()
+
+
+def macro(url: str, prefs: list[Preference], listings: list[Listing], batch_size: int) -> dict:
+    asyncio.run(_seed(url, prefs, listings))
+    preference_index.clear()
+    ids = [str(listing.id) for listing in listings]
+    # The first batch also loads each city's preferences into the index
+    warmup, ids = ids[:batch_size], ids[batch_size:]
+    runtime._local.runtime = runtime.AsyncRuntime(url)
+    try:
+        start = time.perf_counter()
+        runtime.run_async(tasks._match_listings_async(warmup))
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(0, len(ids), batch_size):
+            runtime.run_async(tasks._match_listings_async(ids[i : i + batch_size]))
+        warm = time.perf_counter() - start
+        matches = runtime.run_async(_count_matches())
+    finally:
+        runtime.shutdown_runtime()
+    return {
+        "batch_size": batch_size,
+        "cold_batch_seconds": round(cold, 4),
+        "matches_created": matches,
+        **_rate(len(ids), warm, "listings"),
+    }
+
+
+async def _count_matches() -> int:
+    async with runtime.worker_session() as db:
+        return (await db.execute(select(func.count()).select_from(Match))).scalar_one()
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prefs", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--micro-listings", type=int, default=50)
+    parser.add_argument("--macro-listings", type=int, default=400)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="minimum duration of each micro timing")
+    parser.add_argument(
+        "--database-url", default=None, help="an empty throwaway database; defaults to a SQLite file per run"
+    )
+    parser.add_argument("--skip-macro", action="store_true")
+    parser.add_argument("--output", type=Path, default=None, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    # No broker or Redis: measure scoring, index and database cost only
+    tasks.notify_users.send = lambda *a, **kw: None
+    preference_index.sync = lambda redis_client: 0
+
+    results = []
+    for n_prefs in args.prefs:
+        prefs = make_preferences(n_prefs)
+        run = {
+            "preferences": n_prefs,
+            "micro": micro(prefs, make_listings(args.micro_listings, seed=2), args.min_seconds),
+        }
+        if not args.skip_macro:
+            url = args.database_url or f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}"
+            run["macro"] = {
+                "database": url.split("://")[0],
+                **macro(url, prefs, make_listings(args.macro_listings), args.batch_size),
+            }
+        results.append(run)
+
+    report = {
+        "benchmark": "matcher",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Local stand-in for the Telegram Bot API and SendGrid, for tests and benchmarks.
+
+Serves ``POST /bot<token>/sendMessage`` and ``POST /v3/mail/send`` from a
+uvicorn server on a background thread, optionally over TLS with a throwaway
+self-signed certificate, and records how many requests and distinct client
+connections it saw. The SendGrid route answers 400 with per-personalization
+errors for addresses in ``reject``, as SendGrid does for invalid recipients,
+and the Telegram route answers the first ``throttle`` messages with a 429.
+"""
+
+import asyncio
+import datetime
+import ipaddress
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+def _self_signed_cert(directory: Path) -> tuple[Path, Path]:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "cert.pem", directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    )
+    return cert_path, key_path
+
+
+class StandInServer:
+    """Context manager running the stand-in; ``url`` is set once it is listening."""
+
+    def __init__(
+        self, tls: bool = False, latency_ms: float = 0.0, reject: set[str] | None = None, throttle: int = 0
+    ) -> None:
+        self.tls = tls
+        self.latency = latency_ms / 1000
+        self.reject = reject or set()
+        self.throttle = throttle
+        self.requests = 0
+        self.delivered: list[str] = []
+        self.messages: list[tuple[str, str]] = []
+        self.connections: set[tuple[str, int]] = set()
+        self.cert_path: Path | None = None
+        self.url = ""
+        self._server: uvicorn.Server | None = None
+        self._thread: threading.Thread | None = None
+
+    async def _record(self, request: Request) -> None:
+        self.requests += 1
+        self.connections.add((request.client.host, request.client.port))
+        await request.body()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def _telegram(self, request: Request) -> Response:
+        await self._record(request)
+        if self.throttle:
+            self.throttle -= 1
+            return JSONResponse({"ok": False, "error_code": 429, "parameters": {"retry_after": 1}}, status_code=429)
+        body = await request.json()
+        self.messages.append((body["chat_id"], body["text"]))
+        return JSONResponse({"ok": True, "result": {"message_id": self.requests}})
+
+    async def _sendgrid(self, request: Request) -> Response:
+        await self._record(request)
+        recipients = [p["to"][0]["email"] for p in (await request.json())["personalizations"]]
+        errors = [
+            {"message": "Invalid email", "field": f"personalizations.{i}.to.0.email"}
+            for i, email in enumerate(recipients)
+            if email in self.reject
+        ]
+        if errors:
+            return JSONResponse({"errors": errors}, status_code=400)
+        self.delivered.extend(recipients)
+        return Response(status_code=202)
+
+    def __enter__(self) -> "StandInServer":
+        app = Starlette(
+            routes=[
+                Route("/bot{token}/sendMessage", self._telegram, methods=["POST"]),
+                Route("/v3/mail/send", self._sendgrid, methods=["POST"]),
+            ]
+        )
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        ssl_kwargs = {}
+        if self.tls:
+            self.cert_path, key_path = _self_signed_cert(Path(tempfile.mkdtemp()))
+            ssl_kwargs = {"ssl_certfile": str(self.cert_path), "ssl_keyfile": str(key_path)}
+        config = uvicorn.Config(app, log_level="warning", lifespan="off", **ssl_kwargs)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [sock]}, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        self.url = f"{'https' if self.tls else 'http'}://127.0.0.1:{port}"
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.connections.clear()
+        self.delivered.clear()
+        self.messages.clear()
@@ -0,0 +1,132 @@
+"""Outbound notification throughput: a fresh client per message vs the pooled clients.
+
+Sends Telegram messages and SendGrid emails to a local TLS stand-in of both
+APIs (``benchmarks.notification_standin``) and reports messages/second and the
+number of connections the stand-in saw for each strategy, as one JSON document.
+
+    cd backend && python -m benchmarks.notifications --messages 500 --concurrency 20 --output notifications.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import structlog
+
+from app.config import get_settings
+from app.services import email_service, http_clients, telegram_service
+from benchmarks.matcher import _git_revision, _rate
+from benchmarks.notification_standin import StandInServer
+
+settings = get_settings()
+
+
+async def _per_message_telegram(chat_id: str, text: str) -> bool:
+    # What telegram_service did before the shared clients
+    async with httpx.AsyncClient() as client:
+        resp = await client.post(
+            f"{settings.TELEGRAM_API_URL}/bot{settings.TELEGRAM_BOT_TOKEN}/sendMessage",
+            json={"chat_id": chat_id, "text": text, "parse_mode": "Markdown"},
+        )
+        return resp.status_code == 200
+
+
+async def _per_message_email(to_email: str, subject: str, html_content: str) -> bool:
+    async with httpx.AsyncClient() as client:
+        resp = await client.post(
+            f"{settings.SENDGRID_API_URL}/v3/mail/send",
+            headers={"Authorization": f"Bearer {settings.SENDGRID_API_KEY}"},
+            json={
+                "personalizations": [{"to": [{"email": to_email}]}],
+                "from": {"email": settings.SENDGRID_FROM_EMAIL},
+                "subject": subject,
+                "content": [{"type": "text/html", "value": html_content}],
+            },
+        )
+        return resp.status_code in (200, 202)
+
+
+async def _send_all(send, messages: int, concurrency: int) -> float:
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with gate:
+            assert await send(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(messages)))
+    elapsed = time.perf_counter() - start
+    await http_clients.close_clients()
+    return elapsed
+
+
+def _strategies() -> dict:
+    return {
+        "telegram": {
+            "per_message_client": lambda i: _per_message_telegram(str(i), "New Rental Match!"),
+            "pooled_client": lambda i: telegram_service.send_telegram_message(str(i), "New Rental Match!"),
+        },
+        "sendgrid": {
+            "per_message_client": lambda i: _per_message_email(f"u{i}@example.com", "Match", "<p>hi</p>"),
+            "pooled_client": lambda i: email_service.send_email(f"u{i}@example.com", "Match", "<p>hi</p>"),
+        },
+    }
+
+
+def run(server: StandInServer, messages: int, concurrency: int) -> dict:
+    results: dict = {}
+    for service, strategies in _strategies().items():
+        results[service] = {}
+        for name, send in strategies.items():
+            # Warm imports and the TLS context outside the timing
+            asyncio.run(_send_all(send, 1, 1))
+            server.reset()
+            elapsed = asyncio.run(_send_all(send, messages, concurrency))
+            results[service][name] = {"connections": len(server.connections), **_rate(messages, elapsed, "messages")}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated API processing time per request")
+    parser.add_argument("--no-tls", action="store_true")
+    parser.add_argument("--output", type=Path, default=None, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    with StandInServer(tls=not args.no_tls, latency_ms=args.latency_ms) as server:
+        if server.cert_path:
+            os.environ["SSL_CERT_FILE"] = str(server.cert_path)
+        settings.TELEGRAM_API_URL = settings.SENDGRID_API_URL = server.url
+        settings.MOCK_TELEGRAM = settings.MOCK_EMAIL = False
+        results = run(server, args.messages, args.concurrency)
+
+    report = {
+        "benchmark": "notifications",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "httpx": httpx.__version__,
+        "tls": not args.no_tls,
+        "messages": args.messages,
+        "concurrency": args.concurrency,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Matching-queue throughput: ``asyncio.run`` per message vs the persistent worker runtime.
+
+Runs the ``match_listing`` actor body for N listings in both modes and prints
+messages/second as JSON. Defaults to a throwaway SQLite file; pass an empty
+throwaway Postgres ``--database-url`` to measure the asyncpg pool that
+production workers use.
+
+    cd backend && python -m benchmarks.worker_runtime --messages 500 --prefs 2000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.db.session
+from app.models.listing import Listing
+from app.models.preference import Preference
+from app.services.preference_index import preference_index
+from app.workers import runtime, tasks
+from benchmarks.database import reset_schema, users_for
+
+
+async def _seed(url: str, n_listings: int, n_prefs: int) -> list[str]:
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await reset_schema(conn)
+    now = datetime.now(timezone.utc)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        prefs = [
+            Preference(
+                id=uuid.uuid4(),
+                user_id=uuid.uuid4(),
+                city="amsterdam",
+                min_price=50000 + (i % 10) * 10000,
+                max_price=150000 + (i % 20) * 10000,
+                created_at=now,
+                updated_at=now,
+            )
+            for i in range(n_prefs)
+        ]
+        db.add_all(users_for(prefs))
+        await db.flush()
+        db.add_all(prefs)
+        listings = [
+            Listing(
+                id=uuid.uuid4(),
+                source_site="bench",
+                source_id=str(i),
+                source_url=f"https://example.com/{i}",
+                title=f"Listing {i}",
+                price_eur=100000 + (i % 15) * 10000,
+                city="amsterdam",
+                rooms=2.0,
+                size_sqm=60,
+                first_seen_at=now,
+                last_seen_at=now,
+                created_at=now,
+            )
+            for i in range(n_listings)
+        ]
+        db.add_all(listings)
+        await db.commit()
+    await engine.dispose()
+    return [str(listing.id) for listing in listings]
+
+
+def _per_message_loop(url: str, listing_ids: list[str]) -> float:
+    """Previous behaviour: a fresh event loop per message, so no pooled connection survives."""
+
+    async def one(listing_id: str) -> None:
+        engine = create_async_engine(url)
+        app.db.session.AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        try:
+            await tasks._match_listing_async(listing_id)
+        finally:
+            await engine.dispose()
+
+    start = time.perf_counter()
+    for listing_id in listing_ids:
+        asyncio.run(one(listing_id))
+    return time.perf_counter() - start
+
+
+def _persistent_runtime(url: str, listing_ids: list[str]) -> float:
+    runtime._local.runtime = runtime.AsyncRuntime(url)
+    try:
+        start = time.perf_counter()
+        for listing_id in listing_ids:
+            runtime.run_async(tasks._match_listing_async(listing_id))
+        return time.perf_counter() - start
+    finally:
+        runtime.shutdown_runtime()
+
+
+def _result(seconds: float, messages: int) -> dict:
+    return {"seconds": round(seconds, 4), "messages_per_second": round(messages / seconds, 2)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--prefs", type=int, default=100)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    url = args.database_url or f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}"
+    # No broker or Redis: keep the measurement on loop/session/query cost
+    tasks.notify_users.send = lambda *a, **kw: None
+    preference_index.sync = lambda redis_client: 0
+
+    # Separate listings per mode so both insert the same number of matches
+    listing_ids = asyncio.run(_seed(url, args.messages * 2, args.prefs))
+    before_ids, after_ids = listing_ids[: args.messages], listing_ids[args.messages :]
+
+    preference_index.clear()
+    before = _per_message_loop(url, before_ids)
+    preference_index.clear()
+    after = _persistent_runtime(url, after_ids)
+
+    print(
+        json.dumps(
+            {
+                "benchmark": "worker_runtime",
+                "queue": "matching",
+                "database": url.split("://")[0],
+                "messages": args.messages,
+                "preferences": args.prefs,
+                "asyncio_run_per_message": _result(before, args.messages),
+                "persistent_runtime": _result(after, args.messages),
+                "speedup": round(before / after, 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
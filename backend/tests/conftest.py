@@ -12,7 +12,10 @@ from app.config import get_settings
 from app.main import app
 from app.db.session import get_db
 from app.models import User
+from app.services import notification_batcher
+from app.services import preference_index as preference_index_module
 from app.services.auth_service import create_access_token, hash_password
+from app.workers import tasks
 
 settings = get_settings()
 
@@ -43,6 +46,62 @@ async def db_session(db_engine):
         yield session
 
 
+@pytest.fixture
+def worker_db(db_engine, monkeypatch):
+    """Open the sessions of workers and background tasks on the test database."""
+    import app.db.session
+
+    session_factory = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(app.db.session, "AsyncSessionLocal", session_factory)
+    return session_factory
+
+
+@pytest.fixture
+def worker_env(worker_db, monkeypatch):
+    """Point the worker at the test database and record enqueued notifications."""
+    monkeypatch.setattr(preference_index_module.preference_index, "sync", lambda redis_client: 0)
+    preference_index_module.preference_index.clear()
+
+    sent: list[str] = []
+    monkeypatch.setattr(tasks.notify_user, "send", sent.append)
+    monkeypatch.setattr(tasks.notify_users, "send", sent.extend)
+    yield sent
+    preference_index_module.preference_index.clear()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.keys = {}
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.keys:
+            return None
+        self.keys[key] = value
+        return True
+
+    def delete(self, key):
+        self.keys.pop(key, None)
+
+
+@pytest.fixture
+def notify_env(worker_db, monkeypatch):
+    """Point the notification tasks at the test database and record flushes and sent emails."""
+    redis = FakeRedis()
+    monkeypatch.setattr(notification_batcher, "get_redis", lambda: redis)
+
+    env = {"redis": redis, "flushes": [], "emails": []}
+    monkeypatch.setattr(
+        tasks.flush_notifications, "send_with_options", lambda args, delay: env["flushes"].append((args, delay))
+    )
+
+    async def fake_send_email(to, subject, html):
+        env["emails"].append((to, subject, html))
+        return True
+
+    monkeypatch.setattr("app.services.email_service.send_email", fake_send_email)
+    return env
+
+
 @pytest_asyncio.fixture(scope="function")
 async def async_client(db_session):
     def override_db():
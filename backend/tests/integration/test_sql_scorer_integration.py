@@ -0,0 +1,41 @@
+"""The SQL scorer's Python equivalence tests on Postgres — skipped if Docker not available."""
+
+import pytest
+
+from tests.test_sql_scorer import check_insert_city_matches, check_score_expression
+
+try:
+    from testcontainers.postgres import PostgresContainer
+
+    DOCKER_AVAILABLE = True
+except Exception:
+    DOCKER_AVAILABLE = False
+
+
+async def _on_postgres(check) -> None:
+    with PostgresContainer("postgres:16") as pg:
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+        from sqlmodel import SQLModel
+
+        url = pg.get_connection_url().replace("postgresql://", "postgresql+asyncpg://")
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as session:
+            await check(session)
+
+        await engine.dispose()
+
+
+@pytest.mark.skipif(not DOCKER_AVAILABLE, reason="Docker not available")
+@pytest.mark.anyio
+async def test_score_expression_equals_score_listing_on_postgres():
+    await _on_postgres(check_score_expression)
+
+
+@pytest.mark.skipif(not DOCKER_AVAILABLE, reason="Docker not available")
+@pytest.mark.anyio
+async def test_insert_city_matches_equals_python_backfill_on_postgres():
+    await _on_postgres(check_insert_city_matches)
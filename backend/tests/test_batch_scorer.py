@@ -0,0 +1,126 @@
+import itertools
+import random
+
+import numpy as np
+
+from app.services.batch_scorer import PreferenceBlock
+from app.services.matcher import score_listing
+from tests.test_matcher import make_listing, make_pref
+
+
+def _random_pref(rng: random.Random):
+    min_rooms = rng.choice([None, 0.0, 1.0, 2.0])
+    min_size = rng.choice([None, 0, 30, 50])
+    return make_pref(
+        city=rng.choice(["amsterdam", "Amsterdam", "rotterdam"]),
+        min_price=rng.choice([None, 0, 80000, 120000]),
+        max_price=rng.choice([100000, 150000, 250000]),
+        min_rooms=min_rooms,
+        max_rooms=rng.choice([None, 0.0, 2.0, 4.0]),
+        min_size_sqm=min_size,
+        max_size_sqm=rng.choice([None, 0, 60, 120]),
+        pet_friendly=rng.choice([True, False]),
+        furnished=rng.choice([None, True, False]),
+        **rng.choice([{}, {"latitude": 52.37, "longitude": 4.89, "radius_km": rng.choice([1.0, 5.0, 15.0])}]),
+    )
+
+
+def _random_listing(rng: random.Random):
+    return make_listing(
+        city=rng.choice(["amsterdam", "AMSTERDAM", "rotterdam", "utrecht"]),
+        price_eur=rng.choice([0, 80000, 100000, 120000, 150000, 250000, 300000]),
+        rooms=rng.choice([None, 0.0, 1.0, 2.0, 3.5, 4.0, 6.0]),
+        size_sqm=rng.choice([None, 0, 30, 60, 120, 200]),
+        pet_friendly=rng.choice([None, True, False]),
+        furnished=rng.choice([None, True, False]),
+        latitude=rng.choice([None, 52.37, 52.38, 52.45, 52.6]),
+        longitude=4.89,
+    )
+
+
+def test_batch_scores_equal_score_listing():
+    rng = random.Random(42)
+    prefs = [_random_pref(rng) for _ in range(500)]
+    listings = [_random_listing(rng) for _ in range(200)]
+    block = PreferenceBlock(prefs)
+
+    scores = block.score_block(listings)
+
+    assert scores.shape == (len(listings), len(prefs))
+    for i, listing in enumerate(listings):
+        for j, pref in enumerate(prefs):
+            assert scores[i, j] == score_listing(listing, pref)
+
+
+def test_single_listing_matches_block_row():
+    rng = random.Random(7)
+    prefs = [_random_pref(rng) for _ in range(50)]
+    listing = _random_listing(rng)
+    block = PreferenceBlock(prefs)
+
+    assert block.score(listing).tolist() == [score_listing(listing, p) for p in prefs]
+
+
+def test_extras_combinations_equal_score_listing():
+    prefs = [
+        make_pref(pet_friendly=pet, furnished=furnished)
+        for pet, furnished in itertools.product([True, False], [None, True, False])
+    ]
+    listings = [
+        make_listing(pet_friendly=pet, furnished=furnished)
+        for pet, furnished in itertools.product([None, True, False], [None, True, False])
+    ]
+    scores = PreferenceBlock(prefs).score_block(listings)
+    for i, listing in enumerate(listings):
+        assert scores[i].tolist() == [score_listing(listing, p) for p in prefs]
+
+
+def test_empty_block():
+    block = PreferenceBlock([])
+    assert len(block) == 0
+    assert block.score(make_listing()).shape == (0,)
+
+
+_KEYWORDS = ["balkon", "gemeubileerd", "tuin", "vaatwasser", "dicht bij centrum", "geïsoleerd", "lift", "berging"]
+_TEXTS = [
+    "Gemeubileerd appartement met balkon",
+    "Ruime woning, tuin en vaatwasser. Dicht bij  Centrum!",
+    "Goed geisoleerd huis",
+    "Studio met lift en berging",
+    "Studio",
+]
+
+
+def test_keyword_scores_equal_score_listing():
+    rng = random.Random(3)
+    prefs = []
+    for _ in range(400):
+        pref = _random_pref(rng)
+        # Up to all eight keywords, so fractions of four and eight land halfway between thousandths
+        pref.keywords = rng.choice([None, [], rng.sample(_KEYWORDS, rng.randint(1, len(_KEYWORDS)))])
+        prefs.append(pref)
+    listings = []
+    for _ in range(100):
+        listing = _random_listing(rng)
+        listing.title, listing.description = rng.choice(_TEXTS), rng.choice([None, *_TEXTS])
+        listings.append(listing)
+    block = PreferenceBlock(prefs)
+
+    scores = block.score_block(listings)
+    for i, listing in enumerate(listings):
+        assert scores[i].tolist() == [score_listing(listing, p) for p in prefs]
+
+    # A sub-block shares the parent's keyword index but scores only its own columns
+    idx = np.array(sorted(rng.sample(range(len(prefs)), 40)))
+    sub = block.take(idx)
+    assert sub.score_block(listings).tolist() == scores[:, idx].tolist()
+    assert sub.take(np.array([3, 1])).prefs == [prefs[idx[3]], prefs[idx[1]]]
+
+
+def test_halfway_score_rounds_like_score_listing():
+    # City, size, a furnished match and three of four keywords: 0.5375, which round() takes down
+    pref = make_pref(pet_friendly=True, furnished=False, keywords=["balkon", "tuin", "vaatwasser", "lift"])
+    listing = make_listing(price_eur=300000, rooms=None, pet_friendly=None, furnished=False)
+    listing.title, listing.description = "Balkon, tuin en vaatwasser", None
+
+    assert PreferenceBlock([pref]).score(listing).tolist() == [score_listing(listing, pref)]
@@ -0,0 +1,93 @@
+import uuid
+
+import pytest
+from sqlmodel import select
+
+from app.config import get_settings
+from app.models.notification import Notification
+from app.services import http_clients
+from app.services.bulk_email import BulkRecipient, send_bulk_email, send_bulk_notifications
+from app.workers import tasks
+from benchmarks.notification_standin import StandInServer
+
+settings = get_settings()
+
+
+@pytest.fixture
+def sendgrid(monkeypatch):
+    with StandInServer() as server:
+        monkeypatch.setattr(settings, "SENDGRID_API_URL", server.url)
+        monkeypatch.setattr(settings, "MOCK_EMAIL", False)
+        yield server
+
+
+def _recipients(n: int) -> list[BulkRecipient]:
+    return [BulkRecipient(uuid.uuid4(), f"user{i}@example.com", {"-name-": f"User {i}"}) for i in range(n)]
+
+
+@pytest.mark.anyio
+async def test_recipients_packed_per_request(sendgrid, monkeypatch):
+    monkeypatch.setattr(settings, "SENDGRID_BATCH_SIZE", 100)
+    try:
+        outcomes = await send_bulk_email("Hi -name-", "<p>Hi -name-</p>", _recipients(250))
+    finally:
+        await http_clients.close_clients()
+
+    assert outcomes == [None] * 250
+    assert sendgrid.requests == 3
+    assert len(sendgrid.delivered) == 250
+
+
+@pytest.mark.anyio
+async def test_rejected_recipient_does_not_block_batch(sendgrid):
+    recipients = _recipients(5)
+    sendgrid.reject = {recipients[1].email, recipients[3].email}
+    try:
+        outcomes = await send_bulk_email("Hi", "<p>Hi</p>", recipients)
+    finally:
+        await http_clients.close_clients()
+
+    assert [o is None for o in outcomes] == [True, False, True, False, True]
+    assert outcomes[1] == "Invalid email"
+    assert sorted(sendgrid.delivered) == sorted(r.email for i, r in enumerate(recipients) if i in (0, 2, 4))
+
+
+@pytest.mark.anyio
+async def test_outcomes_recorded_per_recipient(sendgrid, db_session, test_user):
+    recipients = [
+        BulkRecipient(test_user.id, test_user.email, {"-name-": "Test"}),
+        BulkRecipient(test_user.id, "bounce@example.com", {"-name-": "Bounce"}),
+        BulkRecipient(test_user.id, "bounce2@example.com", {"-name-": "Bounce 2"}),
+    ]
+    sendgrid.reject = {"bounce@example.com", "bounce2@example.com"}
+    try:
+        outcome = await send_bulk_notifications(db_session, "trial_ending_48h", "Hi", "<p>Hi</p>", recipients)
+    finally:
+        await http_clients.close_clients()
+
+    assert outcome == {"sent": 1, "failed": 2}
+    rows = (await db_session.execute(select(Notification).execution_options(populate_existing=True))).scalars().all()
+    by_name = {row.payload["substitutions"]["-name-"]: row for row in rows}
+    assert by_name["Test"].status == "sent" and by_name["Test"].sent_at is not None
+    for name in ("Bounce", "Bounce 2"):
+        assert by_name[name].status == "failed" and by_name[name].error_message == "Invalid email"
+    assert {row.type for row in rows} == {"trial_ending_48h"}
+
+
+@pytest.mark.anyio
+async def test_trial_reminders_use_one_request(sendgrid, worker_db, db_session):
+    from app.models.user import User
+
+    users = [User(email=f"trial{i}@example.com", full_name=f"Trial {i}") for i in range(20)]
+    db_session.add_all(users)
+    await db_session.commit()
+
+    try:
+        await tasks._send_trial_reminders_async([str(u.id) for u in users], "48h")
+    finally:
+        await http_clients.close_clients()
+
+    assert sendgrid.requests == 1
+    assert len(sendgrid.delivered) == 20
+    statuses = (await db_session.execute(select(Notification.status))).scalars().all()
+    assert statuses == ["sent"] * 20
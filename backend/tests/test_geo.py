@@ -0,0 +1,41 @@
+import random
+
+from app.services.geo import GeoGrid, haversine_km, within_radius
+from tests.test_matcher import make_pref
+
+AMSTERDAM = (52.3676, 4.9041)
+ROTTERDAM = (51.9244, 4.4777)
+
+
+def test_haversine_known_distance():
+    assert 56 < haversine_km(*AMSTERDAM, *ROTTERDAM) < 58
+    assert haversine_km(*AMSTERDAM, *AMSTERDAM) == 0
+
+
+def test_within_radius():
+    pref = make_pref(latitude=AMSTERDAM[0], longitude=AMSTERDAM[1], radius_km=10)
+    assert within_radius(52.40, 4.90, pref)
+    assert not within_radius(*ROTTERDAM, pref)
+    assert not within_radius(None, None, pref)
+    assert within_radius(None, None, make_pref())
+
+
+def test_grid_never_misses_a_containing_circle():
+    rng = random.Random(5)
+    prefs = [
+        make_pref(
+            latitude=52.3 + rng.uniform(-0.15, 0.15),
+            longitude=4.9 + rng.uniform(-0.25, 0.25),
+            radius_km=rng.choice([0.5, 1, 3, 8, 20]),
+        )
+        for _ in range(500)
+    ] + [make_pref(), make_pref(latitude=52.3, longitude=4.9, radius_km=400)]
+    grid = GeoGrid(prefs)
+
+    for _ in range(300):
+        point = (52.3 + rng.uniform(-0.3, 0.3), 4.9 + rng.uniform(-0.5, 0.5))
+        near = set(grid.near([point]).tolist())
+        containing = {i for i, p in enumerate(prefs) if p.radius_km and within_radius(*point, p)}
+        assert containing <= near
+        assert len(prefs) - 2 not in near  # no radius: callers keep it unconditionally
+        assert len(prefs) - 1 in near  # too wide for the grid: always returned
@@ -0,0 +1,44 @@
+import pytest
+
+from app.config import get_settings
+from app.services import email_service, http_clients, telegram_service
+from benchmarks.notification_standin import StandInServer
+
+settings = get_settings()
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    with StandInServer() as server:
+        monkeypatch.setattr(settings, "TELEGRAM_API_URL", server.url)
+        monkeypatch.setattr(settings, "SENDGRID_API_URL", server.url)
+        monkeypatch.setattr(settings, "MOCK_TELEGRAM", False)
+        monkeypatch.setattr(settings, "MOCK_EMAIL", False)
+        yield server
+
+
+@pytest.mark.anyio
+async def test_client_reused_until_closed():
+    client = http_clients.get_client("telegram")
+    assert http_clients.get_client("telegram") is client
+    assert http_clients.get_client("sendgrid") is not client
+
+    await http_clients.close_clients()
+    assert client.is_closed
+    replacement = http_clients.get_client("telegram")
+    assert replacement is not client
+    await http_clients.close_clients()
+
+
+@pytest.mark.anyio
+async def test_sequential_sends_share_one_connection(standin):
+    try:
+        for i in range(5):
+            assert await telegram_service.send_telegram_message(str(i), "hello")
+            assert await email_service.send_email(f"u{i}@example.com", "Match", "<p>hi</p>")
+    finally:
+        await http_clients.close_clients()
+
+    assert standin.requests == 10
+    # One keep-alive connection per service
+    assert len(standin.connections) == 2
@@ -0,0 +1,36 @@
+import numpy as np
+
+from app.services.keywords import KeywordIndex, keyword_fraction, normalize_keywords, tokenize
+from tests.test_matcher import make_listing, make_pref
+
+
+def test_tokenize_folds_case_punctuation_and_diacritics():
+    assert tokenize("Gemeubileerd, met BALKON!") == ["gemeubileerd", "met", "balkon"]
+    assert tokenize("Geïsoleerd café") == ["geisoleerd", "cafe"]
+    assert tokenize("Ĳsselmonde") == ["ijsselmonde"]
+    assert tokenize(None) == []
+
+
+def test_normalize_keywords_dedupes_and_drops_blanks():
+    assert normalize_keywords(["Tuin", "tuin ", "  ", "dicht bij centrum"]) == {("tuin",), ("dicht", "bij", "centrum")}
+    assert normalize_keywords(None) == set()
+
+
+def test_phrase_keyword_needs_contiguous_tokens():
+    keywords = normalize_keywords(["dicht bij centrum"])
+    assert keyword_fraction(make_listing(description="Dicht bij het centrum"), keywords) == 0
+    assert keyword_fraction(make_listing(description="Ligt dicht bij centrum."), keywords) == 1
+
+
+def test_keyword_index_hits_per_preference():
+    prefs = [
+        make_pref(keywords=["balkon", "tuin"]),
+        make_pref(keywords=None),
+        make_pref(keywords=["Balkon", "lift", "dicht bij centrum"]),
+    ]
+    index = KeywordIndex(prefs)
+    listing = make_listing(title="Appartement met balkon", description="Dicht bij centrum, geen lift")
+
+    assert index.counts.tolist() == [2, 0, 3]
+    assert index.hits(listing).tolist() == [1, 0, 3]
+    assert np.array_equal(index.hits(make_listing(title="Studio")), np.zeros(3))
@@ -0,0 +1,248 @@
+import uuid
+
+import pytest
+from sqlmodel import select, update
+
+from app.models.match import Match
+from app.services import preference_index as preference_index_module
+from app.services.match_writer import insert_matches, match_row
+from app.services.matcher import score_listing
+from app.workers import tasks
+from tests.test_matcher import make_listing, make_pref
+
+
+async def _matches(db_session):
+    result = await db_session.execute(select(Match))
+    return result.scalars().all()
+
+
+@pytest.mark.anyio
+async def test_insert_matches_skips_existing_pairs(db_session):
+    listing = make_listing()
+    pref = make_pref()
+    db_session.add_all([listing, pref])
+    await db_session.commit()
+
+    first = await insert_matches(db_session, [match_row(pref.user_id, listing.id, pref.id, 0.9)])
+    second = await insert_matches(db_session, [match_row(pref.user_id, listing.id, pref.id, 0.9)])
+    await db_session.commit()
+
+    assert len(first) == 1
+    assert second == []
+    assert len(await _matches(db_session)) == 1
+
+
+@pytest.mark.anyio
+async def test_insert_matches_keeps_best_row_per_user(db_session):
+    listing = make_listing()
+    user_id = uuid.uuid4()
+    low, high = make_pref(user_id=user_id), make_pref(user_id=user_id)
+    db_session.add_all([listing, low, high])
+    await db_session.commit()
+
+    inserted = await insert_matches(
+        db_session,
+        [match_row(user_id, listing.id, low.id, 0.6), match_row(user_id, listing.id, high.id, 0.9)],
+    )
+    await db_session.commit()
+
+    matches = await _matches(db_session)
+    assert len(inserted) == 1
+    assert matches[0].preference_id == high.id
+
+
+@pytest.mark.anyio
+async def test_match_listing_notifies_only_new_matches(db_session, worker_env):
+    listing = make_listing(price_eur=150000)
+    in_budget = make_pref(min_price=100000, max_price=200000)
+    over_budget = make_pref(min_price=None, max_price=120000)
+    db_session.add_all([listing, in_budget, over_budget])
+    await db_session.commit()
+
+    await tasks._match_listing_async(str(listing.id))
+    await tasks._match_listing_async(str(listing.id))
+
+    matches = await _matches(db_session)
+    assert [m.preference_id for m in matches] == [in_budget.id]
+    assert worker_env == [str(matches[0].id)]
+
+
+@pytest.mark.anyio
+async def test_lost_preference_change_is_reconciled_from_database(db_session, worker_env, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    kept = make_pref(min_price=None, max_price=200000)
+    edited = make_pref(min_price=None, max_price=200000)
+    db_session.add_all([kept, edited])
+    await db_session.commit()
+    block = await preference_index_module.get_candidates(db_session, "amsterdam", 150000)
+    assert {p.id for p in block.prefs} == {kept.id, edited.id}
+
+    # Written without a change event reaching the stream
+    edited.is_active = False
+    edited.updated_at = datetime.now(timezone.utc) + timedelta(seconds=1)
+    added = make_pref(min_price=None, max_price=200000)
+    db_session.add(added)
+    await db_session.commit()
+    block = await preference_index_module.get_candidates(db_session, "amsterdam", 150000)
+    assert {p.id for p in block.prefs} == {kept.id, edited.id}
+
+    monkeypatch.setattr(preference_index_module.settings, "PREFERENCE_INDEX_RECONCILE_SECONDS", 0)
+    block = await preference_index_module.get_candidates(db_session, "amsterdam", 150000)
+    assert {p.id for p in block.prefs} == {kept.id, added.id}
+
+
+@pytest.mark.anyio
+async def test_match_listing_skips_preferences_changed_since_index_load(db_session, worker_env):
+    listing = make_listing(price_eur=150000)
+    deactivated = make_pref(min_price=None, max_price=200000)
+    repriced = make_pref(min_price=None, max_price=200000)
+    current = make_pref(min_price=None, max_price=200000)
+    db_session.add_all([listing, deactivated, repriced, current])
+    await db_session.commit()
+    await preference_index_module.get_candidates(db_session, "amsterdam", 150000)
+
+    # The index still holds the old snapshots: no change event was applied
+    deactivated.is_active = False
+    repriced.max_price = 120000
+    await db_session.commit()
+    await tasks._match_listing_async(str(listing.id))
+
+    assert [m.preference_id for m in await _matches(db_session)] == [current.id]
+
+
+@pytest.mark.anyio
+async def test_match_preference_backfills_live_listings(db_session, worker_env, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    from app.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "MATCH_BACKFILL_NOTIFY_LIMIT", 2)
+    now = datetime.now(timezone.utc)
+    pref = make_pref(city="Amsterdam", min_price=100000, max_price=200000)
+    live = [make_listing(source_id=str(i), first_seen_at=now - timedelta(hours=i)) for i in range(4)]
+    delisted = make_listing(source_id="gone", delisted_at=now)
+    too_expensive = make_listing(source_id="pricey", price_eur=300000)
+    elsewhere = make_listing(source_id="rdam", city="rotterdam")
+    db_session.add_all([pref, *live, delisted, too_expensive, elsewhere])
+    await db_session.commit()
+
+    await tasks._match_preference_async(str(pref.id))
+
+    matches = {m.listing_id: m for m in await _matches(db_session)}
+    assert set(matches) == {listing.id for listing in live}
+    # Only the newest listings are notified about
+    assert worker_env == [str(matches[live[0].id].id), str(matches[live[1].id].id)]
+
+    await tasks._match_preference_async(str(pref.id))
+    assert len(await _matches(db_session)) == 4
+    assert len(worker_env) == 2
+
+
+@pytest.mark.anyio
+async def test_match_listings_scores_batch_across_cities(db_session, worker_env, monkeypatch):
+    # One listing per scored chunk: matches must still pair each listing with its own preferences
+    monkeypatch.setattr(tasks, "SCORE_CHUNK_SIZE", 1)
+    cheap = make_listing(source_id="a", price_eur=90000)
+    mid = make_listing(source_id="b", price_eur=150000)
+    utrecht = make_listing(source_id="c", city="utrecht", price_eur=150000)
+    ams_budget = make_pref(min_price=None, max_price=100000)
+    ams_mid = make_pref(min_price=120000, max_price=200000)
+    utr = make_pref(city="utrecht", min_price=None, max_price=200000)
+    db_session.add_all([cheap, mid, utrecht, ams_budget, ams_mid, utr])
+    await db_session.commit()
+
+    await tasks._match_listings_async([str(cheap.id), str(mid.id), str(utrecht.id), str(uuid.uuid4())])
+
+    pairs = {(m.listing_id, m.preference_id) for m in await _matches(db_session)}
+    assert pairs == {(cheap.id, ams_budget.id), (mid.id, ams_mid.id), (utrecht.id, utr.id)}
+    assert len(worker_env) == 3
+
+
+@pytest.mark.anyio
+async def test_radius_preference_matches_only_listings_inside_circle(db_session, worker_env):
+    pref = make_pref(latitude=52.37, longitude=4.89, radius_km=3)
+    near = make_listing(source_id="near", latitude=52.38, longitude=4.90)
+    far = make_listing(source_id="far", latitude=52.50, longitude=4.89)
+    unknown = make_listing(source_id="unknown")
+    db_session.add_all([pref, near, far, unknown])
+    await db_session.commit()
+
+    await tasks._match_listings_async([str(near.id), str(far.id), str(unknown.id)])
+    assert {m.listing_id for m in await _matches(db_session)} == {near.id}
+
+    other = make_pref(latitude=52.50, longitude=4.89, radius_km=1)
+    db_session.add(other)
+    await db_session.commit()
+    await tasks._match_preference_async(str(other.id))
+    assert {(m.listing_id, m.preference_id) for m in await _matches(db_session)} == {
+        (near.id, pref.id),
+        (far.id, other.id),
+    }
+
+
+@pytest.mark.anyio
+async def test_rescore_on_price_drop_creates_and_retires_only_flipped_matches(db_session, worker_env):
+    from app.models.notification import Notification
+
+    listing = make_listing(price_eur=150000)
+    stays = make_pref(min_price=100000, max_price=200000)
+    loses = make_pref(min_price=140000, max_price=200000)
+    gains = make_pref(min_price=None, max_price=120000)
+    user_id = uuid.uuid4()
+    # Same user: losing one preference falls back to the other, without a second alert
+    loses_fallback = make_pref(user_id=user_id, min_price=145000, max_price=160000)
+    fallback = make_pref(user_id=user_id, min_price=100000, max_price=130000)
+    db_session.add_all([listing, stays, loses, gains, loses_fallback, fallback])
+    await db_session.commit()
+    await tasks._match_listing_async(str(listing.id))
+    before = {m.preference_id: m.id for m in await _matches(db_session)}
+    assert set(before) == {stays.id, loses.id, loses_fallback.id}
+    db_session.add(
+        Notification(user_id=loses.user_id, match_id=before[loses.id], channel="email", type="match", payload={})
+    )
+    # The fallback user has already been alerted about the listing
+    await db_session.execute(update(Match).where(Match.id == before[loses_fallback.id]).values(notified=True))
+    worker_env.clear()
+
+    listing.price_eur = 110000
+    await db_session.commit()
+    await tasks._rescore_listings_async([(str(listing.id), 150000)])
+
+    live = select(Match.preference_id, Match.id).where(Match.retired_at.is_(None))
+    after = dict((await db_session.execute(live)).all())
+    assert set(after) == {stays.id, gains.id, fallback.id}
+    assert after[stays.id] == before[stays.id]
+    # The user with a fallback keeps the same match, now through the other preference
+    assert after[fallback.id] == before[loses_fallback.id]
+    assert worker_env == [str(after[gains.id])]
+    retired = select(Match.id).where(Match.retired_at.is_not(None))
+    assert (await db_session.execute(retired)).scalars().all() == [before[loses.id]]
+    notification = (await db_session.execute(select(Notification))).scalar_one()
+    assert (notification.match_id, notification.status) == (before[loses.id], "cancelled")
+
+    # Back to the old price: the retired match returns with its history
+    listing.price_eur = 150000
+    await db_session.commit()
+    worker_env.clear()
+    await tasks._rescore_listings_async([(str(listing.id), 110000)])
+    after = dict((await db_session.execute(live)).all())
+    assert set(after) == {stays.id, loses.id, loses_fallback.id}
+    assert after[loses.id] == before[loses.id]
+    assert worker_env == [str(before[loses.id])]
+
+
+@pytest.mark.anyio
+async def test_rematch_city_scores_in_sql_and_python_without_notifying(db_session, worker_env):
+    listing = make_listing(title="Appartement met balkon")
+    plain = make_pref()
+    with_keywords = make_pref(keywords=["Balkon"])
+    elsewhere = make_pref(city="utrecht")
+    db_session.add_all([listing, plain, with_keywords, elsewhere])
+    await db_session.commit()
+
+    await tasks._rematch_city_async("amsterdam")
+
+    matches = {m.preference_id: m.score for m in await _matches(db_session)}
+    assert matches == {plain.id: score_listing(listing, plain), with_keywords.id: score_listing(listing, with_keywords)}
+    assert worker_env == []
@@ -0,0 +1,76 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app.api.listings import ranked_matches_query
+from app.models.match import Match
+from tests.test_matcher import make_listing
+
+
+async def _seed_matches(db_session, user_id, scores):
+    now = datetime.now(timezone.utc)
+    matches = []
+    for i, score in enumerate(scores):
+        listing = make_listing(source_id=str(uuid.uuid4()))
+        match = Match(
+            user_id=user_id,
+            listing_id=listing.id,
+            preference_id=uuid.uuid4(),
+            score=score,
+            created_at=now - timedelta(minutes=i),
+        )
+        db_session.add_all([listing, match])
+        matches.append(match)
+    await db_session.commit()
+    return matches
+
+
+@pytest.mark.anyio
+async def test_ranked_feed_orders_by_score_then_recency(async_client, test_user, auth_headers, db_session):
+    matches = await _seed_matches(db_session, test_user.id, [0.6, 0.9, 0.75, 0.9, 0.55])
+    await _seed_matches(db_session, uuid.uuid4(), [1.0])
+
+    r = await async_client.get("/matches?sort=ranked&k=3", headers=auth_headers)
+
+    assert r.status_code == 200
+    # Equal scores: the newer match (smaller index) first
+    assert [m["id"] for m in r.json()["items"]] == [str(matches[i].id) for i in (1, 3, 2)]
+
+
+@pytest.mark.anyio
+async def test_seen_matches_leave_the_ranked_feed(async_client, test_user, auth_headers, db_session):
+    matches = await _seed_matches(db_session, test_user.id, [0.9, 0.8, 0.7])
+
+    r = await async_client.post("/matches/seen", headers=auth_headers, json={"match_ids": [str(matches[0].id)]})
+    assert r.json() == {"updated": 1}
+
+    r = await async_client.get("/matches?sort=ranked", headers=auth_headers)
+    assert [m["id"] for m in r.json()["items"]] == [str(matches[1].id), str(matches[2].id)]
+    # The chronological feed still lists everything
+    r = await async_client.get("/matches", headers=auth_headers)
+    assert r.json()["total"] == 3
+
+
+@pytest.mark.anyio
+async def test_retired_matches_leave_both_feeds(async_client, test_user, auth_headers, db_session):
+    matches = await _seed_matches(db_session, test_user.id, [0.9, 0.8])
+    matches[0].retired_at = datetime.now(timezone.utc)
+    await db_session.commit()
+
+    r = await async_client.get("/matches?sort=ranked", headers=auth_headers)
+    assert [m["id"] for m in r.json()["items"]] == [str(matches[1].id)]
+    r = await async_client.get("/matches", headers=auth_headers)
+    assert r.json()["total"] == 1
+
+
+@pytest.mark.anyio
+async def test_ranked_feed_query_uses_the_partial_index(db_session):
+    # The statement the endpoint runs, with its parameters inlined
+    query = ranked_matches_query(uuid.uuid4(), 20)
+    sql = query.compile(dialect=db_session.bind.dialect, compile_kwargs={"literal_binds": True})
+    plan = await db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+    detail = " ".join(row[-1] for row in plan.all())
+    assert "ix_matches_user_unseen_rank" in detail
+    assert "TEMP B-TREE" not in detail
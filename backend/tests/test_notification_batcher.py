@@ -0,0 +1,147 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlmodel import select
+
+from app.config import get_settings
+from app.models.match import Match
+from app.services.match_writer import insert_matches, match_row
+from app.services.notification_batcher import next_digest_delay_ms, render_email, render_telegram
+from app.services.outbox import enqueue_match_notifications
+from app.workers import tasks
+from tests.test_matcher import make_listing
+
+
+async def _seed(db_session, user, n):
+    listings = [make_listing(source_id=str(i), title=f"Listing {i}") for i in range(n)]
+    db_session.add_all(listings)
+    ids = await insert_matches(
+        db_session, [match_row(user.id, listing.id, listing.id, 0.8 + i / 100) for i, listing in enumerate(listings)]
+    )
+    await enqueue_match_notifications(db_session, ids)
+    await db_session.commit()
+    return ids
+
+
+def test_render_single_match_keeps_the_instant_format():
+    listing = make_listing(title="Nice flat", price_eur=150000, source_url="https://example.com/1")
+    assert render_telegram([listing]).startswith("<b>New Rental Match!</b>\nNice flat\nPrice: €1500/month")
+    subject, html = render_email([listing])
+    assert subject == "New Rental Match!"
+    assert "<p>Nice flat</p>" in html
+
+
+def test_render_batch_lists_every_match():
+    listings = [make_listing(title=f"Flat {i}") for i in range(20)]
+    text = render_telegram(listings)
+    assert text.startswith("<b>20 New Rental Matches!</b>")
+    assert "…and 5 more" in text
+    subject, html = render_email(listings, digest=True)
+    assert subject == "Your daily Rentify digest: 20 matches"
+    assert all(f"Flat {i}<" in html for i in range(20))
+
+
+def test_next_digest_delay():
+    now = datetime(2026, 1, 1, 7, 30, tzinfo=timezone.utc)
+    assert next_digest_delay_ms(now, 8) == 30 * 60 * 1000
+    assert next_digest_delay_ms(now.replace(hour=8, minute=0), 8) == 24 * 3600 * 1000
+
+
+@pytest.mark.anyio
+async def test_burst_of_matches_sends_one_email(db_session, test_user, notify_env, monkeypatch):
+    monkeypatch.setattr(get_settings(), "NOTIFY_COALESCE_SECONDS", 60)
+    match_ids = await _seed(db_session, test_user, 5)
+
+    for match_id in match_ids:
+        await tasks._notify_user_async(str(match_id))
+    assert notify_env["flushes"] == [((str(test_user.id),), 60_000)]
+    assert notify_env["emails"] == []
+
+    await tasks._flush_notifications_async(str(test_user.id))
+
+    assert len(notify_env["emails"]) == 1
+    assert notify_env["emails"][0][1] == "5 New Rental Matches!"
+    # Best score first
+    html = notify_env["emails"][0][2]
+    assert html.index("Listing 4") < html.index("Listing 0")
+    matches = (await db_session.execute(select(Match).execution_options(populate_existing=True))).scalars().all()
+    assert all(m.notified and m.notification_channel == "email" for m in matches)
+    assert notify_env["redis"].keys == {}
+
+
+@pytest.mark.anyio
+async def test_digest_users_wait_for_the_digest_hour(db_session, test_user, notify_env):
+    test_user.notification_mode = "digest"
+    await db_session.commit()
+    match_ids = await _seed(db_session, test_user, 2)
+
+    for match_id in match_ids:
+        await tasks._notify_user_async(str(match_id))
+
+    [(args, delay)] = notify_env["flushes"]
+    assert 0 < delay <= 24 * 3600 * 1000
+    await tasks._flush_notifications_async(*args)
+    assert notify_env["emails"][0][1] == "Your daily Rentify digest: 2 matches"
+
+
+@pytest.mark.anyio
+async def test_zero_window_sends_each_match_immediately(db_session, test_user, notify_env, monkeypatch):
+    monkeypatch.setattr(get_settings(), "NOTIFY_COALESCE_SECONDS", 0)
+    match_ids = await _seed(db_session, test_user, 2)
+
+    for match_id in match_ids:
+        await tasks._notify_user_async(str(match_id))
+
+    assert notify_env["flushes"] == []
+    assert [subject for _, subject, _ in notify_env["emails"]] == ["New Rental Match!"] * 2
+
+
+def test_messages_escape_listing_fields():
+    listing = make_listing(title="Loft <b>Tom & Jerry</b>", source_url="https://example.com/?a=1&b='2'")
+    _, html = render_email([listing])
+    assert "<p>Loft &lt;b&gt;Tom &amp; Jerry&lt;/b&gt;</p>" in html
+    assert "href='https://example.com/?a=1&amp;b=&#x27;2&#x27;'" in html
+    assert "\nLoft &lt;b&gt;Tom &amp; Jerry&lt;/b&gt;\n" in render_telegram([listing])
+
+    # Markdown characters in a title are plain text, so they cannot break a batched message
+    batch = [listing, make_listing(title="Studio_2 *new* [centrum]", source_url="https://example.com/(1)")]
+    text = render_telegram(batch)
+    assert '• <a href="https://example.com/(1)">Studio_2 *new* [centrum]</a>' in text
+    assert '<a href="https://example.com/?a=1&amp;b=&#x27;2&#x27;">Loft &lt;b&gt;Tom &amp; Jerry&lt;/b&gt;</a>' in text
+
+
+@pytest.mark.anyio
+async def test_batch_trigger_hydrates_all_matches_in_constant_queries(
+    db_engine, db_session, test_user, admin_user, notify_env, monkeypatch
+):
+    from sqlalchemy import event
+
+    monkeypatch.setattr(get_settings(), "NOTIFY_COALESCE_SECONDS", 0)
+    match_ids = await _seed(db_session, test_user, 6)
+    listing = make_listing(source_id="admin")
+    db_session.add(listing)
+    await db_session.commit()
+    [admin_match] = await insert_matches(db_session, [match_row(admin_user.id, listing.id, listing.id, 0.9)])
+    await enqueue_match_notifications(db_session, [admin_match])
+    await db_session.commit()
+
+    selects = []
+
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", count)
+    try:
+        await tasks._notify_users_async([str(m) for m in [*match_ids, admin_match]])
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", count)
+
+    # Matches with their users, then the claimed outbox rows with their listings
+    assert len(selects) == 2
+    assert sorted((to, subject) for to, subject, _ in notify_env["emails"]) == [
+        (admin_user.email, "New Rental Match!"),
+        (test_user.email, "6 New Rental Matches!"),
+    ]
+    notified = (await db_session.execute(select(Match.notified).execution_options(populate_existing=True))).scalars()
+    assert all(notified)
@@ -0,0 +1,182 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+from sqlmodel import select
+
+from app.config import get_settings
+from app.models.match import Match
+from app.models.notification import Notification
+from app.services.match_writer import retire_matches
+from app.services.outbox import enqueue_match_notifications
+from app.workers import tasks
+from tests.test_matcher import make_listing, make_pref
+from tests.test_notification_batcher import _seed
+
+
+async def _outbox(db_session):
+    result = await db_session.execute(
+        select(Notification).order_by(Notification.created_at).execution_options(populate_existing=True)
+    )
+    return result.scalars().all()
+
+
+async def _backdate(db_session, **age):
+    await db_session.execute(update(Notification).values(created_at=datetime.now(timezone.utc) - timedelta(**age)))
+    await db_session.commit()
+
+
+async def _retry_due(db_session):
+    await db_session.execute(update(Notification).values(next_attempt_at=datetime.now(timezone.utc)))
+    await db_session.commit()
+
+
+@pytest.mark.anyio
+async def test_new_matches_are_enqueued_with_the_match(db_session, test_user, worker_env):
+    listing = make_listing(price_eur=150000)
+    db_session.add_all([listing, make_pref(user_id=test_user.id)])
+    await db_session.commit()
+
+    await tasks._match_listing_async(str(listing.id))
+
+    [row] = await _outbox(db_session)
+    [match] = (await db_session.execute(select(Match))).scalars().all()
+    assert (row.status, row.type, row.channel) == ("pending", "match", "email")
+    assert row.match_id == match.id and row.user_id == test_user.id
+    assert worker_env == [str(match.id)]
+
+
+@pytest.mark.anyio
+async def test_flush_settles_outbox_and_matches(db_session, test_user, notify_env):
+    await _seed(db_session, test_user, 3)
+
+    await tasks._flush_notifications_async(str(test_user.id))
+
+    rows = await _outbox(db_session)
+    assert {row.status for row in rows} == {"sent"}
+    assert all(row.sent_at is not None for row in rows)
+    matches = (await db_session.execute(select(Match).execution_options(populate_existing=True))).scalars().all()
+    assert all(m.notified for m in matches)
+    assert len(notify_env["emails"]) == 1
+
+
+@pytest.mark.anyio
+async def test_failed_send_is_retried_then_given_up(db_session, test_user, notify_env, monkeypatch):
+    async def failing_send(to, subject, html):
+        return False
+
+    monkeypatch.setattr("app.services.email_service.send_email", failing_send)
+    monkeypatch.setattr(get_settings(), "NOTIFY_MAX_ATTEMPTS", 2)
+    await _seed(db_session, test_user, 1)
+
+    await tasks._flush_notifications_async(str(test_user.id))
+    [row] = await _outbox(db_session)
+    assert (row.status, row.attempts, row.error_message) == ("pending", 1, "email send failed")
+    assert row.next_attempt_at is not None
+
+    # Not retried before the backoff has passed
+    await tasks._flush_notifications_async(str(test_user.id))
+    [row] = await _outbox(db_session)
+    assert row.attempts == 1
+
+    await _retry_due(db_session)
+    await tasks._flush_notifications_async(str(test_user.id))
+    [row] = await _outbox(db_session)
+    assert (row.status, row.attempts) == ("failed", 2)
+    assert not (await db_session.execute(select(Match.notified))).scalar_one()
+
+
+@pytest.mark.anyio
+async def test_sweep_sends_only_overdue_rows(db_session, test_user, admin_user, notify_env, monkeypatch):
+    monkeypatch.setattr(get_settings(), "NOTIFY_COALESCE_SECONDS", 60)
+    monkeypatch.setattr(get_settings(), "NOTIFY_DISPATCH_INTERVAL_SECONDS", 60)
+    monkeypatch.setattr(get_settings(), "NOTIFY_DISPATCH_BATCH_SIZE", 2)
+    admin_user.notification_mode = "digest"
+    await db_session.commit()
+    await _seed(db_session, test_user, 3)
+    listing = make_listing(source_id="digest")
+    match = Match(user_id=admin_user.id, listing_id=listing.id, preference_id=listing.id, score=0.9)
+    db_session.add_all([listing, match])
+    await db_session.commit()
+    await enqueue_match_notifications(db_session, [match.id])
+    await db_session.commit()
+
+    # Still inside the coalescing window: the trigger will send these
+    assert await tasks._dispatch_notifications_async(reschedule=False) == 0
+
+    await _backdate(db_session, minutes=5)
+    assert await tasks._dispatch_notifications_async(reschedule=False) == 3
+    # Batches of two rows: one email per user per batch
+    assert [to for to, _, _ in notify_env["emails"]] == [test_user.email] * 2
+    rows = await _outbox(db_session)
+    assert sorted(row.status for row in rows) == ["pending", "sent", "sent", "sent"]
+
+    # A digest user's rows are only swept once the digest itself is overdue
+    await _backdate(db_session, days=1, minutes=5)
+    assert await tasks._dispatch_notifications_async(reschedule=False) == 1
+    assert notify_env["emails"][-1][0] == admin_user.email
+    assert notify_env["emails"][-1][1] == "Your daily Rentify digest: 1 matches"
+
+
+@pytest.mark.anyio
+async def test_sweep_backs_off_failed_rows(db_session, test_user, notify_env, monkeypatch):
+    async def failing_send(to, subject, html):
+        return False
+
+    monkeypatch.setattr("app.services.email_service.send_email", failing_send)
+    monkeypatch.setattr(get_settings(), "NOTIFY_DISPATCH_BATCH_SIZE", 2)
+    monkeypatch.setattr(get_settings(), "NOTIFY_MAX_ATTEMPTS", 3)
+    await _seed(db_session, test_user, 5)
+    await _backdate(db_session, minutes=5)
+
+    # More failing rows than one batch: each is attempted once, not re-claimed by the next batch
+    assert await tasks._dispatch_notifications_async(reschedule=False) == 5
+    rows = await _outbox(db_session)
+    assert [(row.status, row.attempts) for row in rows] == [("pending", 1)] * 5
+    assert all(row.next_attempt_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc) for row in rows)
+    assert await tasks._dispatch_notifications_async(reschedule=False) == 0
+
+    await _retry_due(db_session)
+    assert await tasks._dispatch_notifications_async(reschedule=False) == 5
+    rows = await _outbox(db_session)
+    assert [(row.status, row.attempts) for row in rows] == [("pending", 2)] * 5
+
+
+@pytest.mark.anyio
+async def test_retired_match_is_kept_and_cancels_pending_notification(db_session, test_user):
+    listing = make_listing()
+    pref = make_pref(user_id=test_user.id)
+    match = Match(user_id=test_user.id, listing_id=listing.id, preference_id=pref.id, score=0.9)
+    db_session.add_all([listing, pref, match])
+    await db_session.commit()
+    await enqueue_match_notifications(db_session, [match.id])
+    await db_session.commit()
+
+    await retire_matches(db_session, listing.id, [pref.id])
+    await db_session.commit()
+
+    [row] = await _outbox(db_session)
+    assert (row.status, row.match_id) == ("cancelled", match.id)
+    await db_session.refresh(match)
+    assert match.retired_at is not None
+
+
+@pytest.mark.anyio
+async def test_backlog_endpoint(async_client, db_session, test_user, admin_headers):
+    listing = make_listing()
+    pref = make_pref(user_id=test_user.id)
+    match = Match(user_id=test_user.id, listing_id=listing.id, preference_id=pref.id, score=0.9)
+    db_session.add_all([listing, pref, match])
+    await db_session.commit()
+    await enqueue_match_notifications(db_session, [match.id])
+    # A bulk email row not yet settled is not part of the match backlog
+    db_session.add(Notification(user_id=test_user.id, channel="email", type="trial_ending_48h", payload={}))
+    await db_session.commit()
+    await _backdate(db_session, minutes=2)
+
+    response = await async_client.get("/admin/notifications/backlog", headers=admin_headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["pending"], body["failed"]) == (1, 0)
+    assert body["oldest_pending_seconds"] >= 120
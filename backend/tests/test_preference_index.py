@@ -0,0 +1,200 @@
+import json
+import random
+from unittest.mock import MagicMock
+
+from app.services import preference_index as preference_index_module
+from app.services.geo import within_radius
+from app.services.preference_index import CHANGES_STREAM, CityPreferenceIndex, PreferenceIndex, _SortedBlock
+from tests.test_matcher import make_pref
+
+
+def _ids(block):
+    return {str(p.id) for p in block.prefs}
+
+
+def _payload(pref):
+    return json.loads(json.dumps(pref.model_dump(mode="json")))
+
+
+def test_candidates_equal_brute_force():
+    rng = random.Random(1)
+    prefs = [
+        make_pref(min_price=rng.choice([None, 50000, 100000, 150000]), max_price=rng.choice([120000, 180000, 250000]))
+        for _ in range(300)
+    ]
+    index = CityPreferenceIndex()
+    for pref in prefs:
+        index.upsert(pref)
+
+    for price in (0, 50000, 100000, 120000, 150001, 250000, 300000):
+        expected = {str(p.id) for p in prefs if (p.min_price is None or p.min_price <= price) and price <= p.max_price}
+        assert _ids(index.candidates(price)) == expected
+
+
+def test_edits_are_tombstoned_until_compaction():
+    rng = random.Random(2)
+
+    def random_pref():
+        return make_pref(
+            min_price=rng.choice([None, 50000, 100000]),
+            max_price=rng.choice([120000, 180000]),
+            **rng.choice([{}, {"latitude": 52.3, "longitude": 4.9, "radius_km": 5}]),
+        )
+
+    current = {str(pref.id): pref for pref in (random_pref() for _ in range(200))}
+    index = CityPreferenceIndex(current.values())
+
+    def check():
+        for price in (50000, 110000, 150000):
+            expected = {
+                pref_id
+                for pref_id, p in current.items()
+                if (p.min_price is None or p.min_price <= price) and price <= p.max_price
+            }
+            assert _ids(index.candidates(price)) == expected
+            assert _ids(index.candidates(price, points=[(52.3, 4.9)])) == expected
+
+    for pref_id in rng.sample(sorted(current), 30):
+        index.remove(pref_id)
+        del current[pref_id]
+    for pref_id in rng.sample(sorted(current), 30):
+        edited = random_pref()
+        edited.id = current[pref_id].id
+        index.upsert(edited)
+        current[pref_id] = edited
+    check()
+
+    # Edits made while the block is rebuilt survive its installation
+    snapshot = index.start_compaction()
+    for pref_id in rng.sample(sorted(current), 5):
+        index.remove(pref_id)
+        del current[pref_id]
+    added = random_pref()
+    index.upsert(added)
+    current[str(added.id)] = added
+    index.finish_compaction(_SortedBlock(snapshot))
+    check()
+    assert len(index) == len(current)
+
+
+def test_registry_compacts_after_many_edits(monkeypatch):
+    monkeypatch.setattr(preference_index_module, "COMPACT_AFTER_CHANGES", 3)
+    prefs = [make_pref(min_price=None, max_price=200000) for _ in range(5)]
+    registry = PreferenceIndex()
+    index = registry.load_city("amsterdam", prefs[:2])
+    for pref in prefs[2:]:
+        registry.apply(_payload(pref))
+    assert index.needs_compaction()
+
+    assert _ids(registry.candidates("amsterdam", 100000)) == {str(p.id) for p in prefs}
+    assert not index.needs_compaction()
+    assert len(index._sorted) == 5 and not index._tail
+
+
+def test_upsert_replaces_and_remove_drops():
+    pref = make_pref(min_price=100000, max_price=150000)
+    index = CityPreferenceIndex()
+    index.upsert(pref)
+    assert _ids(index.candidates(120000)) == {str(pref.id)}
+
+    pref.min_price, pref.max_price = 200000, 250000
+    index.upsert(pref)
+    assert len(index) == 1
+    assert index.candidates(120000).prefs == []
+    assert _ids(index.candidates(220000)) == {str(pref.id)}
+
+    assert index.remove(pref.id)
+    assert not index.remove(pref.id)
+    assert index.candidates(220000).prefs == []
+
+
+def test_apply_moves_between_cities_and_drops_inactive():
+    pref = make_pref(city="amsterdam", min_price=None, max_price=200000)
+    registry = PreferenceIndex()
+    registry.load_city("amsterdam", [pref])
+    registry.load_city("utrecht", [])
+
+    moved = _payload(pref) | {"city": "Utrecht"}
+    registry.apply(moved)
+    assert registry.candidates("amsterdam", 100000).prefs == []
+    assert _ids(registry.candidates("utrecht", 100000)) == {str(pref.id)}
+
+    registry.apply(moved | {"is_active": False})
+    assert registry.candidates("utrecht", 100000).prefs == []
+
+
+def test_apply_ignores_unloaded_city():
+    registry = PreferenceIndex()
+    registry.apply(_payload(make_pref(city="groningen")))
+    assert registry.candidates("groningen", 100000) is None
+
+
+def test_sync_replays_stream_from_cursor():
+    pref = make_pref(city="amsterdam", min_price=None, max_price=200000)
+    registry = PreferenceIndex()
+    redis_client = MagicMock()
+    redis_client.xrevrange.return_value = [(b"5-0", {})]
+    assert registry.sync(redis_client) == 0
+
+    registry.load_city("amsterdam", [])
+    redis_client.xrange.return_value = [(b"1-0", {})]
+    redis_client.xread.side_effect = [
+        [(CHANGES_STREAM.encode(), [(b"6-0", {b"payload": json.dumps(_payload(pref)).encode()})])],
+        [],
+    ]
+    assert registry.sync(redis_client) == 1
+    assert _ids(registry.candidates("amsterdam", 150000)) == {str(pref.id)}
+    redis_client.xread.assert_called_with({CHANGES_STREAM: "6-0"}, count=1000)
+
+
+def test_sync_drops_cities_after_stream_gap():
+    registry = PreferenceIndex()
+    redis_client = MagicMock()
+    redis_client.xrevrange.return_value = [(b"5-0", {})]
+    registry.sync(redis_client)
+    registry.load_city("amsterdam", [make_pref()])
+
+    redis_client.xrange.return_value = [(b"9-0", {})]
+    redis_client.xread.return_value = []
+    registry.sync(redis_client)
+    assert registry.candidates("amsterdam", 100000) is None
+
+
+def test_candidates_with_points_keep_only_nearby_circles():
+    rng = random.Random(4)
+    prefs = [
+        make_pref(latitude=52.3 + rng.uniform(-0.2, 0.2), longitude=4.9 + rng.uniform(-0.3, 0.3), radius_km=2)
+        for _ in range(400)
+    ] + [make_pref()]
+    index = CityPreferenceIndex(prefs)
+
+    point = (52.31, 4.91)
+    found = _ids(index.candidates(150000, points=[point]))
+    containing = {str(p.id) for p in prefs if within_radius(*point, p)}
+    assert containing <= found
+    assert str(prefs[-1].id) in found
+    assert len(found) < len(prefs) // 4
+    assert _ids(index.candidates(150000)) == {str(p.id) for p in prefs}
+    assert _ids(index.candidates(150000, points=[])) == {str(prefs[-1].id)}
+
+
+def test_candidates_with_points_apply_price_band_to_both_parts():
+    rng = random.Random(7)
+    prefs = [
+        make_pref(
+            min_price=rng.choice([None, 100000, 140000]),
+            max_price=rng.choice([120000, 160000, 250000]),
+            **rng.choice([{}, {"latitude": 52.3 + rng.uniform(-0.2, 0.2), "longitude": 4.9, "radius_km": 5}]),
+        )
+        for _ in range(300)
+    ]
+    index = CityPreferenceIndex(prefs)
+
+    point = (52.3, 4.9)
+    for price, max_price in ((110000, None), (150000, None), (130000, 170000), (300000, None)):
+        upper = price if max_price is None else max_price
+        in_band = [p for p in prefs if (p.min_price is None or p.min_price <= upper) and price <= p.max_price]
+        found = _ids(index.candidates(price, max_price, points=[point]))
+        assert {str(p.id) for p in in_band if within_radius(*point, p)} <= found
+        assert found <= {str(p.id) for p in in_band}
+        assert _ids(index.candidates(price, max_price)) == {str(p.id) for p in in_band}
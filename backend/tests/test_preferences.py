@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 
 
@@ -12,6 +14,20 @@ async def test_create_preference(async_client, test_user, auth_headers):
     assert response.json()["city"] == "amsterdam"
 
 
+@pytest.mark.anyio
+async def test_create_enqueues_backfill_off_the_event_loop(async_client, test_user, auth_headers, monkeypatch):
+    from app.workers import tasks
+
+    sent = []
+    monkeypatch.setattr(tasks.match_preference, "send", lambda pref_id: sent.append((pref_id, threading.get_ident())))
+    response = await async_client.post(
+        "/preferences", headers=auth_headers, json={"city": "amsterdam", "max_price": 200000}
+    )
+
+    assert [pref_id for pref_id, _ in sent] == [response.json()["id"]]
+    assert sent[0][1] != threading.get_ident()
+
+
 @pytest.mark.anyio
 async def test_list_preferences(async_client, test_user, auth_headers):
     response = await async_client.get("/preferences", headers=auth_headers)
@@ -35,3 +51,36 @@ async def test_preference_limit_free_user(async_client, test_user, auth_headers)
         json={"city": "extra_city", "max_price": 200000},
     )
     assert r.status_code == 403
+
+
+@pytest.mark.anyio
+async def test_create_radius_preference(async_client, test_user, auth_headers):
+    body = {"city": "amsterdam", "max_price": 200000, "latitude": 52.37, "longitude": 4.89, "radius_km": 5}
+    r = await async_client.post("/preferences", headers=auth_headers, json=body)
+    assert r.status_code == 201
+    assert r.json()["radius_km"] == 5
+
+    r = await async_client.post(
+        "/preferences", headers=auth_headers, json={"city": "amsterdam", "max_price": 200000, "radius_km": 5}
+    )
+    assert r.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_update_can_clear_radius(async_client, test_user, auth_headers):
+    body = {"city": "amsterdam", "max_price": 200000, "latitude": 52.37, "longitude": 4.89, "radius_km": 5}
+    pref_id = (await async_client.post("/preferences", headers=auth_headers, json=body)).json()["id"]
+
+    r = await async_client.put(f"/preferences/{pref_id}", headers=auth_headers, json={"max_price": 250000})
+    assert r.json()["radius_km"] == 5
+
+    r = await async_client.put(f"/preferences/{pref_id}", headers=auth_headers, json={"radius_km": None})
+    assert r.status_code == 422
+
+    cleared = {"latitude": None, "longitude": None, "radius_km": None}
+    r = await async_client.put(f"/preferences/{pref_id}", headers=auth_headers, json=cleared)
+    assert r.status_code == 200
+    assert (r.json()["latitude"], r.json()["radius_km"], r.json()["max_price"]) == (None, None, 250000)
+
+    r = await async_client.put(f"/preferences/{pref_id}", headers=auth_headers, json={"max_price": None})
+    assert r.status_code == 422
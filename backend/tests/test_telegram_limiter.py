@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.config import get_settings  # noqa: E402
+from app.services import http_clients, telegram_limiter, telegram_service  # noqa: E402
+from app.services.telegram_limiter import RETRY, TelegramRateLimiter  # noqa: E402
+from benchmarks.notification_standin import StandInServer  # noqa: E402
+
+settings = get_settings()
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis(server=fakeredis.FakeServer())
+
+
+def test_per_chat_limit(redis_client):
+    limiter = TelegramRateLimiter(redis_client, global_rate=30, chat_rate=1)
+    first, second = limiter.take_ticket("1"), limiter.take_ticket("1")
+    assert limiter.try_acquire("1", first) == 0
+    assert 900 <= limiter.try_acquire("1", second) <= 1000
+    # Other chats are not held back
+    assert limiter.try_acquire("2", limiter.take_ticket("2")) == 0
+
+
+def test_global_limit(redis_client):
+    limiter = TelegramRateLimiter(redis_client, global_rate=5, chat_rate=1)
+    granted = [limiter.try_acquire(str(chat), limiter.take_ticket(str(chat))) for chat in range(6)]
+    assert granted[:5] == [0] * 5
+    assert 0 < granted[5] <= 200
+
+
+def test_chat_served_in_ticket_order(redis_client):
+    limiter = TelegramRateLimiter(redis_client, global_rate=30, chat_rate=1000)
+    first, second = limiter.take_ticket("1"), limiter.take_ticket("1")
+    assert limiter.try_acquire("1", second) > 0
+    assert limiter.try_acquire("1", first) == 0
+    time.sleep(0.005)
+    assert limiter.try_acquire("1", second) == 0
+
+
+def test_abandoned_ticket_skipped(redis_client):
+    limiter = TelegramRateLimiter(redis_client, global_rate=30, chat_rate=1000, stall_seconds=0.05)
+    limiter.take_ticket("1")  # never polled, as if its worker died
+    second = limiter.take_ticket("1")
+    assert limiter.try_acquire("1", second) > 0
+    time.sleep(0.06)
+    assert limiter.try_acquire("1", second) == 0
+
+
+def test_back_off_holds_queue_for_retry(redis_client):
+    limiter = TelegramRateLimiter(redis_client, global_rate=30, chat_rate=1000)
+    assert limiter.try_acquire("1", limiter.take_ticket("1")) == 0
+    limiter.back_off("1", 0.05)
+    queued = limiter.take_ticket("1")
+    assert limiter.try_acquire("1", RETRY) > 0
+    time.sleep(0.06)
+    # The throttled message goes first
+    assert limiter.try_acquire("1", queued) > 0
+    assert limiter.try_acquire("1", RETRY) == 0
+    time.sleep(0.005)
+    assert limiter.try_acquire("1", queued) == 0
+
+
+@pytest.fixture
+def telegram(monkeypatch, redis_client):
+    with StandInServer(throttle=1) as server:
+        monkeypatch.setattr(settings, "TELEGRAM_API_URL", server.url)
+        monkeypatch.setattr(settings, "MOCK_TELEGRAM", False)
+        # Spaced well beyond a local round trip, as 1/s is in production
+        limiter = TelegramRateLimiter(redis_client, global_rate=30, chat_rate=4)
+        monkeypatch.setattr(telegram_limiter, "get_limiter", lambda: limiter)
+        yield server
+
+
+@pytest.mark.anyio
+async def test_send_retries_after_429_in_order(telegram):
+    try:
+        # A cold client can take longer than the chat interval to send the first message
+        telegram.throttle = 0
+        assert await telegram_service.send_telegram_message("7", "warm up")
+        telegram.reset()
+        telegram.throttle = 1
+        results = await asyncio.gather(*(telegram_service.send_telegram_message("42", f"m{i}") for i in range(4)))
+    finally:
+        await http_clients.close_clients()
+
+    assert results == [True] * 4
+    # m0 got the 429 and was re-sent before the queued messages
+    assert telegram.messages == [("42", f"m{i}") for i in range(4)]
+    assert telegram.requests == 5
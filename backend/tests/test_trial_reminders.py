@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.models.user import User  # noqa: E402
+from app.tasks import reminders  # noqa: E402
+from app.tasks.reminders import (  # noqa: E402
+    REMINDERS_KEY,
+    cancel_trial_reminders,
+    dispatch_due_reminders,
+    rebuild_trial_reminders,
+    schedule_trial_reminders,
+)
+from app.workers import tasks  # noqa: E402
+
+
+@pytest.fixture
+def reminder_env(worker_db, monkeypatch):
+    redis = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+    monkeypatch.setattr(reminders, "_redis", lambda: redis)
+    env = {"redis": redis, "wakes": [], "sent": []}
+    monkeypatch.setattr(tasks.dispatch_trial_reminders, "send_with_options", lambda delay: env["wakes"].append(delay))
+    monkeypatch.setattr(tasks.send_trial_reminders, "send", lambda user_ids, kind: env["sent"].append((kind, user_ids)))
+    return env
+
+
+def _due(redis):
+    return {member.decode(): int(score) for member, score in redis.zrange(REMINDERS_KEY, 0, -1, withscores=True)}
+
+
+def test_schedule_wakes_only_for_an_earlier_deadline(reminder_env):
+    now = datetime.now(timezone.utc)
+    schedule_trial_reminders("a", now + timedelta(days=5))
+    [delay] = reminder_env["wakes"]
+    assert abs(delay - 3 * 24 * 3600 * 1000) < 5000
+    assert _due(reminder_env["redis"]) == {
+        "a:48h": int((now + timedelta(days=3)).timestamp() * 1000),
+        "a:24h": int((now + timedelta(days=4)).timestamp() * 1000),
+    }
+
+    schedule_trial_reminders("b", now + timedelta(days=6))
+    assert len(reminder_env["wakes"]) == 1
+    schedule_trial_reminders("c", now + timedelta(days=4))
+    assert len(reminder_env["wakes"]) == 2
+
+    cancel_trial_reminders("b")
+    assert {m.split(":")[0] for m in _due(reminder_env["redis"])} == {"a", "c"}
+
+
+def test_ended_trial_is_not_scheduled(reminder_env):
+    schedule_trial_reminders("a", datetime.now(timezone.utc) - timedelta(minutes=1))
+    assert _due(reminder_env["redis"]) == {}
+    assert reminder_env["wakes"] == []
+
+
+def test_short_trial_gets_only_the_latest_reminder(reminder_env):
+    now = datetime.now(timezone.utc)
+    schedule_trial_reminders("a", now + timedelta(hours=10))
+    [(member, at)] = _due(reminder_env["redis"]).items()
+    assert member == "a:24h" and abs(at - now.timestamp() * 1000) < 5000
+
+    # The 48h slot has passed, the 24h one is still ahead; a moved trial end drops the stale 48h reminder
+    schedule_trial_reminders("b", now + timedelta(days=5))
+    schedule_trial_reminders("b", now + timedelta(hours=30))
+    assert {m: t for m, t in _due(reminder_env["redis"]).items() if m.startswith("b")} == {
+        "b:24h": int((now + timedelta(hours=6)).timestamp() * 1000)
+    }
+
+
+@pytest.mark.anyio
+async def test_dispatch_sends_due_reminders_in_batches(db_session, reminder_env, monkeypatch):
+    monkeypatch.setattr(reminders.settings, "TRIAL_REMINDER_BATCH_SIZE", 2)
+    now = datetime.now(timezone.utc)
+    users = [User(email=f"t{i}@example.com", subscription_status="trialing") for i in range(3)]
+    converted = User(email="paid@example.com", subscription_status="active")
+    db_session.add_all([*users, converted])
+    await db_session.commit()
+    redis = reminder_env["redis"]
+    now_ms = int(now.timestamp() * 1000)
+    redis.zadd(REMINDERS_KEY, {f"{u.id}:48h": now_ms - 1000 for u in [*users, converted]})
+    later = f"{users[0].id}:24h"
+    redis.zadd(REMINDERS_KEY, {later: now_ms + 3_600_000})
+
+    assert await dispatch_due_reminders() == 3
+
+    sent = [user_id for kind, batch in reminder_env["sent"] for user_id in batch]
+    assert sorted(sent) == sorted(str(u.id) for u in users)
+    assert {kind for kind, _ in reminder_env["sent"]} == {"48h"}
+    # Two batches of at most two reminders
+    assert len(reminder_env["sent"]) == 2
+    assert list(_due(redis)) == [later]
+    # Next wake-up at the remaining deadline
+    assert abs(reminder_env["wakes"][-1] - 3_600_000) < 5000
+
+
+@pytest.mark.anyio
+async def test_rebuild_schedules_existing_trials(db_session, reminder_env):
+    ends = datetime.now(timezone.utc) + timedelta(days=3)
+    trialing = [User(email=f"r{i}@example.com", subscription_status="trialing", trial_ends_at=ends) for i in range(5)]
+    db_session.add_all([*trialing, User(email="none@example.com")])
+    await db_session.commit()
+
+    assert await rebuild_trial_reminders(chunk_size=2) == 5
+    assert len(_due(reminder_env["redis"])) == 10
+    assert len(reminder_env["wakes"]) == 1
+
+
+@pytest.mark.anyio
+async def test_subscription_changes_keep_reminders_in_sync(db_session, reminder_env):
+    from app.services.stripe_service import _handle_checkout_completed, _handle_invoice_paid
+
+    user = User(email="stripe@example.com", stripe_customer_id="cus_123")
+    db_session.add(user)
+    await db_session.commit()
+    event = {"data": {"object": {"customer": "cus_123"}}}
+
+    await _handle_checkout_completed(event, db_session)
+    assert set(_due(reminder_env["redis"])) == {f"{user.id}:48h", f"{user.id}:24h"}
+
+    await _handle_invoice_paid(event, db_session)
+    assert _due(reminder_env["redis"]) == {}
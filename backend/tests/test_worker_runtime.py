@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+from sqlalchemy import text
+
+from app.workers import runtime
+
+
+def _in_thread(fn):
+    result: dict = {}
+
+    def target():
+        try:
+            result["value"] = fn()
+        except BaseException as e:  # surfaced in the test thread below
+            result["error"] = e
+
+    t = threading.Thread(target=target)
+    t.start()
+    t.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+
+def test_run_async_reuses_loop_and_engine_per_thread():
+    async def loop_and_query():
+        async with runtime.worker_session() as db:
+            value = (await db.execute(text("SELECT 1"))).scalar_one()
+        return asyncio.get_running_loop(), value
+
+    def scenario():
+        runtime._local.runtime = runtime.AsyncRuntime("sqlite+aiosqlite:///:memory:")
+        engine = runtime.get_runtime().engine
+        first_loop, first = runtime.run_async(loop_and_query())
+        second_loop, second = runtime.run_async(loop_and_query())
+        same_engine = runtime.get_runtime().engine is engine
+        runtime.shutdown_runtime()
+        return first_loop is second_loop, first_loop.is_closed(), same_engine, (first, second)
+
+    same_loop, closed, same_engine, values = _in_thread(scenario)
+    assert same_loop
+    assert closed
+    assert same_engine
+    assert values == (1, 1)
+
+
+def test_threads_get_separate_runtimes():
+    barrier = threading.Barrier(2)
+    loops = []
+
+    def worker():
+        runtime._local.runtime = runtime.AsyncRuntime("sqlite+aiosqlite:///:memory:")
+        loops.append(runtime.get_runtime().loop)
+        barrier.wait()
+        runtime.shutdown_runtime()
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(loops) == 2
+    assert loops[0] is not loops[1]
+    assert getattr(runtime._local, "runtime", None) is None
@@ -0,0 +1,119 @@
+"""Page fetch throughput: a fresh session per page vs the scraper's pooled session.
+
+Fetches listing pages from a local stand-in of the sites serving the parser
+fixtures (``scrapers.benchmarks.standin``) through ``BaseScraper.fetch_page``
+with the politeness delay turned off, and reports pages/second and the number
+of connections the stand-in saw for each strategy, as one JSON document.
+
+    python -m scrapers.benchmarks.fetch --pages 300 --concurrency 4 --output fetch.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import aiohttp
+
+from scrapers.benchmarks.standin import FixtureServer
+from scrapers.src.scrapers import SCRAPER_REGISTRY
+
+
+def _bench_scraper(site: str, server: FixtureServer, concurrency: int) -> type:
+    base = SCRAPER_REGISTRY[site]
+
+    class BenchScraper(base):
+        max_concurrent = concurrency
+        request_delay_range = (0.0, 0.0)
+
+        def _connector(self) -> aiohttp.TCPConnector:
+            # Same pool limits, trusting the stand-in's self-signed certificate
+            return aiohttp.TCPConnector(limit_per_host=self.max_concurrent, ssl=server.client_ssl() or True)
+
+    return BenchScraper
+
+
+async def _fetch_all(scraper_cls: type, urls: list[str], pooled: bool) -> float:
+    start = time.perf_counter()
+    if pooled:
+        async with scraper_cls() as scraper:
+            await asyncio.gather(*(scraper.fetch_page(url) for url in urls))
+    else:
+        # What fetch_page did before the pooled session: a new session and connection per page
+        scraper = scraper_cls()
+        gate = scraper._semaphore
+
+        async def one(url: str) -> None:
+            async with gate:
+                async with scraper_cls() as fresh:
+                    assert await fresh.fetch_page(url)
+
+        await asyncio.gather(*(one(url) for url in urls))
+    return time.perf_counter() - start
+
+
+def _rate(units: int, seconds: float, unit: str) -> dict:
+    return {unit: units, "seconds": round(seconds, 4), f"{unit}_per_second": round(units / seconds, 1)}
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(server: FixtureServer, site: str, pages: int, concurrency: int) -> dict:
+    scraper_cls = _bench_scraper(site, server, concurrency)
+    urls = [f"{server.url}/listing/{site}/{i}" for i in range(pages)]
+    results = {}
+    for name, pooled in (("session_per_page", False), ("pooled_session", True)):
+        # Warm imports and the TLS context outside the timing
+        asyncio.run(_fetch_all(scraper_cls, urls[:1], pooled))
+        server.reset()
+        elapsed = asyncio.run(_fetch_all(scraper_cls, urls, pooled))
+        results[name] = {"connections": len(server.connections), **_rate(pages, elapsed, "pages")}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--site", default="funda", choices=sorted(SCRAPER_REGISTRY))
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated site response time per request")
+    parser.add_argument("--no-tls", action="store_true")
+    parser.add_argument("--output", type=Path, default=None, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with FixtureServer(tls=not args.no_tls, latency_ms=args.latency_ms) as server:
+        results = run(server, args.site, args.pages, args.concurrency)
+
+    report = {
+        "benchmark": "fetch",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "aiohttp": aiohttp.__version__,
+        "site": args.site,
+        "tls": not args.no_tls,
+        "pages": args.pages,
+        "concurrency": args.concurrency,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
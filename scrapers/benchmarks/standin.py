@@ -0,0 +1,158 @@
+"""Local stand-in for the rental sites, serving the parser fixtures over HTTP.
+
+``GET /search/<site>/<page>`` answers with ``tests/fixtures/<site>_search_results.html``
+and ``GET /listing/<site>/<id>`` with ``<site>_listing_page.html`` (the search
+fixture for sites without one). Search pages carry an ``ETag`` and
+``Last-Modified`` derived from ``search_version`` and answer conditional GETs
+for an unchanged version with a 304. It runs an aiohttp server on a background
+thread, optionally over TLS with a throwaway self-signed certificate (which
+needs ``cryptography``), and records how many requests and distinct client
+connections it saw.
+"""
+
+import asyncio
+import datetime
+import email.utils
+import ipaddress
+import ssl
+import tempfile
+import threading
+from pathlib import Path
+
+from aiohttp import web
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures"
+
+
+def _self_signed_cert(directory: Path) -> tuple[Path, Path]:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "cert.pem", directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    )
+    return cert_path, key_path
+
+
+def _fixture(site: str, kind: str) -> str | None:
+    path = FIXTURES / f"{site}_{kind}.html"
+    return path.read_text(encoding="utf-8") if path.exists() else None
+
+
+class FixtureServer:
+    """Context manager running the stand-in; ``url`` is set once it is listening."""
+
+    def __init__(self, tls: bool = False, latency_ms: float = 0.0) -> None:
+        self.tls = tls
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        self.not_modified = 0
+        self.search_version = 1
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.paths: list[str] = []
+        self.connections: set[tuple[str, int]] = set()
+        self.cert_path: Path | None = None
+        self.url = ""
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._runner: web.AppRunner | None = None
+        self._thread: threading.Thread | None = None
+
+    def client_ssl(self) -> ssl.SSLContext | None:
+        """A client context trusting the stand-in's certificate, or None without TLS."""
+        return ssl.create_default_context(cafile=str(self.cert_path)) if self.cert_path else None
+
+    @web.middleware
+    async def _record(self, request: web.Request, handler) -> web.StreamResponse:
+        self.requests += 1
+        self.paths.append(request.path_qs)
+        self.connections.add(request.transport.get_extra_info("peername")[:2])
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return await handler(request)
+        finally:
+            self.in_flight -= 1
+
+    async def _search(self, request: web.Request) -> web.Response:
+        site, page = request.match_info["site"], request.match_info["page"]
+        html = _fixture(site, "search_results")
+        if html is None:
+            raise web.HTTPNotFound()
+        etag = f'"{site}-{page}-{self.search_version}"'
+        modified = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc) + datetime.timedelta(
+            hours=self.search_version
+        )
+        last_modified = email.utils.format_datetime(modified, usegmt=True)
+        headers = {"ETag": etag, "Last-Modified": last_modified}
+        if request.headers.get("If-None-Match") == etag or request.headers.get("If-Modified-Since") == last_modified:
+            self.not_modified += 1
+            return web.Response(status=304, headers=headers)
+        return web.Response(text=html, content_type="text/html", headers=headers)
+
+    async def _listing(self, request: web.Request) -> web.Response:
+        site = request.match_info["site"]
+        html = _fixture(site, "listing_page") or _fixture(site, "search_results")
+        if html is None:
+            raise web.HTTPNotFound()
+        return web.Response(text=html, content_type="text/html")
+
+    async def _start(self, ssl_context: ssl.SSLContext | None) -> int:
+        app = web.Application(middlewares=[self._record])
+        app.router.add_get("/search/{site}/{page}", self._search)
+        app.router.add_get("/listing/{site}/{id}", self._listing)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0, ssl_context=ssl_context)
+        await site.start()
+        return site._server.sockets[0].getsockname()[1]
+
+    def __enter__(self) -> "FixtureServer":
+        ssl_context = None
+        if self.tls:
+            self.cert_path, key_path = _self_signed_cert(Path(tempfile.mkdtemp()))
+            ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            ssl_context.load_cert_chain(self.cert_path, key_path)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        port = asyncio.run_coroutine_threadsafe(self._start(ssl_context), self._loop).result(timeout=10)
+        self.url = f"{'https' if self.tls else 'http'}://127.0.0.1:{port}"
+        return self
+
+    def __exit__(self, *exc) -> None:
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.not_modified = 0
+        self.peak_in_flight = 0
+        self.paths.clear()
+        self.connections.clear()
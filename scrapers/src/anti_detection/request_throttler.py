@@ -16,18 +16,23 @@ class RequestThrottler:
         self.min_delay = min_delay
         self.max_delay = max_delay
 
+    def is_open(self, domain: str) -> bool:
+        """True while the domain's circuit breaker is tripped."""
+        return time.time() < _circuit_breakers.get(domain, 0)
+
     async def wait(self, domain: str) -> None:
         # Circuit breaker check
-        disabled_until = _circuit_breakers.get(domain, 0)
-        if time.time() < disabled_until:
-            raise RuntimeError(f"Circuit breaker open for {domain}, disabled until {disabled_until}")
+        if self.is_open(domain):
+            raise RuntimeError(f"Circuit breaker open for {domain}, disabled until {_circuit_breakers[domain]}")
 
-        # Adaptive delay
-        elapsed = time.time() - _last_request[domain]
+        # Adaptive delay. The slot is reserved before sleeping, so concurrent
+        # requests to a domain queue up one delay apart instead of all firing together
+        now = time.time()
         required = random.uniform(self.min_delay, self.max_delay)
-        if elapsed < required:
-            await asyncio.sleep(required - elapsed)
-        _last_request[domain] = time.time()
+        slot = max(now, _last_request[domain] + required)
+        _last_request[domain] = slot
+        if slot > now:
+            await asyncio.sleep(slot - now)
 
     def record_success(self, domain: str) -> None:
         _failure_counts[domain] = 0
@@ -1,8 +1,10 @@
 import asyncio
 import logging
+import os
 import random
 import urllib.robotparser
 from abc import ABC, abstractmethod
+from collections.abc import Mapping
 from datetime import datetime, timezone
 from typing import Optional
 
@@ -10,10 +12,16 @@ import aiohttp
 
 from scrapers.src.anti_detection.agent_rotator import AgentRotator
 from scrapers.src.anti_detection.request_throttler import RequestThrottler
+from scrapers.src.http_cache import HttpCache, default_cache
 from scrapers.src.models.listing import NormalizedListing, RawListingPreview
 
 log = logging.getLogger(__name__)
 
+# Resolved hosts are reused for this long instead of a lookup per request
+DNS_CACHE_SECONDS = int(os.getenv("SCRAPER_DNS_CACHE_SECONDS", "300"))
+# Idle pooled connections are closed after this long
+KEEPALIVE_SECONDS = float(os.getenv("SCRAPER_KEEPALIVE_SECONDS", "30"))
+
 
 class BaseScraper(ABC):
     site_name: str = ""
@@ -29,6 +37,37 @@ class BaseScraper(ABC):
             max_delay=self.request_delay_range[1],
         )
         self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.http_cache: Optional[HttpCache] = default_cache()
+        # Incremental mode: source_id -> price of listings already stored. Previews
+        # matching it skip their detail page and are collected in unchanged_ids instead
+        self.known_listings: Optional[dict[str, int]] = None
+        self.unchanged_ids: set[str] = set()
+
+    async def __aenter__(self) -> "BaseScraper":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _connector(self) -> aiohttp.TCPConnector:
+        # Never more connections to a site than requests the scraper runs at once
+        return aiohttp.TCPConnector(
+            limit_per_host=self.max_concurrent,
+            ttl_dns_cache=DNS_CACHE_SECONDS,
+            keepalive_timeout=KEEPALIVE_SECONDS,
+        )
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """The scraper's long-lived session, created on first use; ``close`` releases it."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(connector=self._connector(), timeout=aiohttp.ClientTimeout(total=30))
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
     @abstractmethod
     async def build_search_url(self, city: str, page: int = 1, **filters) -> str: ...
@@ -50,61 +89,117 @@ class BaseScraper(ABC):
             return True  # Default to allowing
 
     async def fetch_page(self, url: str, retries: int = 3) -> str:
+        _, html, _ = await self.fetch_response(url, retries)
+        return html
+
+    async def fetch_response(
+        self, url: str, retries: int = 3, extra_headers: Optional[dict[str, str]] = None
+    ) -> tuple[int, str, Mapping[str, str]]:
+        """``(status, body, response headers)``; status is 304 for a conditional GET of an unchanged page."""
         async with self._semaphore:
-            headers = self.agent_rotator.get_headers()
+            headers = {**self.agent_rotator.get_headers(), **(extra_headers or {})}
             for attempt in range(retries):
                 try:
                     await self.throttler.wait(self.site_name)
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as resp:
-                            if resp.status == 429:
-                                wait = 30 * (2 ** attempt)
-                                log.warning(f"Rate limited on {url}, waiting {wait}s")
-                                await asyncio.sleep(wait)
-                                headers = self.agent_rotator.get_headers()
+                    session = await self.get_session()
+                    async with session.get(url, headers=headers) as resp:
+                        if resp.status == 429:
+                            wait = 30 * (2**attempt)
+                            log.warning(f"Rate limited on {url}, waiting {wait}s")
+                            await asyncio.sleep(wait)
+                            headers = {**self.agent_rotator.get_headers(), **(extra_headers or {})}
+                            continue
+                        if resp.status == 403:
+                            headers = {**self.agent_rotator.get_headers(), **(extra_headers or {})}
+                            if attempt < retries - 1:
                                 continue
-                            if resp.status == 403:
-                                headers = self.agent_rotator.get_headers()
-                                if attempt < retries - 1:
-                                    continue
-                            resp.raise_for_status()
-                            return await resp.text()
+                        resp.raise_for_status()
+                        html = "" if resp.status == 304 else await resp.text()
+                        self.throttler.record_success(self.site_name)
+                        return resp.status, html, resp.headers.copy()
                 except aiohttp.ClientError as e:
                     if attempt == retries - 1:
+                        self.throttler.record_failure(self.site_name)
                         raise
-                    delay = 2 ** attempt
-                    log.warning(f"Request failed (attempt {attempt+1}), retrying in {delay}s: {e}")
+                    delay = 2**attempt
+                    log.warning(f"Request failed (attempt {attempt + 1}), retrying in {delay}s: {e}")
                     await asyncio.sleep(delay)
-        return ""
+        self.throttler.record_failure(self.site_name)
+        return 0, "", {}
 
     async def random_delay(self) -> None:
         delay = random.uniform(*self.request_delay_range)
         await asyncio.sleep(delay)
 
-    async def scrape_city(self, city: str, max_pages: int = 5, fixture_html: str | None = None) -> list[NormalizedListing]:
+    def _is_known(self, preview: RawListingPreview) -> bool:
+        # A preview without a price can't be compared, so its detail page is fetched
+        price = preview.price_eur_cents
+        return price is not None and self.known_listings.get(preview.source_id) == price
+
+    async def _scrape_detail(self, preview: RawListingPreview, fixture_html: str | None) -> Optional[NormalizedListing]:
+        try:
+            detail_html = fixture_html or await self.fetch_page(preview.source_url)
+            listing = await self.parse_listing_detail(detail_html)
+            if listing is None:
+                return None
+            # The listing is stored under the preview's identity and price, which
+            # incremental scrapes compare the next previews against
+            update = {"source_id": preview.source_id, "source_url": preview.source_url}
+            if preview.price_eur_cents:
+                update["price_eur_cents"] = preview.price_eur_cents
+            return listing.model_copy(update=update)
+        except Exception as e:
+            log.error(f"Failed to parse listing detail {preview.source_url}: {e}")
+            return None
+
+    async def scrape_city(
+        self, city: str, max_pages: int = 5, fixture_html: str | None = None
+    ) -> list[NormalizedListing]:
         results: list[NormalizedListing] = []
         for page in range(1, max_pages + 1):
             url = await self.build_search_url(city, page)
             try:
+                cached = None
                 if fixture_html and page == 1:
-                    html = fixture_html
+                    html, headers = fixture_html, {}
                 else:
-                    html = await self.fetch_page(url)
+                    cached = self.http_cache.get(url) if self.http_cache else None
+                    conditional = cached.conditional_headers() if cached else None
+                    status, html, headers = await self.fetch_response(url, extra_headers=conditional)
+                    if status == 304 and cached:
+                        # Unchanged since the cached scrape: reuse its listings without parsing
+                        # the page or fetching any detail page
+                        now = datetime.now(timezone.utc)
+                        listings = [NormalizedListing(**listing) for listing in cached.payload["listings"]]
+                        results.extend(listing.model_copy(update={"scraped_at": now}) for listing in listings)
+                        self.unchanged_ids.update(cached.payload.get("unchanged", []))
+                        continue
                 previews = await self.parse_search_results(html)
                 if not previews:
                     break
-                for preview in previews:
-                    try:
-                        if fixture_html:
-                            detail_html = fixture_html
-                        else:
-                            await self.random_delay()
-                            detail_html = await self.fetch_page(preview.source_url)
-                        listing = await self.parse_listing_detail(detail_html)
-                        if listing:
-                            results.append(listing)
-                    except Exception as e:
-                        log.error(f"Failed to parse listing detail {preview.source_url}: {e}")
+                unchanged = []
+                if self.known_listings is not None:
+                    unchanged = [p.source_id for p in previews if self._is_known(p)]
+                    self.unchanged_ids.update(unchanged)
+                    previews = [p for p in previews if not self._is_known(p)]
+                    if not previews:
+                        # Results are newest first: a page of only known listings ends the new ones
+                        log.info(f"{self.site_name}: page {page} of {city} has only known listings, stopping")
+                        break
+                # Detail pages are fetched concurrently: fetch_page admits max_concurrent
+                # at a time and the throttler still spaces requests to the site, so each
+                # page is parsed while the next responses are in flight
+                listings = await asyncio.gather(*(self._scrape_detail(p, fixture_html) for p in previews))
+                listings = [listing for listing in listings if listing]
+                results.extend(listings)
+                # Only complete pages are cached, a 304 must not replay a partial scrape
+                if self.http_cache and not fixture_html and len(listings) == len(previews):
+                    self.http_cache.put(
+                        url,
+                        headers.get("ETag"),
+                        headers.get("Last-Modified"),
+                        {"listings": [listing.model_dump(mode="json") for listing in listings], "unchanged": unchanged},
+                    )
             except Exception as e:
                 log.error(f"Failed to scrape page {page} of {city}: {e}")
                 break
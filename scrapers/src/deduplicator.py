@@ -1,16 +1,94 @@
 """Deduplication logic for scraped listings."""
 import logging
+import os
 from datetime import datetime, timedelta, timezone
 
 log = logging.getLogger(__name__)
 
+# Listings per match_listings message enqueued for the backend matching worker
+MATCH_BATCH_SIZE = int(os.getenv("SCRAPER_MATCH_BATCH_SIZE", "200"))
+# source_ids per UPDATE when bumping last_seen_at of listings an incremental scrape skipped
+TOUCH_CHUNK_SIZE = 1000
+
+_broker = None
+
 
 async def upsert_listing(listing_data: dict, db_session) -> tuple[bool, bool]:
     """
     Upsert a listing into the database.
     Returns (is_new: bool, was_updated: bool).
     Uses ON CONFLICT (source_site, source_id) DO UPDATE.
+    A price change enqueues delta re-matching for the listing.
+    """
+    listing, is_new, was_updated, old_price = await _upsert(listing_data, db_session)
+    if old_price is not None:
+        enqueue_rescoring([(str(listing.id), old_price)])
+    return is_new, was_updated
+
+
+async def ingest_listings(listings_data: list[dict], db_session, batch_size: int = MATCH_BATCH_SIZE) -> dict:
     """
+    Upsert a scrape pass worth of listings and enqueue matching for the new ones,
+    one match_listings message per batch_size listings. Listings whose price
+    changed are batched the same way into rescore_listings messages.
+    """
+    new_ids: list[str] = []
+    price_changes: list[tuple[str, int]] = []
+    updated = 0
+    for listing_data in listings_data:
+        listing, is_new, was_updated, old_price = await _upsert(listing_data, db_session)
+        if is_new:
+            new_ids.append(str(listing.id))
+        elif was_updated:
+            updated += 1
+        if old_price is not None:
+            price_changes.append((str(listing.id), old_price))
+
+    batches = 0
+    for start in range(0, len(new_ids), batch_size):
+        enqueue_matching(new_ids[start:start + batch_size])
+        batches += 1
+    for start in range(0, len(price_changes), batch_size):
+        enqueue_rescoring(price_changes[start:start + batch_size])
+    log.info(
+        f"Ingested {len(listings_data)} listings: {len(new_ids)} new, {updated} updated "
+        f"({len(price_changes)} repriced), {batches} match batches"
+    )
+    return {"new": len(new_ids), "updated": updated, "repriced": len(price_changes), "match_batches": batches}
+
+
+def enqueue_matching(listing_ids: list[str]) -> None:
+    """Send one match_listings message to the backend's Dramatiq matching queue."""
+    _enqueue("match_listings", listing_ids)
+
+
+def enqueue_rescoring(price_changes: list[tuple[str, int]]) -> None:
+    """Send one rescore_listings message with (listing_id, old_price) pairs."""
+    _enqueue("rescore_listings", [list(change) for change in price_changes])
+
+
+def _enqueue(actor_name: str, payload: list) -> None:
+    from dramatiq import Message
+
+    _get_broker().enqueue(Message(
+        queue_name="matching",
+        actor_name=actor_name,
+        args=(payload,),
+        kwargs={},
+        options={},
+    ))
+
+
+def _get_broker():
+    global _broker
+    if _broker is None:
+        from dramatiq.brokers.redis import RedisBroker
+        _broker = RedisBroker(url=os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    return _broker
+
+
+async def _upsert(listing_data: dict, db_session):
+    """Returns (listing, is_new, was_updated, old_price); old_price is set only when the price changed."""
     from sqlmodel import select
     from backend.app.models.listing import Listing
 
@@ -25,12 +103,13 @@ async def upsert_listing(listing_data: dict, db_session) -> tuple[bool, bool]:
 
     if existing:
         # Update mutable fields
+        old_price = existing.price_eur
         existing.last_seen_at = now
         existing.title = listing_data.get("title", existing.title)
         existing.price_eur = listing_data.get("price_eur_cents", existing.price_eur)
         existing.delisted_at = None  # Re-listed
         await db_session.commit()
-        return False, True
+        return existing, False, True, old_price if existing.price_eur != old_price else None
 
     import uuid
     listing = Listing(
@@ -51,7 +130,7 @@ async def upsert_listing(listing_data: dict, db_session) -> tuple[bool, bool]:
     )
     db_session.add(listing)
     await db_session.commit()
-    return True, False
+    return listing, True, False, None
 
 
 async def mark_delisted(source_site: str, active_ids: set[str], db_session, threshold_days: int = 7) -> int:
@@ -76,3 +155,39 @@ async def mark_delisted(source_site: str, active_ids: set[str], db_session, thre
             count += 1
     await db_session.commit()
     return count
+
+
+async def load_known_listings(source_site: str, db_session) -> dict[str, int]:
+    """
+    source_id -> price of every live listing of a site, for incremental scrapes.
+    Delisted listings are left out so a reappearing one is scraped and re-listed.
+    """
+    from sqlmodel import select
+    from backend.app.models.listing import Listing
+
+    result = await db_session.execute(
+        select(Listing.source_id, Listing.price_eur).where(
+            Listing.source_site == source_site,
+            Listing.delisted_at.is_(None),
+        )
+    )
+    return dict(result.all())
+
+
+async def touch_listings(source_site: str, source_ids, db_session, chunk_size: int = TOUCH_CHUNK_SIZE) -> int:
+    """Bump last_seen_at of listings seen unchanged in a scrape, in bulk. Returns how many rows were updated."""
+    from sqlalchemy import update
+    from backend.app.models.listing import Listing
+
+    source_ids = list(source_ids)
+    now = datetime.now(timezone.utc)
+    touched = 0
+    for start in range(0, len(source_ids), chunk_size):
+        result = await db_session.execute(
+            update(Listing)
+            .where(Listing.source_site == source_site, Listing.source_id.in_(source_ids[start:start + chunk_size]))
+            .values(last_seen_at=now)
+        )
+        touched += result.rowcount
+    await db_session.commit()
+    return touched
@@ -0,0 +1,102 @@
+"""On-disk cache of search result pages, revalidated with conditional GETs."""
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+log = logging.getLogger(__name__)
+
+# Empty disables the cache
+HTTP_CACHE_DIR = os.getenv("SCRAPER_HTTP_CACHE_DIR", "")
+HTTP_CACHE_MAX_BYTES = int(os.getenv("SCRAPER_HTTP_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+# Older entries are dropped, so every page is fully re-scraped at least this often
+HTTP_CACHE_MAX_AGE_SECONDS = int(os.getenv("SCRAPER_HTTP_CACHE_MAX_AGE_SECONDS", "86400"))
+
+
+class CacheEntry(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    payload: dict
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    One JSON file per URL holding the response validators (ETag, Last-Modified)
+    and a payload, the result of processing the response. A 304 to the
+    conditional GET means the payload still holds and the page need not be parsed.
+    Entries past max_age are ignored and removed; past max_bytes the oldest go first.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int = HTTP_CACHE_MAX_BYTES,
+        max_age: float = HTTP_CACHE_MAX_AGE_SECONDS,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        path = self._path(url)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("url") != url or time.time() - data["stored_at"] > self.max_age:
+            path.unlink(missing_ok=True)
+            return None
+        return CacheEntry(data.get("etag"), data.get("last_modified"), data["stored_at"], data["payload"])
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], payload: dict) -> None:
+        """Store the payload if the response carried a validator; without one it could never be revalidated."""
+        if not etag and not last_modified:
+            return
+        path = self._path(url)
+        data = {"url": url, "etag": etag, "last_modified": last_modified, "stored_at": time.time(), "payload": payload}
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, default=str), encoding="utf-8")
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self) -> int:
+        """Remove expired entries, then the oldest until the cache fits max_bytes. Returns how many went."""
+        now = time.time()
+        entries = []
+        for item in os.scandir(self.directory):
+            if item.name.endswith(".json"):
+                stat = item.stat()
+                entries.append((stat.st_mtime, stat.st_size, item.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                break
+            Path(path).unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        if removed:
+            log.info(f"HTTP cache evicted {removed} entries from {self.directory}")
+        return removed
+
+
+def default_cache() -> Optional[HttpCache]:
+    """The cache configured by SCRAPER_HTTP_CACHE_DIR, or None when it is unset."""
+    return HttpCache(HTTP_CACHE_DIR) if HTTP_CACHE_DIR else None
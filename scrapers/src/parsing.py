@@ -0,0 +1,67 @@
+"""
+Fast HTML parsing for the site parsers.
+
+Pages are parsed into a raw lxml tree and queried with XPath expressions the
+parsers compile once at import, instead of building a BeautifulSoup tree and
+searching it with regexes. A Document computes its text once, however many
+patterns are matched against it.
+
+Results follow BeautifulSoup's: ``text_of`` is ``get_text(strip=True)`` and
+``Document.text`` is ``get_text()`` up to whitespace between elements (neither
+includes script or style contents). ``has_class("a", "b")`` matches what
+``class_=re.compile(r"a|b")`` does for plain fragments. lxml elements without
+children are falsy, so test lookups with ``is None``.
+"""
+from functools import cached_property
+from typing import Optional
+
+from lxml import etree
+
+# Text nodes BeautifulSoup's get_text() returns: not those inside script, style or template
+_VISIBLE_TEXT = "text()[not(parent::script or parent::style or parent::template)]"
+_DOCUMENT_TEXT = etree.XPath(f"//{_VISIBLE_TEXT}", smart_strings=False)
+_ELEMENT_TEXT = etree.XPath(f".//{_VISIBLE_TEXT}", smart_strings=False)
+
+
+def xpath(expression: str) -> etree.XPath:
+    """Compile an XPath query; queries starting with ``//`` search the whole document, ``.//`` below an element."""
+    return etree.XPath(expression, smart_strings=False)
+
+
+def has_class(*fragments: str) -> str:
+    """XPath predicate: the class attribute contains any of ``fragments``."""
+    return " or ".join(f"contains(@class, '{fragment}')" for fragment in fragments)
+
+
+def first(node, *queries: etree.XPath) -> Optional[etree._Element]:
+    """The first match of the first query that matches anything, like ``find(a) or find(b)``."""
+    for query in queries:
+        found = query(node)
+        if found:
+            return found[0]
+    return None
+
+
+def text_of(element) -> str:
+    """The element's stripped text fragments, concatenated."""
+    return "".join(fragment.strip() for fragment in _ELEMENT_TEXT(element))
+
+
+class Document:
+    def __init__(self, html: str) -> None:
+        try:
+            # None for an empty page
+            self.root = etree.HTML(html) if html else None
+        except ValueError:
+            # lxml refuses str input that declares its own encoding
+            self.root = etree.HTML(html.encode())
+
+    def all(self, query: etree.XPath) -> list:
+        return query(self.root) if self.root is not None else []
+
+    def first(self, *queries: etree.XPath) -> Optional[etree._Element]:
+        return first(self.root, *queries) if self.root is not None else None
+
+    @cached_property
+    def text(self) -> str:
+        return "".join(_DOCUMENT_TEXT(self.root)) if self.root is not None else ""
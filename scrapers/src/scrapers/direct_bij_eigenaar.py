@@ -2,10 +2,17 @@ import re
 from datetime import datetime, timezone
 from typing import Optional
 
-from bs4 import BeautifulSoup
-
 from scrapers.src.base_scraper import BaseScraper
 from scrapers.src.models.listing import NormalizedListing, RawListingPreview
+from scrapers.src.parsing import Document, first, has_class, text_of, xpath
+
+_CARDS = xpath(f"//*[{has_class('listing', 'property', 'woning')}]")
+_CARD_LINK = xpath(".//a")
+_CARD_HEADING = xpath(".//*[self::h2 or self::h3]")
+_CARD_TITLE = xpath(f".//*[{has_class('title')}]")
+_CARD_PRICE = xpath(f".//*[{has_class('price', 'huurprijs')}]")
+_TITLE = xpath("//h1")
+_SIZE = re.compile(r"(\d+)\s*m²")
 
 
 class DirectBijEigenaarScraper(BaseScraper):
@@ -21,21 +28,21 @@ class DirectBijEigenaarScraper(BaseScraper):
         return url
 
     async def parse_search_results(self, html: str) -> list[RawListingPreview]:
-        soup = BeautifulSoup(html, "lxml")
+        doc = Document(html)
         results = []
-        cards = soup.find_all(class_=re.compile(r"listing|property|woning"))
+        cards = doc.all(_CARDS)
         for card in cards:
             try:
-                link = card.find("a")
-                if not link:
+                link = first(card, _CARD_LINK)
+                if link is None:
                     continue
                 href = link.get("href", "")
                 source_url = href if href.startswith("http") else f"{self.base_url}{href}"
                 source_id = href.rstrip("/").split("/")[-1]
-                title_el = card.find(["h2", "h3"]) or card.find(class_=re.compile(r"title"))
-                title = title_el.get_text(strip=True) if title_el else "Direct bij Eigenaar listing"
-                price_el = card.find(class_=re.compile(r"price|huurprijs"))
-                price_text = price_el.get_text(strip=True) if price_el else ""
+                title_el = first(card, _CARD_HEADING, _CARD_TITLE)
+                title = text_of(title_el) if title_el is not None else "Direct bij Eigenaar listing"
+                price_el = first(card, _CARD_PRICE)
+                price_text = text_of(price_el) if price_el is not None else ""
                 price_cents = _parse_price(price_text)
                 results.append(RawListingPreview(
                     source_site="directbijeigenaar",
@@ -50,13 +57,13 @@ class DirectBijEigenaarScraper(BaseScraper):
         return results
 
     async def parse_listing_detail(self, html: str) -> Optional[NormalizedListing]:
-        soup = BeautifulSoup(html, "lxml")
-        title_el = soup.find("h1")
-        title = title_el.get_text(strip=True) if title_el else "Direct bij Eigenaar listing"
-        text = soup.get_text()
+        doc = Document(html)
+        title_el = doc.first(_TITLE)
+        title = text_of(title_el) if title_el is not None else "Direct bij Eigenaar listing"
+        text = doc.text
         price_cents = _parse_price(text) or 130000
         size_sqm = None
-        m = re.search(r"(\d+)\s*m²", text)
+        m = _SIZE.search(text)
         if m:
             size_sqm = int(m.group(1))
         return NormalizedListing(
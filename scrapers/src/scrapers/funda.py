@@ -2,10 +2,20 @@ import re
 from datetime import datetime, timezone
 from typing import Optional
 
-from bs4 import BeautifulSoup
-
 from scrapers.src.base_scraper import BaseScraper
 from scrapers.src.models.listing import NormalizedListing, RawListingPreview
+from scrapers.src.parsing import Document, first, has_class, text_of, xpath
+
+_CARDS = xpath("//div[@data-test-id='search-result-item']")
+_CARDS_FALLBACK = xpath(f"//li[{has_class('search-result')}]")
+_CARD_LINK = xpath(".//a[contains(@href, '/huur/')]")
+_CARD_HEADING = xpath(".//*[self::h2 or self::h3]")
+_CARD_TITLE = xpath(f".//*[{has_class('title')}]")
+_CARD_PRICE = xpath(f".//*[{has_class('price')}]")
+_TITLE = xpath("//h1")
+_TITLE_FALLBACK = xpath(f"//*[{has_class('object-header__title')}]")
+_PRICE = xpath(f"//*[{has_class('price')}]")
+_ADDRESS = xpath(f"//*[{has_class('object-header__subtitle', 'address')}]")
 
 
 class FundaScraper(BaseScraper):
@@ -22,24 +32,24 @@ class FundaScraper(BaseScraper):
         return url
 
     async def parse_search_results(self, html: str) -> list[RawListingPreview]:
-        soup = BeautifulSoup(html, "lxml")
+        doc = Document(html)
         results = []
         # Funda listing cards
-        cards = soup.find_all("div", {"data-test-id": "search-result-item"})
+        cards = doc.all(_CARDS)
         if not cards:
-            cards = soup.find_all("li", class_=re.compile(r"search-result"))
+            cards = doc.all(_CARDS_FALLBACK)
         for card in cards:
             try:
-                link = card.find("a", href=re.compile(r"/huur/"))
-                if not link:
+                link = first(card, _CARD_LINK)
+                if link is None:
                     continue
                 href = link.get("href", "")
                 source_url = href if href.startswith("http") else f"{self.base_url}{href}"
                 source_id = href.rstrip("/").split("/")[-1] if "/" in href else href
-                title_el = card.find(["h2", "h3"]) or card.find(class_=re.compile(r"title"))
-                title = title_el.get_text(strip=True) if title_el else "Funda listing"
-                price_el = card.find(class_=re.compile(r"price"))
-                price_text = price_el.get_text(strip=True) if price_el else ""
+                title_el = first(card, _CARD_HEADING, _CARD_TITLE)
+                title = text_of(title_el) if title_el is not None else "Funda listing"
+                price_el = first(card, _CARD_PRICE)
+                price_text = text_of(price_el) if price_el is not None else ""
                 price_cents = _parse_price(price_text)
                 results.append(RawListingPreview(
                     source_site="funda",
@@ -54,20 +64,20 @@ class FundaScraper(BaseScraper):
         return results
 
     async def parse_listing_detail(self, html: str) -> Optional[NormalizedListing]:
-        soup = BeautifulSoup(html, "lxml")
-        title_el = soup.find(["h1"]) or soup.find(class_=re.compile(r"object-header__title"))
-        title = title_el.get_text(strip=True) if title_el else "Funda listing"
-        price_el = soup.find(class_=re.compile(r"price"))
-        price_text = price_el.get_text(strip=True) if price_el else "€ 1.000 /maand"
+        doc = Document(html)
+        title_el = doc.first(_TITLE, _TITLE_FALLBACK)
+        title = text_of(title_el) if title_el is not None else "Funda listing"
+        price_el = doc.first(_PRICE)
+        price_text = text_of(price_el) if price_el is not None else "€ 1.000 /maand"
         price_cents = _parse_price(price_text) or 100000
 
         # Extract address/city
-        address_el = soup.find(class_=re.compile(r"object-header__subtitle|address"))
-        address = address_el.get_text(strip=True) if address_el else ""
+        address_el = doc.first(_ADDRESS)
+        address = text_of(address_el) if address_el is not None else ""
 
         # Extract size and rooms from characteristics
-        size_sqm = _extract_number(soup, r"(\d+)\s*m²")
-        rooms = _extract_float(soup, r"(\d+(?:\.\d+)?)\s*kamers?")
+        size_sqm = _extract_number(doc, _SIZE)
+        rooms = _extract_float(doc, _ROOMS)
 
         return NormalizedListing(
             source_site="funda",
@@ -93,13 +103,15 @@ def _parse_price(text: str) -> Optional[int]:
     return None
 
 
-def _extract_number(soup: BeautifulSoup, pattern: str) -> Optional[int]:
-    text = soup.get_text()
-    m = re.search(pattern, text)
+_SIZE = re.compile(r"(\d+)\s*m²")
+_ROOMS = re.compile(r"(\d+(?:\.\d+)?)\s*kamers?")
+
+
+def _extract_number(doc: Document, pattern: re.Pattern) -> Optional[int]:
+    m = pattern.search(doc.text)
     return int(m.group(1)) if m else None
 
 
-def _extract_float(soup: BeautifulSoup, pattern: str) -> Optional[float]:
-    text = soup.get_text()
-    m = re.search(pattern, text)
+def _extract_float(doc: Document, pattern: re.Pattern) -> Optional[float]:
+    m = pattern.search(doc.text)
     return float(m.group(1)) if m else None
@@ -2,10 +2,20 @@ import re
 from datetime import datetime, timezone
 from typing import Optional
 
-from bs4 import BeautifulSoup
-
 from scrapers.src.base_scraper import BaseScraper
 from scrapers.src.models.listing import NormalizedListing, RawListingPreview
+from scrapers.src.parsing import Document, first, has_class, text_of, xpath
+
+_CARDS = xpath(f"//*[{has_class('listing-search-item')}]")
+_CARD_LINK = xpath(f".//a[{has_class('listing-search-item__link', 'name')}]")
+_CARD_ANY_LINK = xpath(".//a")
+_CARD_TITLE = xpath(f".//*[{has_class('listing-search-item__title', 'name')}]")
+_CARD_PRICE = xpath(f".//*[{has_class('listing-search-item__price', 'price')}]")
+_TITLE = xpath("//h1")
+_TITLE_FALLBACK = xpath(f"//*[{has_class('listing-detail-summary__title')}]")
+_PRICE = xpath(f"//*[{has_class('listing-detail-summary__price', 'price')}]")
+_SIZE = re.compile(r"(\d+)\s*m²")
+_ROOMS = re.compile(r"(\d+)\s+rooms?", re.IGNORECASE)
 
 
 class ParariusScraper(BaseScraper):
@@ -26,23 +36,21 @@ class ParariusScraper(BaseScraper):
         return url
 
     async def parse_search_results(self, html: str) -> list[RawListingPreview]:
-        soup = BeautifulSoup(html, "lxml")
+        doc = Document(html)
         results = []
-        cards = soup.find_all(class_=re.compile(r"listing-search-item"))
+        cards = doc.all(_CARDS)
         for card in cards:
             try:
-                link = card.find("a", class_=re.compile(r"listing-search-item__link|name"))
-                if not link:
-                    link = card.find("a")
-                if not link:
+                link = first(card, _CARD_LINK, _CARD_ANY_LINK)
+                if link is None:
                     continue
                 href = link.get("href", "")
                 source_url = href if href.startswith("http") else f"{self.base_url}{href}"
                 source_id = href.rstrip("/").split("/")[-1]
-                title_el = card.find(class_=re.compile(r"listing-search-item__title|name"))
-                title = title_el.get_text(strip=True) if title_el else link.get_text(strip=True)
-                price_el = card.find(class_=re.compile(r"listing-search-item__price|price"))
-                price_text = price_el.get_text(strip=True) if price_el else ""
+                title_el = first(card, _CARD_TITLE)
+                title = text_of(title_el) if title_el is not None else text_of(link)
+                price_el = first(card, _CARD_PRICE)
+                price_text = text_of(price_el) if price_el is not None else ""
                 price_cents = _parse_pararius_price(price_text)
                 results.append(RawListingPreview(
                     source_site="pararius",
@@ -57,20 +65,20 @@ class ParariusScraper(BaseScraper):
         return results
 
     async def parse_listing_detail(self, html: str) -> Optional[NormalizedListing]:
-        soup = BeautifulSoup(html, "lxml")
-        title_el = soup.find("h1") or soup.find(class_=re.compile(r"listing-detail-summary__title"))
-        title = title_el.get_text(strip=True) if title_el else "Pararius listing"
-        price_el = soup.find(class_=re.compile(r"listing-detail-summary__price|price"))
-        price_text = price_el.get_text(strip=True) if price_el else ""
+        doc = Document(html)
+        title_el = doc.first(_TITLE, _TITLE_FALLBACK)
+        title = text_of(title_el) if title_el is not None else "Pararius listing"
+        price_el = doc.first(_PRICE)
+        price_text = text_of(price_el) if price_el is not None else ""
         price_cents = _parse_pararius_price(price_text) or 150000
 
         size_sqm = None
         rooms = None
-        text = soup.get_text()
-        m = re.search(r"(\d+)\s*m²", text)
+        text = doc.text
+        m = _SIZE.search(text)
         if m:
             size_sqm = int(m.group(1))
-        m = re.search(r"(\d+)\s+rooms?", text, re.IGNORECASE)
+        m = _ROOMS.search(text)
         if m:
             rooms = float(m.group(1))
 
@@ -6,15 +6,35 @@ import json
 import logging
 import os
 import sys
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
+from scrapers.src.deduplicator import load_known_listings, touch_listings
 from scrapers.src.scrapers import SCRAPER_REGISTRY
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
 log = logging.getLogger(__name__)
 
 OUTPUT_DIR = Path(__file__).parent.parent / "output"
+# Sources scraped at once; each is a different site with its own throttler
+MAX_PARALLEL_SOURCES = int(os.getenv("SCRAPER_MAX_PARALLEL_SOURCES", "4"))
+# A source still running after this long is cancelled so it cannot hold up the run
+SOURCE_TIMEOUT_SECONDS = float(os.getenv("SCRAPER_SOURCE_TIMEOUT_SECONDS", "1800"))
+MAX_PAGES_PER_CITY = int(os.getenv("SCRAPER_MAX_PAGES_PER_CITY", "5"))
+
+_session_factory = None
+
+
+def _db_session():
+    """A database session for incremental scrapes, from DATABASE_URL."""
+    global _session_factory
+    if _session_factory is None:
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+        engine = create_async_engine(os.environ["DATABASE_URL"])
+        _session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    return _session_factory()
 
 
 async def run_scraper_fixture(scraper_name: str, city: str) -> list[dict]:
@@ -51,25 +71,102 @@ async def run_scraper_fixture(scraper_name: str, city: str) -> list[dict]:
     return listings
 
 
-async def main(sources: list[str], cities: list[str], live: bool = False) -> None:
-    log.info(f"Scraper worker starting | sources={sources} | cities={cities} | live={live}")
-    all_results = {}
-
+def _empty_stats(source: str, city: str, status: str) -> dict:
+    return {"source": source, "city": city, "status": status, "listings": 0, "unchanged": 0, "seconds": 0.0}
+
+
+async def scrape_source(
+    source: str, cities: list[str], live: bool, results: dict, stats: list[dict], incremental: bool = False
+) -> None:
+    """
+    Scrape every city of one source in turn, recording listings and per-city
+    stats as they finish. Incremental scrapes skip listings already stored at
+    the same price and only bump their last_seen_at.
+    """
+    # One scraper, and so one pooled session, per source across all cities
+    async with SCRAPER_REGISTRY[source]() as scraper:
+        if live and incremental:
+            async with _db_session() as db:
+                scraper.known_listings = await load_known_listings(scraper.site_name, db)
+            log.info(f"{source}: {len(scraper.known_listings)} known listings")
+        for city in cities:
+            if scraper.throttler.is_open(scraper.site_name):
+                stats.append(_empty_stats(source, city, "skipped"))
+                continue
+            start = time.perf_counter()
+            unchanged: set[str] = set()
+            try:
+                if live:
+                    listings = await scraper.scrape_city(city, max_pages=MAX_PAGES_PER_CITY)
+                    listing_dicts = [l.model_dump() for l in listings]
+                    if incremental and scraper.unchanged_ids:
+                        unchanged, scraper.unchanged_ids = scraper.unchanged_ids, set()
+                        async with _db_session() as db:
+                            await touch_listings(scraper.site_name, unchanged, db)
+                        log.info(f"{source}@{city}: {len(unchanged)} unchanged listings skipped")
+                else:
+                    listing_dicts = await run_scraper_fixture(source, city)
+            except Exception as e:
+                log.error(f"{source}@{city} failed: {e}")
+                status, listing_dicts = "failed", []
+            else:
+                status = "ok"
+                results[f"{source}:{city}"] = listing_dicts
+                log.info(f"{source}@{city}: {len(listing_dicts)} listings")
+            stats.append({
+                "source": source,
+                "city": city,
+                "status": status,
+                "listings": len(listing_dicts),
+                "unchanged": len(unchanged),
+                "seconds": round(time.perf_counter() - start, 3),
+            })
+
+
+async def orchestrate(
+    sources: list[str],
+    cities: list[str],
+    live: bool = False,
+    max_parallel: int = MAX_PARALLEL_SOURCES,
+    timeout: float = SOURCE_TIMEOUT_SECONDS,
+    incremental: bool = False,
+) -> tuple[dict, list[dict]]:
+    """
+    Scrape all sources concurrently, at most max_parallel at a time, each
+    working through its cities in order. Returns the listings per
+    "source:city" and one stats entry per source and city. A source that
+    fails, has its circuit breaker open or runs past timeout only loses its
+    own remaining cities.
+    """
+    results: dict = {}
+    stats: list[dict] = []
+    gate = asyncio.Semaphore(max_parallel)
+
+    async def run(source: str) -> None:
+        async with gate:
+            try:
+                await asyncio.wait_for(scrape_source(source, cities, live, results, stats, incremental), timeout)
+            except asyncio.TimeoutError:
+                log.warning(f"{source} timed out after {timeout}s")
+                done = {s["city"] for s in stats if s["source"] == source}
+                stats.extend(_empty_stats(source, city, "timeout") for city in cities if city not in done)
+            except Exception as e:
+                log.error(f"{source} failed: {e}")
+
+    known = []
     for source in sources:
         if source not in SCRAPER_REGISTRY:
             log.warning(f"Unknown source: {source}")
-            continue
-        for city in cities:
-            if live:
-                scraper = SCRAPER_REGISTRY[source]()
-                listings = await scraper.scrape_city(city, max_pages=1)
-                listing_dicts = [l.model_dump() for l in listings]
-            else:
-                listing_dicts = await run_scraper_fixture(source, city)
+        else:
+            known.append(source)
+    await asyncio.gather(*(run(source) for source in known))
+    stats.sort(key=lambda s: (known.index(s["source"]), cities.index(s["city"])))
+    return results, stats
+
 
-            key = f"{source}:{city}"
-            all_results[key] = listing_dicts
-            log.info(f"{source}@{city}: {len(listing_dicts)} listings")
+async def main(sources: list[str], cities: list[str], live: bool = False, incremental: bool = False) -> None:
+    log.info(f"Scraper worker starting | sources={sources} | cities={cities} | live={live} | incremental={incremental}")
+    all_results, stats = await orchestrate(sources, cities, live, incremental=incremental)
 
     # Write output
     OUTPUT_DIR.mkdir(exist_ok=True)
@@ -79,6 +176,9 @@ async def main(sources: list[str], cities: list[str], live: bool = False) -> Non
 
     total = sum(len(v) for v in all_results.values())
     log.info(f"Scrape complete: {total} total listings across {len(all_results)} source/city pairs")
+    for entry in stats:
+        if entry["status"] != "ok":
+            log.warning(f"{entry['source']}@{entry['city']}: {entry['status']}")
     return all_results
 
 
@@ -87,8 +187,12 @@ if __name__ == "__main__":
     parser.add_argument("--sources", default=os.getenv("SCRAPER_SOURCES", "funda,pararius"))
     parser.add_argument("--cities", default=os.getenv("SCRAPER_CITIES", "amsterdam"))
     parser.add_argument("--live", action="store_true", default=os.getenv("ENABLE_LIVE_SCRAPING", "false") == "true")
+    parser.add_argument(
+        "--incremental", action="store_true", default=os.getenv("SCRAPER_INCREMENTAL", "false") == "true",
+        help="skip listings already stored at the same price (live scrapes only; needs DATABASE_URL)",
+    )
     args = parser.parse_args()
 
     sources = [s.strip() for s in args.sources.split(",") if s.strip()]
     cities = [c.strip() for c in args.cities.split(",") if c.strip()]
-    asyncio.run(main(sources, cities, args.live))
+    asyncio.run(main(sources, cities, args.live, args.incremental))
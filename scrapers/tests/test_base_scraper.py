@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import pytest
+
+from scrapers.benchmarks.standin import FixtureServer
+from scrapers.src.scrapers.funda import FundaScraper
+
+
+class FastFunda(FundaScraper):
+    max_concurrent = 2
+    request_delay_range = (0.0, 0.0)
+
+
+@pytest.mark.asyncio
+async def test_fetch_page_reuses_pooled_connections():
+    with FixtureServer() as server:
+        async with FastFunda() as scraper:
+            pages = [await scraper.fetch_page(f"{server.url}/listing/funda/{i}") for i in range(5)]
+            session = scraper._session
+        assert all("<html" in page.lower() for page in pages)
+        assert server.requests == 5
+        assert len(server.connections) == 1
+        assert session.closed and scraper._session is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetches_stay_within_per_host_limit():
+    with FixtureServer(latency_ms=20) as server:
+        async with FastFunda() as scraper:
+            await asyncio.gather(*(scraper.fetch_page(f"{server.url}/listing/funda/{i}") for i in range(8)))
+        assert server.requests == 8
+        assert len(server.connections) == FastFunda.max_concurrent
+
+
+def stand_in_funda(server: FixtureServer) -> type:
+    """FastFunda pointed at the stand-in for both search and detail pages."""
+
+    class StandInFunda(FastFunda):
+        async def build_search_url(self, city: str, page: int = 1, **filters) -> str:
+            return f"{server.url}/search/funda/{page}"
+
+        async def parse_search_results(self, html: str):
+            previews = await super().parse_search_results(html)
+            return [p.model_copy(update={"source_url": f"{server.url}/listing/funda/{p.source_id}"}) for p in previews]
+
+    return StandInFunda
+
+
+@pytest.mark.asyncio
+async def test_scrape_city_fetches_details_concurrently():
+    with FixtureServer(latency_ms=50) as server:
+        StandInFunda = stand_in_funda(server)
+        async with StandInFunda() as scraper:
+            listings = await scraper.scrape_city("amsterdam", max_pages=1)
+
+    assert len(listings) == 5
+    assert server.requests == 6
+    assert server.peak_in_flight == StandInFunda.max_concurrent
+
+
+@pytest.mark.asyncio
+async def test_throttler_spaces_concurrent_requests():
+    from scrapers.src.anti_detection.request_throttler import RequestThrottler
+
+    throttler = RequestThrottler(min_delay=0.05, max_delay=0.05)
+    stamps = []
+
+    async def one() -> None:
+        await throttler.wait("spacing.test")
+        stamps.append(time.monotonic())
+
+    await asyncio.gather(*(one() for _ in range(4)))
+    gaps = [b - a for a, b in zip(stamps, stamps[1:])]
+    assert all(gap >= 0.04 for gap in gaps)
+
+
+@pytest.mark.asyncio
+async def test_incremental_scrape_skips_known_listings():
+    with FixtureServer() as server:
+        StandInFunda = stand_in_funda(server)
+        async with StandInFunda() as scraper:
+            previews = await scraper.parse_search_results(await scraper.fetch_page(f"{server.url}/search/funda/1"))
+            known, repriced = previews[:2], previews[2]
+            scraper.known_listings = {p.source_id: p.price_eur_cents for p in known}
+            scraper.known_listings[repriced.source_id] = repriced.price_eur_cents + 5000
+
+            server.reset()
+            listings = await scraper.scrape_city("amsterdam", max_pages=1)
+
+    # One search page and detail pages for the new and the repriced listings only
+    assert server.requests == 1 + len(previews) - len(known)
+    assert [listing.source_id for listing in listings] == [p.source_id for p in previews[2:]]
+    assert scraper.unchanged_ids == {p.source_id for p in known}
+
+
+@pytest.mark.asyncio
+async def test_incremental_scrape_stops_at_a_page_of_known_listings():
+    with FixtureServer() as server:
+        StandInFunda = stand_in_funda(server)
+        async with StandInFunda() as scraper:
+            previews = await scraper.parse_search_results(await scraper.fetch_page(f"{server.url}/search/funda/1"))
+            scraper.known_listings = {p.source_id: p.price_eur_cents for p in previews}
+
+            server.reset()
+            listings = await scraper.scrape_city("amsterdam", max_pages=5)
+
+    assert listings == []
+    assert server.paths == ["/search/funda/1"]
+    assert scraper.unchanged_ids == {p.source_id for p in previews}
@@ -5,3 +5,28 @@ def test_deduplicator_module_importable():
     from scrapers.src.deduplicator import upsert_listing, mark_delisted
     assert callable(upsert_listing)
     assert callable(mark_delisted)
+
+
+@pytest.mark.asyncio
+async def test_ingest_listings_enqueues_one_message_per_batch(monkeypatch):
+    import uuid
+    from types import SimpleNamespace
+
+    from scrapers.src import deduplicator
+
+    async def fake_upsert(listing_data, db_session):
+        is_new = not listing_data["source_id"].startswith("known")
+        old_price = 120000 if listing_data["source_id"] == "known-repriced" else None
+        return SimpleNamespace(id=uuid.uuid4()), is_new, not is_new, old_price
+
+    batches, rescores = [], []
+    monkeypatch.setattr(deduplicator, "_upsert", fake_upsert)
+    monkeypatch.setattr(deduplicator, "enqueue_matching", batches.append)
+    monkeypatch.setattr(deduplicator, "enqueue_rescoring", rescores.append)
+
+    listings = [{"source_id": str(i)} for i in range(5)] + [{"source_id": "known"}, {"source_id": "known-repriced"}]
+    stats = await deduplicator.ingest_listings(listings, db_session=None, batch_size=2)
+
+    assert stats == {"new": 5, "updated": 2, "repriced": 1, "match_batches": 3}
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert [[old for _, old in b] for b in rescores] == [[120000]]
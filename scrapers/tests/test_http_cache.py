@@ -0,0 +1,71 @@
+import os
+import time
+
+import pytest
+
+from scrapers.benchmarks.standin import FixtureServer
+from scrapers.src.http_cache import HttpCache
+from scrapers.tests.test_base_scraper import stand_in_funda
+
+
+@pytest.mark.asyncio
+async def test_unchanged_search_page_is_served_from_cache(tmp_path):
+    with FixtureServer() as server:
+        scraper_cls = stand_in_funda(server)
+        parsed = []
+
+        class CountingFunda(scraper_cls):
+            async def parse_search_results(self, html: str):
+                parsed.append(html)
+                return await super().parse_search_results(html)
+
+        async with CountingFunda() as scraper:
+            scraper.http_cache = HttpCache(tmp_path)
+            first = await scraper.scrape_city("amsterdam", max_pages=1)
+            assert server.requests == 6
+
+            server.reset()
+            second = await scraper.scrape_city("amsterdam", max_pages=1)
+            # One conditional GET answered with a 304; no parsing and no detail pages
+            assert (server.requests, server.not_modified) == (1, 1)
+            assert len(parsed) == 1
+            assert [listing.model_dump(exclude={"scraped_at"}) for listing in second] == [
+                listing.model_dump(exclude={"scraped_at"}) for listing in first
+            ]
+            assert all(b.scraped_at > a.scraped_at for a, b in zip(first, second))
+
+            server.reset()
+            server.search_version += 1
+            await scraper.scrape_city("amsterdam", max_pages=1)
+            assert (server.requests, server.not_modified) == (6, 0)
+            assert len(parsed) == 2
+
+
+def test_entries_without_validators_are_not_stored(tmp_path):
+    cache = HttpCache(tmp_path)
+    cache.put("https://example.nl/a", None, None, {"listings": []})
+    assert cache.get("https://example.nl/a") is None
+    cache.put("https://example.nl/a", '"v1"', None, {"listings": []})
+    assert cache.get("https://example.nl/a").conditional_headers() == {"If-None-Match": '"v1"'}
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = HttpCache(tmp_path, max_age=60)
+    cache.put("https://example.nl/a", '"v1"', None, {"listings": []})
+    path = next(tmp_path.glob("*.json"))
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    assert cache.evict() == 1
+    assert list(tmp_path.glob("*.json")) == []
+
+
+def test_oldest_entries_are_evicted_past_max_bytes(tmp_path):
+    cache = HttpCache(tmp_path, max_bytes=10**9)
+    for i in range(5):
+        cache.put(f"https://example.nl/{i}", f'"v{i}"', None, {"listings": ["x" * 1000]})
+        stamp = time.time() - 100 + i
+        os.utime(cache._path(f"https://example.nl/{i}"), (stamp, stamp))
+
+    cache.max_bytes = sum(os.path.getsize(cache._path(f"https://example.nl/{i}")) for i in (2, 3, 4))
+    assert cache.evict() == 2
+    assert [cache.get(f"https://example.nl/{i}") is not None for i in range(5)] == [False, False, True, True, True]
@@ -0,0 +1,60 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from scrapers.src.parsing import Document, first, has_class, text_of, xpath
+from scrapers.src.scrapers import SCRAPER_REGISTRY
+
+FIXTURES = Path(__file__).parent / "fixtures"
+# Every parser's output over every fixture page, recorded from the BeautifulSoup parsers
+# the lxml backend replaced (scraped_at left out)
+EXPECTED = FIXTURES / "parsed_fixtures.json"
+
+
+async def _parse_all() -> dict:
+    parsed = {}
+    for site, scraper_cls in sorted(SCRAPER_REGISTRY.items()):
+        scraper = scraper_cls()
+        for fixture in sorted(FIXTURES.glob("*.html")):
+            html = fixture.read_text(encoding="utf-8")
+            previews = await scraper.parse_search_results(html)
+            detail = await scraper.parse_listing_detail(html)
+            parsed[f"{site}/{fixture.name}"] = {
+                "previews": [p.model_dump(mode="json") for p in previews],
+                "detail": detail.model_dump(mode="json", exclude={"scraped_at"}) if detail else None,
+            }
+    return parsed
+
+
+def test_parsers_match_recorded_output():
+    expected = json.loads(EXPECTED.read_text(encoding="utf-8"))
+    parsed = asyncio.run(_parse_all())
+    assert len(expected) == 48
+    for key in expected:
+        assert parsed[key] == expected[key], key
+
+
+@pytest.mark.asyncio
+async def test_parsers_handle_empty_pages():
+    for scraper_cls in SCRAPER_REGISTRY.values():
+        scraper = scraper_cls()
+        assert await scraper.parse_search_results("") == []
+        assert (await scraper.parse_listing_detail("")).price_eur_cents > 0
+
+
+def test_document_helpers():
+    doc = Document(
+        "<html><head><style>.p{}</style></head><body>"
+        "<div class='card card--big'><h3> Canal <b>view</b> </h3><span class='rent-price'>€ 1.200</span></div>"
+        "<script>var price = 1</script></body></html>"
+    )
+    card = doc.first(xpath(f"//*[{has_class('card')}]"))
+    assert card is not None
+    assert text_of(first(card, xpath(".//h1"), xpath(".//h3"))) == "Canalview"
+    assert text_of(first(card, xpath(f".//*[{has_class('nope', 'price')}]"))) == "€ 1.200"
+    assert doc.text == " Canal view € 1.200"
+    # Childless elements are falsy in lxml; lookups must be tested with `is None`
+    assert first(card, xpath(".//span")) is not None
+    assert Document("<?xml version='1.0' encoding='utf-8'?><p>hi</p>").text == "hi"
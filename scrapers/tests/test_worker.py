@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+import pytest
+
+from scrapers.src import worker
+from scrapers.src.base_scraper import BaseScraper
+from scrapers.src.models.listing import NormalizedListing
+
+
+def _fake_scraper(name: str, delay: float = 0.0, fail: bool = False) -> type:
+    class FakeScraper(BaseScraper):
+        site_name = name
+        calls: list[str] = []
+
+        async def build_search_url(self, city: str, page: int = 1, **filters) -> str:
+            return ""
+
+        async def parse_search_results(self, html: str):
+            return []
+
+        async def parse_listing_detail(self, html: str):
+            return None
+
+        async def scrape_city(self, city: str, max_pages: int = 5, fixture_html: str | None = None):
+            self.calls.append(city)
+            await asyncio.sleep(delay)
+            if fail:
+                raise RuntimeError("site down")
+            return [NormalizedListing(
+                source_site=name, source_id=city, source_url=f"https://{name}/{city}", title=city,
+                price_eur_cents=100000, city=city, scraped_at="2026-01-01T00:00:00Z",
+            )]
+
+    return FakeScraper
+
+
+@pytest.mark.asyncio
+async def test_orchestrate_runs_sources_concurrently(monkeypatch):
+    registry = {f"site{i}": _fake_scraper(f"site{i}", delay=0.1) for i in range(3)}
+    monkeypatch.setattr(worker, "SCRAPER_REGISTRY", registry)
+
+    start = time.perf_counter()
+    results, stats = await worker.orchestrate(list(registry) + ["nope"], ["amsterdam", "utrecht"], live=True)
+    elapsed = time.perf_counter() - start
+
+    # Three sources of two 0.1s cities each run side by side, not in 0.6s
+    assert elapsed < 0.4
+    assert sorted(results) == sorted(f"site{i}:{c}" for i in range(3) for c in ("amsterdam", "utrecht"))
+    assert [(s["source"], s["city"], s["status"]) for s in stats] == [
+        (f"site{i}", c, "ok") for i in range(3) for c in ("amsterdam", "utrecht")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_orchestrate_bounds_parallel_sources(monkeypatch):
+    registry = {f"site{i}": _fake_scraper(f"site{i}", delay=0.1) for i in range(4)}
+    monkeypatch.setattr(worker, "SCRAPER_REGISTRY", registry)
+
+    start = time.perf_counter()
+    await worker.orchestrate(list(registry), ["amsterdam"], live=True, max_parallel=2)
+    assert time.perf_counter() - start >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_slow_and_failing_sources_do_not_stall_others(monkeypatch):
+    registry = {
+        "slow": _fake_scraper("slow", delay=5),
+        "broken": _fake_scraper("broken", fail=True),
+        "fast": _fake_scraper("fast"),
+    }
+    monkeypatch.setattr(worker, "SCRAPER_REGISTRY", registry)
+
+    start = time.perf_counter()
+    results, stats = await worker.orchestrate(list(registry), ["amsterdam", "utrecht"], live=True, timeout=0.2)
+
+    assert time.perf_counter() - start < 1
+    assert sorted(results) == ["fast:amsterdam", "fast:utrecht"]
+    assert {(s["source"], s["city"]): s["status"] for s in stats} == {
+        ("slow", "amsterdam"): "timeout",
+        ("slow", "utrecht"): "timeout",
+        ("broken", "amsterdam"): "failed",
+        ("broken", "utrecht"): "failed",
+        ("fast", "amsterdam"): "ok",
+        ("fast", "utrecht"): "ok",
+    }
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_breaker_skips_remaining_cities(monkeypatch):
+    from scrapers.src.anti_detection import request_throttler
+
+    registry = {"tripped": _fake_scraper("tripped")}
+    monkeypatch.setattr(worker, "SCRAPER_REGISTRY", registry)
+    monkeypatch.setitem(request_throttler._circuit_breakers, "tripped", time.time() + 60)
+
+    results, stats = await worker.orchestrate(["tripped"], ["amsterdam"], live=True)
+
+    assert results == {}
+    assert [s["status"] for s in stats] == ["skipped"]
+    assert registry["tripped"].calls == []
+
+
+@pytest.mark.asyncio
+async def test_incremental_scrape_bumps_unchanged_listings(monkeypatch):
+    from contextlib import asynccontextmanager
+
+    class IncrementalScraper(_fake_scraper("site")):
+        async def scrape_city(self, city: str, max_pages: int = 5, fixture_html: str | None = None):
+            self.unchanged_ids.update(sid for sid in self.known_listings if sid.startswith(city))
+            return []
+
+    @asynccontextmanager
+    async def fake_session():
+        yield "db"
+
+    async def fake_load(source_site, db_session):
+        return {"amsterdam-1": 100000, "amsterdam-2": 120000, "utrecht-1": 90000}
+
+    touched = []
+
+    async def fake_touch(source_site, source_ids, db_session):
+        touched.append((source_site, sorted(source_ids)))
+        return len(source_ids)
+
+    monkeypatch.setattr(worker, "SCRAPER_REGISTRY", {"site": IncrementalScraper})
+    monkeypatch.setattr(worker, "_db_session", fake_session)
+    monkeypatch.setattr(worker, "load_known_listings", fake_load)
+    monkeypatch.setattr(worker, "touch_listings", fake_touch)
+
+    _, stats = await worker.orchestrate(["site"], ["amsterdam", "utrecht"], live=True, incremental=True)
+
+    assert touched == [("site", ["amsterdam-1", "amsterdam-2"]), ("site", ["utrecht-1"])]
+    assert [s["unchanged"] for s in stats] == [2, 1]